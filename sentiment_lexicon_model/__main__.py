@@ -1,155 +1,97 @@
-import os 
-import sys
-import pandas as pd
-import re
-
-module_folder_path = os.path.abspath('src\dicta_for_morphological_analysis\src')
-sys.path.append(module_folder_path)
-import dicta_api_utils as dicta
-from conllu_parser import ConlluParser
-
-module_folder_path = os.path.abspath('src\hebrew_sentiment_based_on_pos\src')
-sys.path.append(module_folder_path)
+import time
+import logging
+import argparse
+from sentiment_pipeline import UD_FORMAT_PATH, SPLIT_PATHS, BATCH_SIZE, OUTPUT_FORMATS, LOG_FORMAT, LOG_LEVELS, run_pipeline, default_results_path, results_ud_format_path, overwritten_inputs
 from sentiment_translator import SentimentTranslator
-from sentiment_lexicon import Sentiment
-
-# open sentiment files
-script_path = os.path.dirname(os.path.abspath(__file__))
-data_path = os.path.join(script_path, 'data', 'train.csv')
-with open(data_path, 'r', encoding="utf-8") as file:
-    train_file = pd.read_csv(file)
-data_path = os.path.join(script_path, 'data', 'test_gold.csv')
-with open(data_path, 'r', encoding="utf-8") as file:
-    test_file = pd.read_csv(file)
-data_path = os.path.join(script_path, 'data', 'dev.csv')
-with open(data_path, 'r', encoding="utf-8") as file:
-    dev_file = pd.read_csv(file)
-
-# open file to save sentiment sentences in UD format
-current_file = (dev_file,"dev")
-sentiment_ud_format_file = open(f"sentiment_in_UD_format_{current_file[1]}.txt", 'a', encoding="utf-8")
-
-def remove_punctuation(sentence):
-    """
-    Remove all panctuation marks from the middle of a sentence 
-    """
-    sentence = re.sub(r'\!|\״|\#|\$|\%|\&|\'|\(|\)|\|\*|\+|\,|\-|\.|\/|\:|\;|\<|\=|\>|\?|\@|\[|\\|\]|\^|\_|\`|\{|\||\}|\~|\'|\:|\'|\"', '',sentence)
-    return sentence
-
-def parse_feats(feats):
-    """
-    parse feats to match the formt needed for SentimentTranslator.
-
-    Args:
-        feats (Dictionary): a dictionary with UD features
-    Returns:
-        feats_string (String): A concatenates string of featurs, that is needed for the use of SentimentTranslator.  
-    """
-    feats_string = ''
-    for key, value in feats.items():
-        feats_string = feats_string + '|' + f"{key}={value}"
-    
-    feats_string = feats_string[1:]
-    return feats_string
-
-def get_sentence_sentiment_score(conllu_sentence, sentimet_translator):
-    """
-    Get sentiment score for sentence in conllu format
-
-    Args:
-    conllu_sentence (ConlluParser): Sentence in onllu format
-
-    Returns: 
-    A sentiment score for sentence
-    """
-    positive_count = 0
-    negative_count = 0
-    total_number_of_words = conllu_sentence.count_tokens
-    # calculate sentiment score for each of the tokens in the dataset
-    for i in range(conllu_sentence.count_tokens):
-        print(f"sentiment score iteartion: {i}")
-        word = conllu_sentence.get_token_value(i, 'lemma')
-        upos = conllu_sentence.get_token_value(i, 'upos')
-        feats = conllu_sentence.get_token_value(i, 'feats')
-        if feats == -1: 
-            feats = '_'
-        else: 
-            feats = parse_feats(feats)
-        word_sentiment = sentimet_translator.translate(word, upos, feats)
-        if word_sentiment == 0:
-            positive_count += 1
-        elif word_sentiment == 1:
-            negative_count += 1
-    
-    sentiment_score = (positive_count - negative_count) / total_number_of_words
-    if sentiment_score < 0:
-        return Sentiment.NEGATIVE.value
-    elif sentiment_score > 0:
-        return Sentiment.POSITIVE.value
-    else: 
-        return Sentiment.NEUTRAL.value
-    
-
-# open new  data frame for results 
-model_results = pd.DataFrame(columns=['sentence', 'sentiment', 'model_sentiment'])
-
-# for each sentence in dataset
-sentimet_translator = SentimentTranslator(False)
-for index, row in current_file[0].iterrows():
-    print(f"sentence number: {index}")
-    sentence = current_file[0].loc[index, 'comment']
-    sentiment = current_file[0].loc[index, 'label']
-    # remove punctuation
-    sentence= remove_punctuation(sentence)
-    print(f"sentence : {sentence}")
-    # open dicta request
-    ud_sentence = dicta.dicta_request(sentence)
-    # convert to conluu format
-    conllu_sentence = ConlluParser(ud_sentence)
-    # get sentiment score
-    sentiment_score = get_sentence_sentiment_score(conllu_sentence, sentimet_translator)
-    new_row = [sentence, current_file[0].loc[index, 'label'], sentiment_score]
-    model_results.loc[len(model_results)] = new_row
-
-    # export sentiment sentence in UD format
-    conllu_sentence.insert_sentence_value('sentiment', str(sentiment))
-    sentiment_ud_format_file.write(conllu_sentence.sentence.serialize())
-
-
-# model_results.to_csv(f"model_results2.csv", index = False, encoding = 'utf-8-sig')
-
-# sentence = train_file.loc[0, 'sentence']
-# # remove punctuation
-# sentence= remove_punctuation(sentence)
-# # open dicta request
-# ud_sentence = dicta.dicta_request(sentence)
-# print(repr(ud_sentence))
-# # convert to conluu format
-# conllu_sentence = ConlluParser(ud_sentence)
-# print(repr(conllu_sentence.sentence[1]))
-# print(parse_feats(conllu_sentence.sentence[1]['feats']))
-
-# print(conllu_sentence.sentence)
-# for i in range(conllu_sentence.count_tokens):
-#     print(i)
-#     print(conllu_sentence.get_token_value(i, 'lemma'))
-#     print(conllu_sentence.get_token_value(i, 'upos'))
-#     feats = conllu_sentence.get_token_value(i, 'feats')
-#     if feats == -1: 
-#         print('_')
-#     else: 
-#         print(parse_feats(feats))
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+from dicta_client import DictaClient
+from dicta_cache import DictaCache, DictaCacheMiss
+from morphological_analyzer import DictaAnalyzer, LocalAnalyzer
+import metrics
+
+logger = logging.getLogger('sentiment_lexicon_model')
+
+# Score the sentiment dataset: every sentence is analysed (by Dicta, from the cache of Dicta responses, or offline), parsed and scored,
+# and the results are written with the sentences in UD format.
+
+parser = argparse.ArgumentParser(description='score the sentiment dataset with the sentiment lexicon model')
+parser.add_argument('--splits', nargs='+', choices=list(SPLIT_PATHS), default=list(SPLIT_PATHS), help='splits to process, in order')
+parser.add_argument('--naive', action='store_true', help='use the naive lexicon instead of the rule based lexicon')
+parser.add_argument('--analyzer', choices=['remote', 'cache', 'offline'], default='remote',
+                    help='remote: Dicta API, with its responses cached on disk. cache: only cached Dicta responses, nothing is sent. '
+                         'offline: the analyses of dicta_hebrew_corpus_raw, without Dicta')
+parser.add_argument('--segment-prefixes', action='store_true', help='translate a word the analyzer could not analyse without its prefix letters (ו, ה, ב, ל, מ, ש, כ), '
+                    'when it is not in the dictionary')
+parser.add_argument('--workers', type=int, default=8, help='number of Dicta requests in flight at the same time')
+parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='number of sentences analysed at a time')
+parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv', help='format of the results file')
+parser.add_argument('--output', default=None, help='results file, sentiment_lexicon_model_run_<lexicon>.<format> by default. '
+                    'The sentiment_lexicon_model_results_<lexicon>.csv files hold the published results and are not overwritten')
+parser.add_argument('--ud-output', default=None, help='path pattern of the sentences in UD format with their sentiment, with {split} in place of the split name. '
+                    '<results file without its extension>_UD_format_{split}.txt by default')
+parser.add_argument('--overwrite-ud-inputs', action='store_true', help='write the sentences in UD format to sentiment_in_UD_format_<split>.txt, '
+                    'replacing the files that rescore.py reads')
+parser.add_argument('--resume', action='store_true', help='continue an interrupted run, skipping sentences that were already written')
+parser.add_argument('--metrics', default=None, help='time the pipeline stages and the analysis, parsing, translation and scoring calls, '
+                    'and write their counters and latency histograms to this file. The file is written also if the run fails')
+parser.add_argument('--metrics-format', choices=metrics.EXPORT_FORMATS, default='json', help='format of the metrics file')
+parser.add_argument('--log-level', choices=LOG_LEVELS, default='INFO', help='minimal level of the logged messages')
+args = parser.parse_args()
+if args.workers < 1 or args.batch_size < 1:
+    parser.error('--workers and --batch-size must be positive')
+logging.basicConfig(level=args.log_level, format=LOG_FORMAT)
+# metrics are opt-in, as timing every translation slows the scoring
+run_metrics = metrics.instrument() if args.metrics is not None else None
+
+# results of all splits, and every split in UD format with its sentiment
+results_path = args.output or default_results_path(args.naive, args.format)
+if args.overwrite_ud_inputs:
+    ud_format_path = UD_FORMAT_PATH
+else:
+    ud_format_path = args.ud_output or results_ud_format_path(results_path)
+if '{split}' not in ud_format_path:
+    parser.error('--ud-output must have {split} in place of the split name')
+overwritten = overwritten_inputs(args.splits, results_path, ud_format_path, args.overwrite_ud_inputs)
+if len(overwritten) > 0:
+    parser.error(f"the outputs would overwrite input files: {', '.join(overwritten)}. Only the sentiment CoNLL-U files can be updated, with --overwrite-ud-inputs")
+
+sentimet_translator = SentimentTranslator(args.naive, segment_prefixes=args.segment_prefixes)
+cache = None
+client = None
+if args.analyzer == 'offline':
+    analyzer = LocalAnalyzer.from_corpus()
+else:
+    cache = DictaCache(offline=args.analyzer == 'cache')
+    client = DictaClient(max_workers=args.workers, cache=cache)
+    analyzer = DictaAnalyzer(client)
+
+start = time.perf_counter()
+try:
+    count, tokens = run_pipeline(args.splits, sentimet_translator, results_path, ud_format_path, analyze_batch=analyzer, batch_size=args.batch_size,
+                                 resume=args.resume, output_format=args.format, overwrite_ud_inputs=args.overwrite_ud_inputs)
+except DictaCacheMiss as error:
+    logger.error("sentence not in the Dicta cache: %s", error)
+    parser.exit(1, "run with --analyzer remote to analyse it, then continue with --resume\n")
+finally:
+    if client is not None:
+        client.close()
+        cache.close()
+    if run_metrics is not None:
+        run_metrics.export(args.metrics, args.metrics_format)
+        logger.info("metrics written to %s", args.metrics)
+elapsed = time.perf_counter() - start
+
+# throughput summary
+logger.info("%d sentences (%d tokens) of %s processed in %.1fs, results in %s", count, tokens, ', '.join(args.splits), elapsed, results_path)
+logger.info("throughput: %.1f sentences/s, %.1f tokens/s", count / elapsed, tokens / elapsed)
+if cache is not None:
+    stats = cache.stats()
+    logger.info("Dicta cache hit rate: %.3f (%d hits, %d misses)", stats['hit_rate'], stats['hits'], stats['misses'])
+else:
+    stats = analyzer.stats()
+    logger.info("offline analyzer word hit rate: %.3f (%d hits, %d misses)", stats['hit_rate'], stats['hits'], stats['misses'])
+info = sentimet_translator.cache_info()
+lookups = info['hits'] + info['misses']
+logger.info("translation cache hit rate: %.3f (%d hits, %d misses)", info['hits'] / lookups if lookups > 0 else 0.0, info['hits'], info['misses'])
+if run_metrics is not None:
+    for line in run_metrics.summary():
+        logger.info("%s", line)
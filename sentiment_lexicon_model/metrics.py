@@ -0,0 +1,176 @@
+import json
+import time
+import bisect
+import functools
+import threading
+import sentiment_pipeline
+import dicta_api_utils as dicta
+from dicta_client import DictaClient
+from conllu_parser import ConlluParser
+from pos_translator import POSTranslator
+from sentiment_translator import SentimentTranslator
+
+# upper bounds, in seconds, of the latency histogram buckets. A translation takes microseconds and a Dicta request up to seconds.
+LATENCY_BUCKETS = (0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# formats the metrics can be exported in
+EXPORT_FORMATS = ['json', 'prometheus']
+# prefix of the exported prometheus metric names
+PROMETHEUS_PREFIX = 'sentiment_lexicon_model'
+
+# the functions timed by instrument(): operation name, the owner of the function and the function name.
+# these are the functions a pipeline run goes through: batches of sentences are sent through dicta_request_batch and DictaClient.send,
+# and the words of a sentence are translated at once through SentimentTranslator.translate_batch and POSTranslator.translate_tokens.
+# every stage of the pipeline is timed as well, through sentiment_pipeline.STAGE_OBSERVER.
+INSTRUMENTED = [
+    ('dicta_request_batch', dicta, 'dicta_request_batch'),
+    ('dicta_send', DictaClient, 'send'),
+    ('parse_ud_format', dicta, 'parse_ud_format'),
+    ('conllu_parse', ConlluParser, '__init__'),
+    ('sentiment_translate_batch', SentimentTranslator, 'translate_batch'),
+    ('pos_translate_tokens', POSTranslator, 'translate_tokens'),
+    ('sentence_score', sentiment_pipeline, 'get_token_list_sentiment_score'),
+    ('write_results', sentiment_pipeline.ResultsSink, 'flush'),
+]
+
+class Metrics:
+    """
+    Counters and latency histograms of named operations. Operations are observed from the threads of the pipeline stages, so every update holds a lock.
+
+    Attributes:
+        buckets (Tuple): upper bounds, in seconds, of the latency histogram buckets, in increasing order.
+        operations (Dictionary): operation name to its calls, errors, total seconds, and count of latencies in every bucket (and above the last bucket).
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.operations = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds, error=False):
+        """
+        Record a call of an operation.
+
+        Args:
+            name (String): name of the operation
+            seconds (Float): latency of the call
+            error (Bool): if the call raised an exception
+        """
+        with self.lock:
+            operation = self.operations.get(name)
+            if operation is None:
+                operation = self.operations[name] = {'calls': 0, 'errors': 0, 'seconds': 0.0, 'counts': [0] * (len(self.buckets) + 1)}
+            operation['calls'] += 1
+            operation['errors'] += error
+            operation['seconds'] += seconds
+            operation['counts'][bisect.bisect_left(self.buckets, seconds)] += 1
+
+    def timed(self, name, function):
+        """
+        Wrap a function, so every call of it is observed as the operation name.
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                self.observe(name, time.perf_counter() - start, error=True)
+                raise
+            self.observe(name, time.perf_counter() - start)
+            return result
+        return wrapper
+
+    def to_dict(self):
+        """
+        Gets a copy of the metrics.
+
+        Returns:
+            metrics (Dictionary): operation name to its calls, errors, total and mean seconds, and cumulative histogram as a list of [upper bound, count].
+            The last upper bound is "+Inf".
+        """
+        with self.lock:
+            operations = {name: dict(operation, counts=list(operation['counts'])) for name, operation in self.operations.items()}
+        metrics = {}
+        for name, operation in sorted(operations.items()):
+            cumulative = 0
+            histogram = []
+            for bound, count in zip(self.buckets + ('+Inf',), operation['counts']):
+                cumulative += count
+                histogram.append([bound, cumulative])
+            metrics[name] = {'calls': operation['calls'], 'errors': operation['errors'], 'seconds': operation['seconds'],
+                             'mean_seconds': operation['seconds'] / operation['calls'], 'histogram': histogram}
+        return metrics
+
+    def to_json(self):
+        """
+        Gets the metrics as a json string
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """
+        Gets the metrics in the prometheus text format: a calls counter, an errors counter and a latency histogram, with the operation as a label.
+        """
+        metrics = self.to_dict()
+        lines = [f"# HELP {prefix}_calls_total Number of calls of an operation.", f"# TYPE {prefix}_calls_total counter"]
+        lines.extend(f'{prefix}_calls_total{{operation="{name}"}} {operation["calls"]}' for name, operation in metrics.items())
+        lines.extend([f"# HELP {prefix}_errors_total Number of calls of an operation that raised an exception.", f"# TYPE {prefix}_errors_total counter"])
+        lines.extend(f'{prefix}_errors_total{{operation="{name}"}} {operation["errors"]}' for name, operation in metrics.items())
+        lines.extend([f"# HELP {prefix}_latency_seconds Latency of an operation.", f"# TYPE {prefix}_latency_seconds histogram"])
+        for name, operation in metrics.items():
+            lines.extend(f'{prefix}_latency_seconds_bucket{{operation="{name}",le="{bound}"}} {count}' for bound, count in operation['histogram'])
+            lines.append(f'{prefix}_latency_seconds_sum{{operation="{name}"}} {operation["seconds"]!r}')
+            lines.append(f'{prefix}_latency_seconds_count{{operation="{name}"}} {operation["calls"]}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path, export_format='json'):
+        """
+        Write the metrics to a file, in a format from EXPORT_FORMATS
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"unknown export format {export_format}, expected one of {EXPORT_FORMATS}")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.to_json() if export_format == 'json' else self.to_prometheus())
+
+    def summary(self):
+        """
+        Gets a line per operation with its calls, errors and total and mean latency, slowest operation first
+        """
+        metrics = sorted(self.to_dict().items(), key=lambda item: item[1]['seconds'], reverse=True)
+        return [f"{name}: {operation['calls']} calls, {operation['errors']} errors, {operation['seconds']:.3f}s total, {operation['mean_seconds'] * 1000:.3f}ms mean"
+                for name, operation in metrics]
+
+# the metrics of the instrumented functions, and the functions they replaced. None while the functions are not instrumented.
+METRICS = None
+ORIGINALS = []
+
+def instrument(metrics=None):
+    """
+    Time every call of the functions in INSTRUMENTED, and every item of the pipeline stages. Metrics are opt-in: until this is called, the functions run without any overhead.
+
+    Args:
+        metrics (Metrics): the metrics to record the calls in. If None, a new one is created.
+    Returns:
+        metrics (Metrics): the metrics the calls are recorded in. If the functions are already instrumented, their current metrics.
+    """
+    global METRICS
+    if METRICS is not None:
+        return METRICS
+    METRICS = metrics if metrics is not None else Metrics()
+    for name, owner, attribute in INSTRUMENTED:
+        function = getattr(owner, attribute)
+        ORIGINALS.append((owner, attribute, function))
+        setattr(owner, attribute, METRICS.timed(name, function))
+    sentiment_pipeline.STAGE_OBSERVER = METRICS.observe
+    return METRICS
+
+def uninstrument():
+    """
+    Restore the functions replaced by instrument(), and stop timing the pipeline stages
+    """
+    global METRICS
+    sentiment_pipeline.STAGE_OBSERVER = None
+    while len(ORIGINALS) > 0:
+        owner, attribute, function = ORIGINALS.pop()
+        setattr(owner, attribute, function)
+    METRICS = None
@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+import logging
+import argparse
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SCRIPT_PATH)
+from sentiment_pipeline import SPLIT_PATHS, LOG_FORMAT, LOG_LEVELS
+from sentiment_scoring import UD_FORMAT_PATH, rescore
+
+logger = logging.getLogger('sentiment_lexicon_model')
+
+# Score the sentiment CoNLL-U files written by __main__.py again, for example after changing the lexicon or the scoring rule.
+# The sentences are not analysed again, so nothing is sent to Dicta.
+
+parser = argparse.ArgumentParser(description='score the sentiment CoNLL-U files again, without calling Dicta')
+parser.add_argument('--splits', nargs='+', choices=list(SPLIT_PATHS), default=None, help='splits to score, every split needs its sentiment_in_UD_format_<split>.txt. By default, every split that has one')
+parser.add_argument('--naive', action='store_true', help='use the naive lexicon instead of the rule based lexicon')
+parser.add_argument('--workers', type=int, default=1, help='number of worker processes')
+parser.add_argument('--compact', action='store_true', help='load every file into a compact columnar corpus and score it at once')
+parser.add_argument('--shared', action='store_true', help='workers read the lexicons from a single shared lexicon file, instead of each loading a copy')
+parser.add_argument('--output', default=None, help='results csv file, sentiment_lexicon_model_rescored_<lexicon>.csv by default (the checked in results files are never overwritten by default)')
+parser.add_argument('--log-level', choices=LOG_LEVELS, default='INFO', help='minimal level of the logged messages')
+args = parser.parse_args()
+logging.basicConfig(level=args.log_level, format=LOG_FORMAT)
+
+if args.splits is None:
+    splits = [split for split in SPLIT_PATHS if os.path.exists(UD_FORMAT_PATH.format(split=split))]
+else:
+    splits = args.splits
+missing = [UD_FORMAT_PATH.format(split=split) for split in splits if not os.path.exists(UD_FORMAT_PATH.format(split=split))]
+if len(missing) > 0:
+    parser.error(f"missing sentiment CoNLL-U files, write them with __main__.py --overwrite-ud-inputs on their splits first: {', '.join(missing)}")
+results_path = args.output or os.path.join(SCRIPT_PATH, f"sentiment_lexicon_model_rescored_{'naive' if args.naive else 'rule_based'}.csv")
+start = time.perf_counter()
+count = rescore(splits, args.naive, results_path, workers=args.workers, compact=args.compact, shared=args.shared)
+logger.info("%d sentences of %s scored in %.1fs, results in %s", count, ', '.join(splits), time.perf_counter() - start, results_path)
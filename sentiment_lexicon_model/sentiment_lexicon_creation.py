@@ -11,19 +11,11 @@ from sentiment_lexicon import Sentiment
 # open sentiment dataset in UD format
 with open("lexicon.csv", 'r', encoding="utf-8") as file:
     sentiment_lexicon = pd.read_csv(file)
-sentiment_lexicon['sentiment'] = None
 
 # create new sentiment translator
 sentiment_translator = SentimentTranslator(naive=False)
-for index, row in sentiment_lexicon.iterrows():
-    # print(f"Word number {index}")
-    word = sentiment_lexicon.loc[index, 'word']
-    upos = sentiment_lexicon.loc[index, 'upos']
-    feats = sentiment_lexicon.loc[index, 'feats']
-    # get the word sentiment score
-    word_sentiment = sentiment_translator.translate(word, upos, feats)
-    sentiment_lexicon.loc[index, 'sentiment'] = word_sentiment
-    # print(f"Result: {word} {word_sentiment}")
+# get the sentiment score of all words at once
+sentiment_lexicon['sentiment'] = sentiment_translator.translate_batch(sentiment_lexicon)
 
 # export results to csv
 sentiment_lexicon.to_csv(f"sentiment_lexicon.csv", index = False, encoding = 'utf-8-sig')
@@ -0,0 +1,514 @@
+import os
+import re
+import sys
+import csv
+import json
+import time
+import queue
+import logging
+import threading
+
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SCRIPT_PATH, 'src', 'dicta_for_morphological_analysis', 'src'))
+sys.path.append(os.path.join(SCRIPT_PATH, 'src', 'hebrew_sentiment_based_on_pos', 'src'))
+import dicta_api_utils as dicta
+from conllu_parser import ConlluParser
+from sentiment_lexicon import Sentiment
+
+logger = logging.getLogger(__name__)
+
+# sentiment dataset file of each split
+SPLIT_PATHS = {
+    'train': os.path.join(SCRIPT_PATH, 'data', 'train.csv'),
+    'test': os.path.join(SCRIPT_PATH, 'data', 'test_gold.csv'),
+    'dev': os.path.join(SCRIPT_PATH, 'data', 'dev.csv'),
+}
+# sentiment CoNLL-U file of each split, kept in the repository and read by rescore.py
+UD_FORMAT_PATH = os.path.join(SCRIPT_PATH, "sentiment_in_UD_format_{split}.txt")
+
+# columns of the model results file
+RESULT_COLUMNS = ['sentence', 'sentiment', 'model_sentiment', 'dataset', 'equals']
+# formats of the model results file: a csv file with a header, or a json object per line
+OUTPUT_FORMATS = ['csv', 'jsonl']
+
+# number of rows read from a split file at a time
+READ_CHUNK_SIZE = 1000
+# number of sentences sent to Dicta at a time
+BATCH_SIZE = 64
+# maximal number of items waiting between two stages
+QUEUE_SIZE = 256
+# number of results written to the output files at a time
+WRITE_CHUNK_SIZE = 100
+# the checkpoint of a run is kept next to its results file
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+# format of the log lines of the command line scripts, and the levels they can log at
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
+
+# gets the name of an operation and its latency in seconds, for every item of a named stage: the time the stage worked on the item
+# ("stage_<name>") and the time it waited for room in its queue ("stage_<name>_queue_wait"). Set by metrics.instrument(), None while stages are not timed.
+STAGE_OBSERVER = None
+# the time the thread waited for items of an earlier stage, so it is not counted as work of the stage that runs in the thread
+STAGE_INPUT_WAIT = threading.local()
+
+def remove_punctuation(sentence):
+    """
+    Remove all panctuation marks from the middle of a sentence
+    """
+    sentence = re.sub(r'\!|\״|\#|\$|\%|\&|\'|\(|\)|\|\*|\+|\,|\-|\.|\/|\:|\;|\<|\=|\>|\?|\@|\[|\\|\]|\^|\_|\`|\{|\||\}|\~|\'|\:|\'|\"', '',sentence)
+    return sentence
+
+def parse_feats(feats):
+    """
+    parse feats to match the formt needed for SentimentTranslator.
+
+    Args:
+        feats (Dictionary): a dictionary with UD features
+    Returns:
+        feats_string (String): A concatenates string of featurs, that is needed for the use of SentimentTranslator.
+    """
+    feats_string = ''
+    for key, value in feats.items():
+        feats_string = feats_string + '|' + f"{key}={value}"
+
+    feats_string = feats_string[1:]
+    return feats_string
+
+def get_sentence_sentiment_score(conllu_sentence, sentimet_translator):
+    """
+    Get sentiment score for sentence in conllu format
+
+    Args:
+    conllu_sentence (ConlluParser): Sentence in onllu format
+
+    Returns:
+    A sentiment score for sentence
+    """
+    return get_token_list_sentiment_score(conllu_sentence.sentence, sentimet_translator)
+
+def get_token_value(token, key):
+    """
+    Gets the value of a token that matches the key, like ConlluParser.get_token_value.
+    If key not in token, return -1
+    """
+    if key not in token or token[key] == None:
+        return -1
+    return token[key]
+
+def get_token_list_sentiment_score(token_list, sentimet_translator):
+    """
+    Get sentiment score for a parsed sentence
+
+    Args:
+    token_list (conllu.models.TokenList): Sentence parsed by conllu
+
+    Returns:
+    A sentiment score for sentence. A sentence without tokens is neutral, like in sentiment_scoring.score_corpus().
+    """
+    import numpy as np
+    # collect the tokens of the sentence, and calculate their sentiment scores at once
+    words = []
+    upos = []
+    feats = []
+    for token in token_list:
+        words.append(get_token_value(token, 'lemma'))
+        upos.append(get_token_value(token, 'upos'))
+        token_feats = get_token_value(token, 'feats')
+        if token_feats == -1:
+            feats.append('_')
+        else:
+            feats.append(parse_feats(token_feats))
+    words_sentiment = sentimet_translator.translate_batch(words, upos, feats)
+    positive_count = int(np.count_nonzero(words_sentiment == Sentiment.POSITIVE.value))
+    negative_count = int(np.count_nonzero(words_sentiment == Sentiment.NEGATIVE.value))
+
+    # the sign of the sentence score, (positive_count - negative_count) / number of words, without dividing by the number of words of an empty sentence
+    sentiment_score = positive_count - negative_count
+    if sentiment_score < 0:
+        return Sentiment.NEGATIVE.value
+    elif sentiment_score > 0:
+        return Sentiment.POSITIVE.value
+    else:
+        return Sentiment.NEUTRAL.value
+
+class StageError:
+    """
+    Carries an exception raised in a stage thread to the consumer of the stage
+    """
+    def __init__(self, error):
+        self.error = error
+
+def run_stage(items, queue_size=QUEUE_SIZE, name=None):
+    """
+    Runs a stage in a thread of its own, with a bounded queue between it and the next stage.
+    The stage is paused when the queue is full, so a slow stage never makes an earlier stage hold the whole dataset.
+
+    Args:
+        items (Iterable): the output of a stage
+        queue_size (Int): maximal number of items waiting in the queue
+        name (String): name of the stage, its items are timed under it while STAGE_OBSERVER is set. If None, the stage is not timed.
+    Returns:
+        A generator of the stage items, in order.
+    """
+    stage_queue = queue.Queue(maxsize=queue_size)
+    done = object()
+
+    def produce():
+        try:
+            if name is None or STAGE_OBSERVER is None:
+                for item in items:
+                    stage_queue.put(item)
+            else:
+                produce_timed(items, stage_queue, name, STAGE_OBSERVER)
+        except BaseException as error:
+            stage_queue.put(StageError(error))
+        finally:
+            stage_queue.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    timed = STAGE_OBSERVER is not None
+    while True:
+        if timed:
+            start = time.perf_counter()
+            item = stage_queue.get()
+            STAGE_INPUT_WAIT.seconds = getattr(STAGE_INPUT_WAIT, 'seconds', 0.0) + time.perf_counter() - start
+        else:
+            item = stage_queue.get()
+        if item is done:
+            return
+        if isinstance(item, StageError):
+            raise item.error
+        yield item
+
+def produce_timed(items, stage_queue, name, observe):
+    """
+    Put the items of a stage in its queue, and observe the time spent on every item and the time spent waiting for room in the queue
+    """
+    STAGE_INPUT_WAIT.seconds = 0.0
+    iterator = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        put_start = time.perf_counter()
+        observe(f"stage_{name}", put_start - start - STAGE_INPUT_WAIT.seconds)
+        STAGE_INPUT_WAIT.seconds = 0.0
+        stage_queue.put(item)
+        observe(f"stage_{name}_queue_wait", time.perf_counter() - put_start)
+
+def read_split(split, chunk_size=READ_CHUNK_SIZE):
+    """
+    Read a sentiment dataset split, a chunk of rows at a time.
+
+    Yields:
+        record (Dictionary): the split, index, comment and gold label of a sentence
+    """
+    import pandas as pd
+    logger.info("reading split %s from %s", split, SPLIT_PATHS[split])
+    with open(SPLIT_PATHS[split], 'r', encoding="utf-8") as file:
+        for chunk in pd.read_csv(file, chunksize=chunk_size):
+            for index, comment, label in zip(chunk.index, chunk['comment'], chunk['label']):
+                yield {'split': split, 'index': int(index), 'sentence': comment, 'label': int(label)}
+
+def strip_punctuation(records):
+    """
+    Remove punctuation from the sentence of every record
+    """
+    for record in records:
+        record['sentence'] = remove_punctuation(record['sentence'])
+        yield record
+
+def analyze(records, analyze_batch=dicta.dicta_request_batch, batch_size=BATCH_SIZE):
+    """
+    Add the UD morphological analysis of its sentence to every record, analysing batch_size sentences at a time.
+
+    Args:
+        records (Iterable): records with a sentence
+        analyze_batch (Function): gets a list of sentences, and returns a list with the UD analysis of each sentence
+        batch_size (Int): number of sentences analysed at a time
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield from analyze_records(batch, analyze_batch)
+            batch = []
+    if len(batch) > 0:
+        yield from analyze_records(batch, analyze_batch)
+
+def analyze_records(batch, analyze_batch):
+    """
+    Add the UD morphological analysis to a batch of records
+    """
+    for record, ud_sentence in zip(batch, analyze_batch([record['sentence'] for record in batch])):
+        record['ud_sentence'] = ud_sentence
+        yield record
+
+def parse(records):
+    """
+    Convert the UD analysis of every record to conllu format
+    """
+    for record in records:
+        record['conllu_sentence'] = ConlluParser(record.pop('ud_sentence'))
+        yield record
+
+def score(records, sentimet_translator):
+    """
+    Add the model sentiment of its sentence to every record
+    """
+    for record in records:
+        record['model_sentiment'] = get_sentence_sentiment_score(record['conllu_sentence'], sentimet_translator)
+        yield record
+
+class Checkpoint:
+    """
+    Records which sentences were written to the output files, and the size of every output file after the last written chunk.
+    The record is replaced atomically after a chunk is written and synced, so after a crash it matches the last complete chunk.
+
+    Attributes:
+        path (String): path of the checkpoint json file.
+        completed (Dictionary): split name to a set of indices of written sentences.
+        sizes (Dictionary): output file path to its size in bytes at the last checkpoint.
+    """
+    def __init__(self, path):
+        """
+        Load the checkpoint, if the file exists
+        """
+        self.path = path
+        self.completed = {}
+        self.sizes = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                checkpoint = json.load(file)
+            self.completed = {split: set(indices) for split, indices in checkpoint['completed'].items()}
+            self.sizes = checkpoint['sizes']
+
+    def is_completed(self, split, index):
+        """
+        Check if a sentence was already written
+        """
+        return index in self.completed.get(split, ())
+
+    def commit(self, records, sizes):
+        """
+        Add the written records and the new output file sizes, and replace the checkpoint file.
+
+        Args:
+            records (List): the records of the written chunk
+            sizes (Dictionary): output file path to its size in bytes after the chunk
+        """
+        for record in records:
+            self.completed.setdefault(record['split'], set()).add(record['index'])
+        self.sizes.update(sizes)
+        checkpoint = {'completed': {split: sorted(indices) for split, indices in self.completed.items()}, 'sizes': self.sizes}
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(checkpoint, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        """
+        Remove the checkpoint file
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def skip_completed(records, checkpoint):
+    """
+    Drop the records of sentences that were already written, before they are sent for analysis
+    """
+    for record in records:
+        if not checkpoint.is_completed(record['split'], record['index']):
+            yield record
+
+def open_output(path, checkpoint, resume, encoding):
+    """
+    Open an output file for writing.
+    When resuming, the file is cut back to its size at the last checkpoint (dropping a chunk that was only partly written) and opened for appending.
+    """
+    if resume and path in checkpoint.sizes and os.path.exists(path):
+        os.truncate(path, checkpoint.sizes[path])
+        return open(path, 'a', encoding=encoding, newline='')
+    return open(path, 'w', encoding=encoding, newline='')
+
+def file_size(file):
+    """
+    Flush a file to the disk and get its size in bytes
+    """
+    file.flush()
+    os.fsync(file.fileno())
+    return os.fstat(file.fileno()).st_size
+
+class ResultsSink:
+    """
+    Writes the results of the pipeline to a results file, and the sentences with their gold sentiment to a CoNLL-U file for each split.
+    Results are written a chunk at a time, and every written chunk is recorded in the checkpoint.
+
+    Attributes:
+        results_path (String): path of the results file.
+        ud_format_path (String): path pattern of the CoNLL-U files, with {split} in place of the split name.
+        checkpoint (Checkpoint): record of the written sentences.
+        resume (Bool): if true, the output files are continued from the checkpoint instead of being rewritten.
+        chunk_size (Int): number of results written at a time.
+        output_format (String): format of the results file, from OUTPUT_FORMATS.
+        count (Int): number of results written in this run.
+        tokens (Int): number of tokens of the sentences written in this run.
+    """
+    def __init__(self, results_path, ud_format_path, checkpoint, resume=False, chunk_size=WRITE_CHUNK_SIZE, output_format='csv'):
+        """
+        Open the output files, and write the header of the results file if it is a new csv file
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown output format {output_format}, expected one of {OUTPUT_FORMATS}")
+        self.results_path = results_path
+        self.ud_format_path = ud_format_path
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.chunk_size = chunk_size
+        self.output_format = output_format
+        self.count = 0
+        self.tokens = 0
+        self.records = []
+        self.rows = []
+        self.ud_format_sentences = {}
+        self.ud_format_files = {}
+        self.results_file = open_output(results_path, checkpoint, resume, 'utf-8-sig' if output_format == 'csv' else 'utf-8')
+        self.results_writer = csv.writer(self.results_file)
+        if output_format == 'csv' and self.results_file.tell() == 0:
+            self.results_writer.writerow(RESULT_COLUMNS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, record):
+        """
+        Add the result of a record, and write the current chunk if it is full
+        """
+        sentiment = record['label']
+        model_sentiment = record['model_sentiment']
+        self.records.append(record)
+        self.rows.append([record['sentence'], sentiment, model_sentiment, record['split'], sentiment == model_sentiment])
+        # export sentiment sentence in UD format
+        conllu_sentence = record['conllu_sentence']
+        self.tokens += conllu_sentence.count_tokens
+        conllu_sentence.insert_sentence_value('sentiment', str(sentiment))
+        self.ud_format_sentences.setdefault(record['split'], []).append(conllu_sentence.sentence.serialize())
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the current chunk to the output files, and record it in the checkpoint
+        """
+        if len(self.rows) == 0:
+            return
+        if self.output_format == 'jsonl':
+            self.results_file.write(''.join(json.dumps(dict(zip(RESULT_COLUMNS, row)), ensure_ascii=False) + '\n' for row in self.rows))
+        else:
+            self.results_writer.writerows(row[:-1] + [str(row[-1]).upper()] for row in self.rows)
+        sizes = {self.results_path: file_size(self.results_file)}
+        for split, ud_format_sentences in self.ud_format_sentences.items():
+            path = self.ud_format_path.format(split=split)
+            if split not in self.ud_format_files:
+                self.ud_format_files[split] = open_output(path, self.checkpoint, self.resume, 'utf-8')
+            self.ud_format_files[split].write(''.join(ud_format_sentences))
+            sizes[path] = file_size(self.ud_format_files[split])
+        self.checkpoint.commit(self.records, sizes)
+        self.count += len(self.rows)
+        logger.debug("wrote %d results, %d in this run", len(self.rows), self.count)
+        self.records = []
+        self.rows = []
+        self.ud_format_sentences = {}
+
+    def close(self):
+        """
+        Write the last chunk and close the output files
+        """
+        self.flush()
+        self.results_file.close()
+        for ud_format_file in self.ud_format_files.values():
+            ud_format_file.close()
+
+def default_results_path(naive, output_format='csv'):
+    """
+    Gets the default results file of a run, next to the scripts. It is not one of the checked in results files.
+    """
+    return os.path.join(SCRIPT_PATH, f"sentiment_lexicon_model_run_{'naive' if naive else 'rule_based'}.{output_format}")
+
+def results_ud_format_path(results_path):
+    """
+    Gets the path pattern of the CoNLL-U files written with a results file, with {split} in place of the split name
+    """
+    return os.path.splitext(results_path)[0] + "_UD_format_{split}.txt"
+
+def overwritten_inputs(splits, results_path, ud_format_path, overwrite_ud_inputs=False):
+    """
+    Find the output files of a run that are input files: the split files, and the sentiment CoNLL-U files read by rescore.py.
+    Outputs are rewritten from the start, so writing them would destroy the inputs.
+
+    Args:
+        splits (List): names of the splits of the run
+        results_path (String): path of the results file
+        ud_format_path (String): path pattern of the CoNLL-U files, with {split} in place of the split name
+        overwrite_ud_inputs (Bool): if true, the sentiment CoNLL-U files may be written, to update them on purpose. The split files never may.
+    Returns:
+        paths (List): the output files that are input files. If there are none, an empty list.
+    """
+    inputs = list(SPLIT_PATHS.values())
+    if not overwrite_ud_inputs:
+        inputs.extend(UD_FORMAT_PATH.format(split=split) for split in SPLIT_PATHS)
+    inputs = {os.path.realpath(path) for path in inputs}
+    outputs = [results_path, results_path + CHECKPOINT_SUFFIX] + [ud_format_path.format(split=split) for split in splits]
+    return [path for path in outputs if os.path.realpath(path) in inputs]
+
+def run_pipeline(splits, sentimet_translator, results_path, ud_format_path, analyze_batch=dicta.dicta_request_batch, batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE, chunk_size=WRITE_CHUNK_SIZE, resume=False, output_format='csv', overwrite_ud_inputs=False):
+    """
+    Stream all sentences of the given splits through: reading, punctuation stripping, morphological analysis, CoNLL-U parsing, scoring and writing.
+    Each stage but the writing runs in its own thread, with bounded queues between them, so the memory used does not grow with the size of the input.
+
+    Args:
+        splits (List): names of the splits to process, from SPLIT_PATHS
+        sentimet_translator (SentimentTranslator): translator used to score the sentences
+        results_path (String): path of the results file
+        ud_format_path (String): path pattern of the CoNLL-U files, with {split} in place of the split name
+        analyze_batch (Function): gets a list of sentences, and returns a list with the UD analysis of each sentence
+        batch_size (Int): number of sentences analysed at a time
+        queue_size (Int): maximal number of items waiting between two stages
+        chunk_size (Int): number of results written at a time
+        resume (Bool): if true, continue the run recorded in the checkpoint of results_path: sentences that were already written are skipped.
+            Otherwise the outputs are rewritten from the start.
+        output_format (String): format of the results file, from OUTPUT_FORMATS
+        overwrite_ud_inputs (Bool): if true, ud_format_path may be the sentiment CoNLL-U files read by rescore.py (UD_FORMAT_PATH), to update them.
+            Otherwise, and always for the split files, outputs that are input files raise ValueError before anything is written.
+    Returns:
+        count (Int): number of sentences processed in this run
+        tokens (Int): number of tokens of these sentences
+    """
+    def read_splits():
+        for split in splits:
+            yield from read_split(split)
+
+    overwritten = overwritten_inputs(splits, results_path, ud_format_path, overwrite_ud_inputs)
+    if len(overwritten) > 0:
+        raise ValueError(f"the outputs would overwrite input files: {', '.join(overwritten)}")
+    checkpoint = Checkpoint(results_path + CHECKPOINT_SUFFIX)
+    if not resume:
+        checkpoint.remove()
+        checkpoint = Checkpoint(checkpoint.path)
+
+    records = run_stage(skip_completed(read_splits(), checkpoint), queue_size, 'read')
+    records = run_stage(strip_punctuation(records), queue_size, 'strip_punctuation')
+    records = run_stage(analyze(records, analyze_batch, batch_size), queue_size, 'analyze')
+    records = run_stage(parse(records), queue_size, 'parse')
+    records = run_stage(score(records, sentimet_translator), queue_size, 'score')
+    with ResultsSink(results_path, ud_format_path, checkpoint, resume, chunk_size, output_format) as sink:
+        for record in records:
+            sink.write(record)
+    return sink.count, sink.tokens
@@ -0,0 +1,192 @@
+import os
+import csv
+import conllu
+import multiprocessing
+import numpy as np
+from sentiment_pipeline import UD_FORMAT_PATH, RESULT_COLUMNS, WRITE_CHUNK_SIZE, get_token_list_sentiment_score
+from sentiment_translator import SentimentTranslator
+import shared_lexicon
+from sentiment_lexicon import Sentiment
+from conllu_corpus import ConlluCorpus
+
+# number of sentences sent to a worker at a time
+SHARD_SIZE = 200
+
+# the translator of the current worker process, and the lexicon it uses
+WORKER_TRANSLATOR = None
+WORKER_NAIVE = None
+WORKER_SHARED = None
+
+def read_ud_sentences(path):
+    """
+    Read a CoNLL-U file a sentence at a time, splitting it on the blank lines between sentences.
+
+    Yields:
+        sentence (String): the lines of a sentence, with its metadata
+    """
+    lines = []
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip() == '':
+                if len(lines) > 0:
+                    yield ''.join(lines) + '\n'
+                    lines = []
+            else:
+                lines.append(line)
+    if len(lines) > 0:
+        yield ''.join(lines) + '\n'
+
+def shard_sentences(sentences, shard_size=SHARD_SIZE):
+    """
+    Group sentences into shards of shard_size sentences, in order
+    """
+    shard = []
+    for sentence in sentences:
+        shard.append(sentence)
+        if len(shard) == shard_size:
+            yield shard
+            shard = []
+    if len(shard) > 0:
+        yield shard
+
+def score_token_list(token_list, sentimet_translator):
+    """
+    Score a parsed sentence with sentiment metadata.
+
+    Returns:
+        result (Tuple): the sentence text, its gold sentiment and its model sentiment
+    """
+    return (token_list.metadata['text'], int(token_list.metadata['sentiment']), get_token_list_sentiment_score(token_list, sentimet_translator))
+
+def init_worker(naive, shared=False):
+    """
+    Load the translator of a worker process, once.
+    A worker started with fork already has the translator of the parent process (shared copy-on-write), and does not load it again.
+    If shared is true, the translator reads the lexicons in place from the shared lexicon file (see shared_lexicon.open_shared()), so all workers share a single copy of them.
+    """
+    global WORKER_TRANSLATOR, WORKER_NAIVE, WORKER_SHARED
+    if WORKER_TRANSLATOR is None or WORKER_NAIVE != naive or WORKER_SHARED != shared:
+        WORKER_TRANSLATOR = SentimentTranslator(naive, shared=shared_lexicon.open_shared() if shared else None)
+        WORKER_NAIVE = naive
+        WORKER_SHARED = shared
+
+def score_shard(shard):
+    """
+    Score a shard of CoNLL-U sentences in a worker process.
+
+    Returns:
+        results (List): the result of each sentence, in order
+    """
+    return [score_token_list(conllu.parse(sentence)[0], WORKER_TRANSLATOR) for sentence in shard]
+
+def score_ud_file(path, naive, workers=None, shard_size=SHARD_SIZE, shared=False):
+    """
+    Score all sentences of a CoNLL-U file with sentiment metadata, on a pool of processes.
+    The file is read and sharded by sentences in the main process, every worker scores whole shards, and the results are merged in file order.
+
+    Args:
+        path (String): path of a sentiment CoNLL-U file, like sentiment_in_UD_format_dev.txt
+        naive (Bool): if true, use naive lexicon. Otherwise, use a rule based lexicon
+        workers (Int): number of worker processes. None means the number of cores.
+        shard_size (Int): number of sentences sent to a worker at a time
+        shared (Bool): if true, the workers read the lexicons from the shared lexicon file, instead of each holding a copy of them (see init_worker())
+    Yields:
+        result (Tuple): the sentence text, its gold sentiment and its model sentiment, in file order
+    """
+    workers = workers or os.cpu_count()
+    if 'fork' in multiprocessing.get_all_start_methods():
+        # load the lexicon once in the main process, the forked workers share its memory until they write to it
+        context = multiprocessing.get_context('fork')
+        init_worker(naive, shared)
+    else:
+        # every spawned worker loads the compiled lexicon once, when it starts
+        context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=init_worker, initargs=(naive, shared)) as pool:
+        for results in pool.imap(score_shard, shard_sentences(read_ud_sentences(path), shard_size)):
+            yield from results
+
+def score_ud_file_incr(path, sentimet_translator):
+    """
+    Score all sentences of a CoNLL-U file with sentiment metadata in this process, parsing the file incrementally.
+
+    Yields:
+        result (Tuple): the sentence text, its gold sentiment and its model sentiment, in file order
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        for token_list in conllu.parse_incr(file):
+            yield score_token_list(token_list, sentimet_translator)
+
+def rescore(splits, naive, results_path, ud_format_path=UD_FORMAT_PATH, workers=1, chunk_size=WRITE_CHUNK_SIZE, compact=False, shared=False):
+    """
+    Score the sentiment CoNLL-U files of the given splits again, without analysing the sentences, and write a results csv file.
+
+    Args:
+        splits (List): names of the splits to score
+        naive (Bool): if true, use naive lexicon. Otherwise, use a rule based lexicon
+        results_path (String): path of the results csv file
+        ud_format_path (String): path pattern of the CoNLL-U files, with {split} in place of the split name
+        workers (Int): number of worker processes. 1 scores in this process.
+        chunk_size (Int): number of results written at a time
+        compact (Bool): if true, load every file into a ConlluCorpus and score it at once, in this process.
+        shared (Bool): if true, read the lexicons from the shared lexicon file, so the workers do not hold a copy of them each.
+    Returns:
+        count (Int): number of scored sentences
+    """
+    sentimet_translator = SentimentTranslator(naive) if workers == 1 or compact else None
+    count = 0
+    with open(results_path, 'w', encoding='utf-8-sig', newline='') as results_file:
+        results_writer = csv.writer(results_file)
+        results_writer.writerow(RESULT_COLUMNS)
+        for split in splits:
+            path = ud_format_path.format(split=split)
+            if compact:
+                results = score_ud_file_compact(path, sentimet_translator)
+            elif workers == 1:
+                results = score_ud_file_incr(path, sentimet_translator)
+            else:
+                results = score_ud_file(path, naive, workers, shared=shared)
+            rows = []
+            for sentence, sentiment, model_sentiment in results:
+                rows.append([sentence, sentiment, model_sentiment, split, str(sentiment == model_sentiment).upper()])
+                count += 1
+                if len(rows) == chunk_size:
+                    results_writer.writerows(rows)
+                    rows = []
+            results_writer.writerows(rows)
+    return count
+
+def get_corpus_feats(corpus):
+    """
+    Gets the feats of every token of a corpus in the format needed for SentimentTranslator: the feats column as written, and '_' for a token without feats.
+    """
+    feats = corpus.column('feats')
+    feats[feats == -1] = '_'
+    return feats
+
+def score_corpus(corpus, sentimet_translator):
+    """
+    Score every sentence of a ConlluCorpus at once: the sentiment of every distinct token is calculated once, and the counts of every sentence are summed over its range of tokens.
+    Gives the same scores as get_token_list_sentiment_score on each sentence.
+
+    Returns:
+        model_sentiments (np.ndarray): the model sentiment of each sentence
+    """
+    words_sentiment = sentimet_translator.translate_batch(corpus.column('lemma'), corpus.column('upos'), get_corpus_feats(corpus))
+    polarity = (words_sentiment == Sentiment.POSITIVE.value).astype(np.int64) - (words_sentiment == Sentiment.NEGATIVE.value)
+    # the sum of polarity over the tokens of every sentence, with empty sentences left at 0
+    sums = np.concatenate([[0], np.cumsum(polarity)])
+    sentence_scores = sums[corpus.offsets[1:]] - sums[corpus.offsets[:-1]]
+    return np.select([sentence_scores < 0, sentence_scores > 0], [Sentiment.NEGATIVE.value, Sentiment.POSITIVE.value], Sentiment.NEUTRAL.value)
+
+def score_ud_file_compact(path, sentimet_translator):
+    """
+    Score all sentences of a CoNLL-U file with sentiment metadata through a ConlluCorpus.
+
+    Returns:
+        results (List): the sentence text, its gold sentiment and its model sentiment of each sentence, in file order
+    """
+    corpus = ConlluCorpus.from_file(path)
+    model_sentiments = score_corpus(corpus, sentimet_translator)
+    sentences = corpus.get_metadata_column('text')
+    sentiments = corpus.get_metadata_column('sentiment')
+    return [(sentence, int(sentiment), int(model_sentiment)) for sentence, sentiment, model_sentiment in zip(sentences, sentiments, model_sentiments)]
@@ -0,0 +1,247 @@
+from array import array
+
+# the ten CoNLL-U columns, in order
+COLUMNS = ('id', 'form', 'lemma', 'upos', 'xpos', 'feats', 'head', 'deprel', 'deps', 'misc')
+
+class StringTable:
+    """
+    Interns the strings of a column: every distinct string is stored once, and tokens keep its integer ID.
+
+    Attributes:
+        values (List): the string of each ID.
+        ids (Dictionary): the ID of each string.
+    """
+    def __init__(self, values=None):
+        self.values = []
+        self.ids = {}
+        for value in values or []:
+            self.intern(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        """
+        Gets the ID of a string, adding it to the table if it is new
+        """
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.values)
+            self.ids[value] = string_id
+            self.values.append(value)
+        return string_id
+
+    def lookup(self, value):
+        """
+        Gets the ID of a string. If the string is not in the table, return -1
+        """
+        return self.ids.get(value, -1)
+
+    def decode(self, ids):
+        """
+        Gets the strings of many IDs at once.
+
+        Args:
+            ids (np.ndarray): IDs of this table. -1 marks a missing value.
+        Returns:
+            values (np.ndarray): object array with the string of each ID, and -1 for a missing value.
+        """
+        import numpy as np
+        # the last element is the value of ID -1
+        values = np.empty(len(self.values) + 1, dtype=object)
+        values[:-1] = self.values
+        values[-1] = -1
+        return values[ids]
+
+def parse_comment(line):
+    """
+    Parse a CoNLL-U comment line like conllu does: "# key = value" gives (key, value).
+    A comment without a key or a value, like "# text =" or "# sent_id", is not metadata: return -1
+    """
+    comment = line[1:].strip()
+    if '=' not in comment:
+        return -1
+    key, value = (part.strip() for part in comment.split('=', 1))
+    if key == '' or value == '':
+        return -1
+    return key, value
+
+def split_sentences(lines):
+    """
+    Group lines of CoNLL-U text into sentences, on the blank lines between them.
+
+    Yields:
+        comments (List): the comment lines of the sentence, without the '#'
+        rows (List): the fields of each token line of the sentence
+    """
+    comments = []
+    rows = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.strip() == '':
+            if len(comments) > 0 or len(rows) > 0:
+                yield comments, rows
+                comments = []
+                rows = []
+        elif line.startswith('#'):
+            comments.append(line[1:])
+        else:
+            rows.append(line.split('\t'))
+    if len(comments) > 0 or len(rows) > 0:
+        yield comments, rows
+
+class ConlluCorpus:
+    """
+    A compact, columnar CoNLL-U corpus: every column of every token is an interned ID in a single array for the whole corpus, and every sentence is a range of tokens.
+    Columns missing from a token line (Dicta writes lines with less than ten columns) have the ID -1, so the corpus is written back exactly as it was read.
+
+    Attributes:
+        tables (Dictionary): the StringTable of each column.
+        tokens (Dictionary): the np.int32 ID array of each column, with one element for every token of the corpus.
+        offsets (np.ndarray): the first token of each sentence, followed by the total number of tokens. Sentence i has the tokens offsets[i]:offsets[i + 1].
+        comments (List): the comment lines of each sentence, without the '#'.
+    """
+    def __init__(self, tables, tokens, offsets, comments):
+        self.tables = tables
+        self.tokens = tokens
+        self.offsets = offsets
+        self.comments = comments
+
+    def __len__(self):
+        return len(self.comments)
+
+    @property
+    def count_tokens(self):
+        return int(self.offsets[-1])
+
+    @classmethod
+    def from_sentences(cls, sentences):
+        """
+        Build a corpus from parsed sentences.
+
+        Args:
+            sentences (Iterable): (comments, rows) of every sentence: its comment lines without the '#', and the fields of each token line
+        Returns:
+            corpus (ConlluCorpus)
+        """
+        import numpy as np
+        tables = {column: StringTable() for column in COLUMNS}
+        interns = [tables[column].intern for column in COLUMNS]
+        ids = [array('i') for _ in COLUMNS]
+        offsets = array('q', [0])
+        comments = []
+        count = 0
+        for sentence_comments, rows in sentences:
+            for fields in rows:
+                for column in range(len(COLUMNS)):
+                    ids[column].append(interns[column](fields[column]) if column < len(fields) else -1)
+            count += len(rows)
+            offsets.append(count)
+            comments.append(sentence_comments)
+        tokens = {column: np.frombuffer(ids[index], dtype=np.int32).copy() for index, column in enumerate(COLUMNS)}
+        return cls(tables, tokens, np.frombuffer(offsets, dtype=np.int64).copy(), comments)
+
+    @classmethod
+    def from_lines(cls, lines):
+        """
+        Build a corpus from the lines of CoNLL-U text. Sentences are separated by blank lines.
+
+        Args:
+            lines (Iterable): lines of CoNLL-U text, with or without line breaks
+        Returns:
+            corpus (ConlluCorpus)
+        """
+        return cls.from_sentences(split_sentences(lines))
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Build a corpus from CoNLL-U text
+        """
+        return cls.from_lines(text.split('\n'))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Build a corpus from a CoNLL-U file
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls.from_lines(file)
+
+    def sentence_slice(self, sentence_index):
+        """
+        Gets the range of tokens of a sentence
+        """
+        return slice(int(self.offsets[sentence_index]), int(self.offsets[sentence_index + 1]))
+
+    def sentence_lengths(self):
+        """
+        Gets the number of tokens of every sentence
+        """
+        import numpy as np
+        return np.diff(self.offsets)
+
+    def get_metadata(self, sentence_index):
+        """
+        Gets a sentence's metadata, parsed from its comments like conllu does.
+        """
+        pairs = (parse_comment('#' + comment) for comment in self.comments[sentence_index])
+        return dict(pair for pair in pairs if pair != -1)
+
+    def get_metadata_column(self, key):
+        """
+        Gets a metadata value of every sentence.
+        If a sentence has no such metadata, its value is -1
+        """
+        return [self.get_metadata(index).get(key, -1) for index in range(len(self))]
+
+    def column(self, column, tokens=slice(None)):
+        """
+        Gets the values of a column.
+
+        Args:
+            column (String): one of COLUMNS
+            tokens (Slice): range of tokens, all tokens by default
+        Returns:
+            values (np.ndarray): object array with the string of each token, and -1 where the token line has no such column.
+        """
+        return self.tables[column].decode(self.tokens[column][tokens])
+
+    def sentence_to_conllu(self, sentence_index, token_columns=None):
+        """
+        Serialize a sentence back to CoNLL-U text
+
+        Args:
+            sentence_index (Int): index of the sentence
+            token_columns (List): the decoded values of all columns for the whole corpus, to serialize many sentences without decoding again. None decodes only this sentence.
+        """
+        tokens = self.sentence_slice(sentence_index)
+        if token_columns is None:
+            token_columns = [self.column(column, tokens) for column in COLUMNS]
+        else:
+            token_columns = [values[tokens] for values in token_columns]
+        lines = ['#' + comment for comment in self.comments[sentence_index]]
+        for fields in zip(*token_columns):
+            lines.append('\t'.join(field for field in fields if isinstance(field, str)))
+        return '\n'.join(lines) + '\n\n'
+
+    def iter_conllu(self):
+        """
+        Serialize the corpus back to CoNLL-U text, a sentence at a time
+        """
+        token_columns = [self.column(column) for column in COLUMNS]
+        for index in range(len(self)):
+            yield self.sentence_to_conllu(index, token_columns)
+
+    def to_conllu(self):
+        """
+        Serialize the corpus back to CoNLL-U text
+        """
+        return ''.join(self.iter_conllu())
+
+    def write(self, path):
+        """
+        Write the corpus to a CoNLL-U file
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            file.writelines(self.iter_conllu())
@@ -2,14 +2,25 @@ import os
 import conllu 
 from io import open
 import copy
-import pandas as pd
 
 # Get the path of the relevant data
 SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))  
 DATA_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'trimmed.csv')
 
-# open data
-data = open(DATA_PATH, "r", encoding="utf-8")
+# data file, opened on first use
+DATA = None
+
+def get_data():
+    """
+    Opens the data file, once per process.
+
+    Returns:
+        DATA (TextIOWrapper): the data file
+    """
+    global DATA
+    if DATA is None:
+        DATA = open(DATA_PATH, "r", encoding="utf-8")
+    return DATA
 
 class ConlluParser: 
     """
@@ -90,4 +101,4 @@ class ConlluParser:
 # cunllu_df = pd.DataFrame(conllu_data.to_sentences(), columns=['sentence'])
 # cunllu_df.to_csv('hebrew_corpus_sentences_only.csv', index = False, encoding = 'utf-8-sig')
 # file_path = os.path.join(SCRIPT_PATH, '..', 'data\dicta_hebrew_corpus_raw', 'morph_normal_name2.tsv')
-# conllu_data_format = ConlluParser(file_path)
\ No newline at end of file
+# conllu_data_format = ConlluParser(file_path)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import os
+import mmap
+from conllu_corpus import ConlluCorpus
+
+UTF8_BOM = b'\xef\xbb\xbf'
+
+def clean_dicta_fields(fields):
+    """
+    Clean the fields of a single Dicta token line, in one pass.
+    Gives the same fields as dicta_api_utils.parse_ud_format() gives for the line.
+
+    Args:
+        fields (List): the tab separated fields of a token line
+    Returns:
+        fields (List): the cleaned fields
+    """
+    # replace all X's with _ as thay are parsing errors
+    fields = [field if index == 0 or not field.startswith('X') else '_' + field[1:] for index, field in enumerate(fields)]
+    # switch between lemma and lemmaVoc, and remove lemma without nikud. Like the regex, the line is left with an empty last field.
+    count = len(fields)
+    if count >= 8:
+        fields = fields[:count - 6] + [fields[count - 2]] + fields[count - 5:count - 2] + ['']
+    # remove tag "DictaNote", with everything after it but the last field
+    for index in range(1, len(fields) - 1):
+        if fields[index].startswith('DictaNote='):
+            fields = fields[:index] + ['_', fields[-1]]
+            break
+    return fields
+
+def read_sentences(path, dicta_cleanup=False):
+    """
+    Read a CoNLL-U file a sentence at a time, through a memory map of the file.
+    Only the current sentence is decoded and split into fields, so the whole file is never held as text.
+
+    Args:
+        path (String): path of a CoNLL-U file, like a MorphologyResults.ud tsv file or a sentiment UD file
+        dicta_cleanup (Bool): if true, clean every token line like dicta_api_utils.parse_ud_format()
+    Yields:
+        comments (List): the comment lines of the sentence, without the '#'
+        rows (List): the fields of each token line of the sentence
+    """
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = len(UTF8_BOM) if data[:len(UTF8_BOM)] == UTF8_BOM else 0
+            end = len(data)
+            comments = []
+            rows = []
+            while start < end:
+                stop = data.find(b'\n\n', start)
+                if stop == -1:
+                    stop = end
+                for line in data[start:stop].decode('utf-8').split('\n'):
+                    line = line.rstrip('\r')
+                    if line.strip() == '':
+                        # a blank line that is not "\n\n", like "\r\n\r\n"
+                        if len(comments) > 0 or len(rows) > 0:
+                            yield comments, rows
+                            comments = []
+                            rows = []
+                    elif line.startswith('#'):
+                        comments.append(line[1:])
+                    elif dicta_cleanup:
+                        rows.append(clean_dicta_fields(line.split('\t')))
+                    else:
+                        rows.append(line.split('\t'))
+                if len(comments) > 0 or len(rows) > 0:
+                    yield comments, rows
+                    comments = []
+                    rows = []
+                start = stop + 2
+
+def read_corpus(paths, dicta_cleanup=False):
+    """
+    Read CoNLL-U files into a single ConlluCorpus.
+
+    Args:
+        paths (List): paths of CoNLL-U files, read in order. A single path is also accepted.
+        dicta_cleanup (Bool): if true, clean every token line like dicta_api_utils.parse_ud_format()
+    Returns:
+        corpus (ConlluCorpus)
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    return ConlluCorpus.from_sentences(sentence for path in paths for sentence in read_sentences(path, dicta_cleanup))
@@ -1,52 +1,224 @@
 import os
-import pandas as pd
-import requests
-import json
 import conllu
 import re
+from dicta_client import DictaClient
+from dicta_cache import DictaCache
 
 # Get file path
 SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))  
 DATA_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'hebrew_corpus_sentences_only.csv')
 
-# open data
-data = pd.read_csv(DATA_PATH, encoding="utf-8")
-# print(data.loc[0, 'sentence'])
+# corpus sentences, opened on first use
+DATA = None
+
+def get_data():
+    """
+    Opens the corpus sentences as a DataFrame, once per process.
+
+    Returns:
+        DATA (pd.DataFrame): the corpus sentences
+    """
+    global DATA
+    if DATA is None:
+        # pandas is only needed to read the corpus, so it is not imported with the module
+        import pandas as pd
+        DATA = pd.read_csv(DATA_PATH, encoding="utf-8")
+    return DATA
+
+# print(get_data().loc[0, 'sentence'])
+
+# client used when a request does not name one, created on first use
+DEFAULT_CLIENT = None
+
+def get_default_client():
+    """
+    Gets the client shared by all requests that do not name a client. Its responses are cached on disk, so a rerun does not request the same sentences again.
+    """
+    global DEFAULT_CLIENT
+    if DEFAULT_CLIENT is None:
+        DEFAULT_CLIENT = DictaClient(cache=DictaCache())
+    return DEFAULT_CLIENT
+
+def parse_response(request_data, ud_format=True):
+    """
+    Parse the response of a morphological analysis request
+
+    Arg: 
+    request_data (List): A list of jsons returned from the request. 
+    ud_format (Bool): If to return a UD format 
+
+    Returns: 
+    request_data as is, or if ud_format=True, a parsed string in UD format, sutable for conllu. 
+    """
+    if ud_format == True:
+        request_data = request_data[0]['UD']
+        request_data = parse_ud_format(request_data)
+    return request_data
 
 # calling Dicta API
-def dicta_request(sentence, ud_format=True):
+def dicta_request(sentence, ud_format=True, client=None):
     """
     Sends a request for morphological analysis of a sentence
 
     Arg: 
     sentence (String): A sentence to preform morphological analysis on. 
     ud_format (Bool): If to return a UD format 
+    client (DictaClient): The client that sends the request. If None, use the default client.
 
     Returns: 
     A list of jsons with all the data returend from the request. 
     if ud_format=True, then return a parsed string in UD format, sutable for conllu. 
     """
-    headers = {'Content-Type': 'text/plain;charset=utf-8'}
-    params = {
-    "task" : "nakdan",
-    "genre" :"modern",
-    "apiKey" : "xxxx",
-    "data" : sentence,
-    "addmorph" : True,
-    "matchpartial" : True,  
-    "keepmetagim" : True ,
-    "keepqq" :True,
-    "freturnfullmorphstr": True,
-    "newjson": True, 
-    "keepnikud": True
-    }
-    r = requests.post("https://nakdan-5-3.loadbalancer.dicta.org.il/addnikud",headers=headers,json=params)
-    r.encoding= "UTF-8"
-    request_data = r.json()
-    if ud_format == True:
-        request_data = request_data[0]['UD']
-        request_data = parse_ud_format(request_data)
-    return request_data
+    client = get_default_client() if client is None else client
+    return parse_response(client.post(sentence), ud_format)
+
+def dicta_request_many(sentences, ud_format=True, client=None):
+    """
+    Sends requests for morphological analysis of many sentences, in parallel
+
+    Arg: 
+    sentences (List): Sentences to preform morphological analysis on. 
+    ud_format (Bool): If to return a UD format 
+    client (DictaClient): The client that sends the requests. If None, use the default client.
+
+    Returns: 
+    A list with the result of dicta_request for each sentence, in the given order.
+    """
+    client = get_default_client() if client is None else client
+    return [parse_response(request_data, ud_format) for request_data in client.post_many(sentences)]
+
+# A word that is sent between the sentences of a batch, and is analysed as a token of its own
+BATCH_SENTINEL = "SENTENCEBREAK"
+# maximal number of characters in the text of a single batch request
+MAX_BATCH_CHARS = 4000
+
+def pack_sentences(sentences, max_chars=MAX_BATCH_CHARS):
+    """
+    Pack sentences into batches, such that the text of each batch is at most max_chars long (a longer sentence is a batch of its own).
+
+    Returns:
+        batches (List): a list of lists of sentence indexes
+    """
+    separator_length = len(BATCH_SENTINEL) + 2
+    batches = []
+    batch_length = 0
+    for index, sentence in enumerate(sentences):
+        if len(batches) == 0 or batch_length + separator_length + len(sentence) > max_chars:
+            batches.append([])
+            batch_length = 0
+        else:
+            batch_length += separator_length
+        batches[-1].append(index)
+        batch_length += len(sentence)
+    return batches
+
+def join_batch(sentences):
+    """
+    Join the sentences of a batch into the text of a single request, with BATCH_SENTINEL lines between them
+    """
+    return f"\n{BATCH_SENTINEL}\n".join(sentence.replace('\n', ' ') for sentence in sentences)
+
+def renumber_token_line(fields, offset):
+    """
+    Subtract offset from the id (or ids range, like 3-4) of a token line
+    """
+    fields[0] = '-'.join(str(int(token_id) - offset) for token_id in fields[0].split('-'))
+    return '\t'.join(fields)
+
+def has_contiguous_ids(part):
+    """
+    Check that the token lines of a sentence are numbered 1, 2, 3... in order, and that every range line (like 3-4) covers tokens of the sentence.
+
+    Args:
+        part (List): the fields of each token line of the sentence, after renumbering
+    """
+    expected_id = 1
+    for fields in part:
+        token_ids = fields[0].split('-')
+        if not all(token_id.isdigit() for token_id in token_ids):
+            return False
+        if len(token_ids) == 1:
+            if int(token_ids[0]) != expected_id:
+                return False
+            expected_id += 1
+        elif int(token_ids[0]) != expected_id or int(token_ids[1]) < int(token_ids[0]):
+            return False
+    # a range can not end after the last token
+    return all(int(fields[0].split('-')[-1]) < expected_id for fields in part)
+
+def split_batch_ud(ud_format_batch, sentences):
+    """
+    Split the UD response of a batch into a UD response for each of its sentences, at the BATCH_SENTINEL tokens.
+    The token ids of each sentence start from 1, and its metadata is its own text.
+
+    Args:
+        ud_format_batch (String): the UD response of the batch, before parse_ud_format()
+        sentences (List): the sentences of the batch
+    Returns:
+        ud_format_sentences (List): a UD response for each sentence.
+        If the response does not split into exactly one non empty part per sentence, or the token ids of a part are not contiguous from 1
+        (for example, when Dicta restarts the ids inside a part it splits into more sentences), return -1.
+    """
+    parts = [[]]
+    for line in ud_format_batch.split('\n'):
+        if line == '' or line.startswith('#'):
+            continue
+        fields = line.split('\t')
+        if len(fields) > 1 and fields[1].strip() == BATCH_SENTINEL:
+            parts.append([])
+        else:
+            parts[-1].append(fields)
+    if len(parts) != len(sentences) or any(len(part) == 0 for part in parts):
+        return -1
+    ud_format_sentences = []
+    for sentence, part in zip(sentences, parts):
+        if not all(token_id.isdigit() for fields in part for token_id in fields[0].split('-')):
+            return -1
+        offset = min(int(fields[0].split('-')[0]) for fields in part) - 1
+        lines = [renumber_token_line(fields, offset) for fields in part]
+        if not has_contiguous_ids(part):
+            return -1
+        ud_format_sentences.append('\n'.join([f"# text = {sentence}"] + lines) + '\n\n')
+    return ud_format_sentences
+
+def dicta_request_batch(sentences, ud_format=True, client=None, max_chars=MAX_BATCH_CHARS):
+    """
+    Sends requests for morphological analysis of many sentences, packing many sentences into each request.
+    Sentences found in the client's cache are not sent, and the analysis of every sent sentence is cached on its own.
+    If the response of a batch does not align with its sentences, they are sent again one by one, and their own responses are cached.
+
+    Arg: 
+    sentences (List): Sentences to preform morphological analysis on. 
+    ud_format (Bool): If to return a UD format 
+    client (DictaClient): The client that sends the requests. If None, use the default client.
+    max_chars (Int): maximal number of characters in the text of a single request.
+
+    Returns: 
+    A list with the result of dicta_request for each sentence, in the given order.
+    """
+    client = get_default_client() if client is None else client
+    responses = [-1] * len(sentences)
+    if client.cache is not None:
+        responses = [client.cache.get(sentence, client.params) for sentence in sentences]
+    missing = [index for index, response in enumerate(responses) if response == -1]
+    batches = [[missing[i] for i in batch] for batch in pack_sentences([sentences[index] for index in missing], max_chars)]
+    batch_responses = client.send_many([join_batch([sentences[index] for index in batch]) for batch in batches])
+    unaligned = []
+    for batch, batch_response in zip(batches, batch_responses):
+        ud_format_sentences = split_batch_ud(batch_response[0]['UD'], [sentences[index] for index in batch])
+        if ud_format_sentences == -1:
+            unaligned.extend(batch)
+            continue
+        for index, ud_format_sentence in zip(batch, ud_format_sentences):
+            responses[index] = [{'UD': ud_format_sentence}]
+            if client.cache is not None:
+                client.cache.put(sentences[index], client.params, responses[index])
+    # the cache was already checked for these sentences, so they are sent without looking them up (and counting a miss) again
+    for index, response in zip(unaligned, client.send_many([sentences[index] for index in unaligned])):
+        responses[index] = response
+        if client.cache is not None:
+            client.cache.put(sentences[index], client.params, response)
+    return [parse_response(response, ud_format) for response in responses]
 
 def parse_ud_format(ud_format_sentence):
     """
@@ -66,7 +238,7 @@ def parse_ud_format(ud_format_sentence):
     conllu_format = re.sub(r'\t(DictaNote=.*)\t', r'\t_\t', conllu_format)
     return conllu_format
 
-# sentence = data.loc[0, 'sentence']
+# sentence = get_data().loc[0, 'sentence']
 # sentence = 'شكراً سيدي الرئيس على هذا الموقف الجريء תודה אדוני הנשיא על הגיבוי הנועז שמחת הרבה לבבות שבורים'
 # sentence = dicta_request(sentence, ud_format=False)[0]['UD']
 # sentence = parse_ud_format(sentence)
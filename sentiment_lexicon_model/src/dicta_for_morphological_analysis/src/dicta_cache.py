@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+
+# Get the path of the cache
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'dicta_cache.sqlite')
+
+# request parameters that do not change the analysis, and are left out of the key
+IGNORED_PARAMS = {'apiKey', 'data'}
+
+class DictaCacheMiss(Exception):
+    """
+    Raised by an offline cache when a sentence was never analysed.
+    """
+
+def normalize_sentence(sentence):
+    """
+    Normalize a sentence, so the same text with other white spaces or unicode composition shares a key.
+    """
+    return ' '.join(unicodedata.normalize('NFC', sentence).split())
+
+def cache_key(sentence, params):
+    """
+    Gets the key of a sentence analysis: a hash of the normalized sentence and of the request parameters.
+
+    Args:
+        sentence (String): the analysed sentence
+        params (Dictionary): parameters of the analysis request
+    Returns:
+        key (String): sha256 hex digest
+    """
+    params = {key: value for key, value in params.items() if key not in IGNORED_PARAMS}
+    content = json.dumps({'sentence': normalize_sentence(sentence), 'params': params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+class DictaCache:
+    """
+    A persistent cache of Dicta responses, stored in SQLite and keyed by cache_key().
+
+    Attributes:
+        path (String): path to the SQLite file.
+        max_entries (Int): maximal number of responses kept. When it is exceeded, the least recently used responses are removed. None means no limit.
+        offline (Bool): if true, a sentence missing from the cache raises DictaCacheMiss instead of being sent to Dicta.
+        hits (Int): number of lookups that found a response.
+        misses (Int): number of lookups that did not find a response.
+        evictions (Int): number of responses removed to keep the cache under max_entries.
+    """
+    def __init__(self, path=CACHE_PATH, max_entries=None, offline=False):
+        """
+        Open (or create) the cache file
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # the connection is shared by the threads of DictaClient
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, sentence TEXT, response TEXT, last_used REAL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.connection.commit()
+        self.size = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.size
+
+    def get(self, sentence, params):
+        """
+        Gets the cached response of a sentence.
+
+        Returns:
+            response (List): the jsons returned from Dicta for this sentence.
+            If the sentence is not in the cache, return -1, or raise DictaCacheMiss if the cache is offline.
+        """
+        key = cache_key(sentence, params)
+        with self.lock:
+            row = self.connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.connection.commit()
+        if row is None:
+            if self.offline:
+                raise DictaCacheMiss(sentence)
+            return -1
+        return json.loads(row[0])
+
+    def put(self, sentence, params, response):
+        """
+        Adds the response of a sentence to the cache, and removes the least recently used responses if the cache is full.
+        """
+        key = cache_key(sentence, params)
+        row = (key, sentence, json.dumps(response, ensure_ascii=False), time.time())
+        with self.lock:
+            if self.connection.execute("INSERT OR IGNORE INTO responses VALUES (?, ?, ?, ?)", row).rowcount == 1:
+                self.size += 1
+            else:
+                self.connection.execute("UPDATE responses SET sentence = ?, response = ?, last_used = ? WHERE key = ?", row[1:] + row[:1])
+            if self.max_entries is not None and self.size > self.max_entries:
+                extra = self.size - self.max_entries
+                self.connection.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)", (extra,))
+                self.size -= extra
+                self.evictions += extra
+            self.connection.commit()
+
+    def items(self):
+        """
+        Gets all cached responses, in the order they were added.
+
+        Returns:
+            items (List): the sentence and the response of every cached analysis
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT sentence, response FROM responses ORDER BY rowid").fetchall()
+        return [(sentence, json.loads(response)) for sentence, response in rows]
+
+    def stats(self):
+        """
+        Gets the cache counters.
+
+        Returns:
+            stats (Dictionary): hits, misses, hit rate, evictions and number of cached responses.
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups > 0 else 0.0, 'evictions': self.evictions, 'size': len(self)}
+
+    def close(self):
+        """
+        Close the cache file
+        """
+        with self.lock:
+            self.connection.close()
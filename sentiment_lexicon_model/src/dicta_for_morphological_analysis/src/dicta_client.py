@@ -0,0 +1,225 @@
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Dicta nakdan endpoint
+DICTA_URL = "https://nakdan-5-3.loadbalancer.dicta.org.il/addnikud"
+
+# parameters of a morphological analysis request, the sentence is sent as "data"
+DEFAULT_PARAMS = {
+    "task" : "nakdan",
+    "genre" :"modern",
+    "apiKey" : "xxxx",
+    "addmorph" : True,
+    "matchpartial" : True,
+    "keepmetagim" : True ,
+    "keepqq" :True,
+    "freturnfullmorphstr": True,
+    "newjson": True,
+    "keepnikud": True
+}
+
+# HTTP status codes worth another try: rate limited, or a busy / restarting server
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class RateLimiter:
+    """
+    A limiter that spaces calls evenly, shared by all threads.
+
+    Attributes:
+        interval (Float): minimal number of seconds between two calls. 0 means no limit.
+    """
+    def __init__(self, max_per_second=None):
+        """
+        Initialize the interval between calls
+
+        Args:
+            max_per_second (Float): maximal number of calls per second. None means no limit.
+        """
+        self.interval = 0 if not max_per_second else 1 / max_per_second
+        self.next_time = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """
+        Wait until the next call is allowed
+        """
+        if self.interval == 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            call_time = max(now, self.next_time)
+            self.next_time = call_time + self.interval
+        if call_time > now:
+            time.sleep(call_time - now)
+
+class DictaClient:
+    """
+    A client for the Dicta morphological analysis API, that keeps connections alive and sends requests from a pool of threads.
+
+    Attributes:
+        url (String): the Dicta endpoint.
+        params (Dictionary): parameters sent with every sentence.
+        max_workers (Int): maximal number of requests in flight at the same time.
+        max_retries (Int): number of retries of a failed request, before its error is raised.
+        backoff (Float): seconds to wait before the first retry, doubled for every other retry.
+        timeout (Float): seconds to wait for a response to a single request.
+        cache (DictaCache): cache of responses, checked before sending a request. None means no cache.
+    """
+    def __init__(self, url=DICTA_URL, api_key=None, max_workers=8, max_requests_per_second=None, max_retries=3, backoff=0.5, timeout=30, cache=None):
+        """
+        Initialize the client
+
+        Args:
+            url (String): the Dicta endpoint.
+            api_key (String): Dicta API key. If None, the key of DEFAULT_PARAMS is used.
+            max_workers (Int): maximal number of requests in flight at the same time.
+            max_requests_per_second (Float): maximal number of requests started per second. None means no limit.
+            max_retries (Int): number of retries of a failed request, before its error is raised.
+            backoff (Float): seconds to wait before the first retry, doubled for every other retry.
+            timeout (Float): seconds to wait for a response to a single request.
+            cache (DictaCache): cache of responses, checked before sending a request. None means no cache.
+        """
+        self.url = url
+        self.cache = cache
+        self.params = dict(DEFAULT_PARAMS)
+        if api_key is not None:
+            self.params['apiKey'] = api_key
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(max_requests_per_second)
+        # requests.Session is not thread safe, so every thread keeps its own session (and its own kept-alive connection)
+        self.local = threading.local()
+        self.sessions = []
+        self.sessions_lock = threading.Lock()
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_session(self):
+        """
+        Gets the session of the current thread
+        """
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            # requests is only needed to send requests, so analysis from a cache or offline does not import it
+            import requests
+            session = requests.Session()
+            session.headers.update({'Content-Type': 'text/plain;charset=utf-8'})
+            self.local.session = session
+            with self.sessions_lock:
+                self.sessions.append(session)
+        return session
+
+    def retry_delay(self, attempt, response=None):
+        """
+        Gets the number of seconds to wait before a retry: the Retry-After header if the server sent one, otherwise exponential backoff with jitter.
+        """
+        if response is not None and 'Retry-After' in response.headers:
+            try:
+                return float(response.headers['Retry-After'])
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    def post(self, text):
+        """
+        Gets the morphological analysis of a text from the cache, or sends a request for it.
+
+        Args:
+            text (String): text to preform morphological analysis on.
+        Returns:
+            A list of jsons with all the data returend from the request.
+        """
+        if self.cache is None:
+            return self.send(text)
+        # an offline cache raises DictaCacheMiss here, before anything is sent
+        response = self.cache.get(text, self.params)
+        if response == -1:
+            response = self.send(text)
+            self.cache.put(text, self.params, response)
+        return response
+
+    def send(self, text):
+        """
+        Sends a request for morphological analysis of a text, with retries.
+
+        Args:
+            text (String): text to preform morphological analysis on.
+        Returns:
+            A list of jsons with all the data returend from the request.
+        """
+        import requests
+        params = dict(self.params, data=text)
+        attempt = 0
+        while True:
+            self.rate_limiter.wait()
+            response = None
+            try:
+                response = self.get_session().post(self.url, json=params, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    response.encoding = "UTF-8"
+                    return response.json()
+                error = requests.HTTPError(f"{response.status_code} response from {self.url}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as connection_error:
+                error = connection_error
+            if attempt >= self.max_retries:
+                logger.error("request to %s failed after %d retries: %s", self.url, attempt, error)
+                raise error
+            delay = self.retry_delay(attempt, response)
+            logger.warning("request to %s failed (%s), retry %d in %.2fs", self.url, error, attempt + 1, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def post_many(self, texts):
+        """
+        Sends requests for morphological analysis of many texts, at most max_workers at a time.
+
+        Args:
+            texts (List): texts to preform morphological analysis on.
+        Returns:
+            A list with the response of each text, in the given order.
+        """
+        return self.map(self.post, texts)
+
+    def send_many(self, texts):
+        """
+        Sends requests for morphological analysis of many texts without using the cache, at most max_workers at a time.
+
+        Args:
+            texts (List): texts to preform morphological analysis on.
+        Returns:
+            A list with the response of each text, in the given order.
+        """
+        return self.map(self.send, texts)
+
+    def map(self, function, texts):
+        """
+        Calls function on every text from the pool of threads, and returns the results in the given order
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return list(self.executor.map(function, texts))
+
+    def close(self):
+        """
+        Stop the threads and close all connections
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        with self.sessions_lock:
+            for session in self.sessions:
+                session.close()
+            self.sessions = []
@@ -0,0 +1,129 @@
+import sys
+import numpy as np
+import pandas as pd
+from array import array
+
+# Universal Dependencies POS tags
+UPOS_TAGS = ('ADJ', 'ADP', 'ADV', 'AUX', 'CCONJ', 'DET', 'INTJ', 'NOUN', 'NUM', 'PART', 'PRON', 'PROPN', 'PUNCT', 'SCONJ', 'SYM', 'VERB', 'X')
+# sentiment values of the sentiment lexicon model results, and their names
+SENTIMENT_LABELS = (0, 1, 2)
+SENTIMENT_NAMES = ('positive', 'negative', 'neutral')
+
+class ConfusionMatrix:
+    """
+    Collects gold and predicted labels as arrays of label IDs, and evaluates them with a confusion matrix.
+    Labels that are not in the label list are counted together as "other": they are never a true positive, but they are a false positive or a false negative of the labels they meet.
+
+    Attributes:
+        labels (Tuple): the evaluated labels.
+        names (Tuple): a name for each label, used in the saved files.
+        gold (array): the gold label ID of every sample. len(labels) is the ID of "other".
+        predicted (array): the predicted label ID of every sample.
+        other_matches (Int): number of samples whose gold and predicted labels are both "other" and are the same label.
+    """
+    def __init__(self, labels, names=None):
+        self.labels = tuple(labels)
+        self.names = tuple(names) if names is not None else tuple(str(label) for label in labels)
+        self.ids = {label: index for index, label in enumerate(self.labels)}
+        self.gold = array('i')
+        self.predicted = array('i')
+        self.other_matches = 0
+
+    def __len__(self):
+        return len(self.gold)
+
+    def encode(self, labels):
+        """
+        Gets the label ID of every label
+        """
+        other = len(self.labels)
+        return array('i', [self.ids.get(label, other) for label in labels])
+
+    def add(self, gold, predicted):
+        """
+        Add samples.
+
+        Args:
+            gold (List): gold label of each sample
+            predicted (List): predicted label of each sample, in the same order
+        """
+        if len(gold) != len(predicted):
+            raise ValueError(f"got {len(gold)} gold labels and {len(predicted)} predicted labels")
+        self.gold.extend(self.encode(gold))
+        self.predicted.extend(self.encode(predicted))
+        # the "other" cell of the matrix mixes different labels, so the samples whose "other" labels are the same are counted here
+        self.other_matches += sum(1 for gold_label, predicted_label in zip(gold, predicted) if gold_label == predicted_label and gold_label not in self.ids)
+
+    def matrix(self):
+        """
+        Gets the confusion matrix, with "other" as the last row and column.
+
+        Returns:
+            matrix (np.ndarray): matrix[i, j] is the number of samples with gold label i that were predicted as label j.
+        """
+        size = len(self.labels) + 1
+        gold = np.frombuffer(self.gold, dtype=np.int32) if len(self.gold) > 0 else np.zeros(0, dtype=np.int32)
+        predicted = np.frombuffer(self.predicted, dtype=np.int32) if len(self.predicted) > 0 else np.zeros(0, dtype=np.int32)
+        return np.bincount(gold.astype(np.int64) * size + predicted, minlength=size * size).reshape(size, size)
+
+    def accuracy(self):
+        """
+        Gets the fraction of samples whose predicted label is the gold label. If there are no samples, return -1
+        Two labels that are "other" are a match only if they are the same label.
+        """
+        if len(self) == 0:
+            return -1
+        count = len(self.labels)
+        return float(np.trace(self.matrix()[:count, :count]) + self.other_matches) / len(self)
+
+    def metrics(self):
+        """
+        Gets the counts, precision, recall and F1 of every label, from the confusion matrix.
+        A precision, recall or F1 with a zero denominator is 0.
+
+        Returns:
+            metrics (pd.DataFrame): a row for each label, with the columns: label, tp, fp, fn, tn, support, precision, recall, f1.
+        """
+        matrix = self.matrix()
+        count = len(self.labels)
+        tp = np.diag(matrix)[:count]
+        fp = matrix[:, :count].sum(axis=0) - tp
+        fn = matrix[:count, :].sum(axis=1) - tp
+        tn = matrix.sum() - tp - fp - fn
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+            recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        return pd.DataFrame({'label': self.names, 'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn, 'support': tp + fn, 'precision': precision, 'recall': recall, 'f1': f1})
+
+    def save(self, path_prefix):
+        """
+        Save the evaluation: <path_prefix>_confusion.npy and <path_prefix>_confusion.csv with the confusion matrix, and <path_prefix>_metrics.csv with the metrics of every label.
+        """
+        matrix = self.matrix()
+        np.save(f"{path_prefix}_confusion.npy", matrix)
+        names = list(self.names) + ['other']
+        pd.DataFrame(matrix, index=pd.Index(names, name='gold'), columns=names).to_csv(f"{path_prefix}_confusion.csv", encoding='utf-8')
+        self.metrics().to_csv(f"{path_prefix}_metrics.csv", index=False, encoding='utf-8')
+
+def evaluate_sentiment_results(path):
+    """
+    Evaluate a sentiment_lexicon_model_results csv file.
+
+    Args:
+        path (String): path of a results file, with the columns sentiment and model_sentiment
+    Returns:
+        confusion (ConfusionMatrix): the gold and model sentiments of all sentences
+    """
+    results = pd.read_csv(path, usecols=['sentiment', 'model_sentiment'], encoding='utf-8-sig').dropna()
+    confusion = ConfusionMatrix(SENTIMENT_LABELS, SENTIMENT_NAMES)
+    confusion.add(results['sentiment'].astype(int).tolist(), results['model_sentiment'].astype(int).tolist())
+    return confusion
+
+if __name__ == '__main__':
+    # evaluate sentiment results files, and save their confusion matrix and metrics next to them
+    for path in sys.argv[1:]:
+        confusion = evaluate_sentiment_results(path)
+        confusion.save(path.rsplit('.', 1)[0])
+        print(f"{path}: {len(confusion)} sentences, accuracy {confusion.accuracy():.4f}")
+        print(confusion.metrics().to_string(index=False))
@@ -0,0 +1,26 @@
+import unicodedata
+
+# letters that can be attached to the beginning of an hebrew word: ו, ה, ב, ל, מ, ש, כ
+PREFIX_LETTERS = 'והבלמשכ'
+# maximal number of prefix letters removed from a word (for example: ו+ש+ב), so every word needs at most this number of lookups
+MAX_PREFIX_LETTERS = 3
+# minimal number of letters left in the stem
+MIN_STEM_LETTERS = 2
+
+def strip_niqqud(word):
+    """
+    Normalize an hebrew word for lookup: remove nikud, dagesh, shin/sin dots and cantillation marks, and normalize the unicode composition.
+
+    Returns:
+        normalized_word (String): the word with letters only. If word is not a string, return -1.
+    """
+    if not isinstance(word, str):
+        return -1
+    return unicodedata.normalize('NFC', ''.join(char for char in unicodedata.normalize('NFD', word) if not unicodedata.combining(char)))
+
+def is_prefix_letter(letter):
+    """
+    Check if a letter (with the nikud marks that follow it) is a single prefix letter. A nikud mark with no letter before it is not a letter.
+    """
+    letter = strip_niqqud(letter)
+    return len(letter) == 1 and letter in PREFIX_LETTERS
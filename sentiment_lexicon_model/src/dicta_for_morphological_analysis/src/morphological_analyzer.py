@@ -0,0 +1,263 @@
+import os
+import re
+import glob
+from abc import ABC, abstractmethod
+from collections import Counter
+import dicta_api_utils as dicta
+from conllu_corpus import split_sentences
+from conllu_reader import read_sentences, clean_dicta_fields
+from hebrew_letters import MAX_PREFIX_LETTERS, MIN_STEM_LETTERS, strip_niqqud, is_prefix_letter
+
+# Get the path of the raw Dicta analyses
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+RAW_CORPUS_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'dicta_hebrew_corpus_raw')
+# a word (with nikud, and with inner quotes or geresh, like צה"ל), or a single punctuation mark, like Dicta splits a sentence
+WORD_LETTERS = r'(?:[^\W_]|[\u0591-\u05bd\u05bf\u05c1\u05c2\u05c4\u05c5\u05c7])+'
+WORD_PATTERN = re.compile(WORD_LETTERS + r'(?:["\'״׳]' + WORD_LETTERS + r')*|[^\w\s]|_')
+
+class MorphologicalAnalyzer(ABC):
+    """
+    The interface of a morphological analysis backend: gets sentences, and returns their analysis like dicta_api_utils.dicta_request() does.
+    A backend implements analyze(), and analyze_batch() if it can analyse many sentences faster than one by one.
+    """
+    @abstractmethod
+    def analyze(self, sentence, ud_format=True):
+        """
+        Analyse a sentence.
+
+        Args:
+            sentence (String): A sentence to preform morphological analysis on.
+            ud_format (Bool): If to return a UD format
+        Returns:
+            A list of jsons, with the analysis in UD format in 'UD'.
+            if ud_format=True, then return a parsed string in UD format, sutable for conllu.
+        """
+
+    def analyze_batch(self, sentences, ud_format=True):
+        """
+        Analyse many sentences.
+
+        Returns:
+            A list with the result of analyze() for each sentence, in the given order.
+        """
+        return [self.analyze(sentence, ud_format) for sentence in sentences]
+
+    def __call__(self, sentences):
+        """
+        Analyse many sentences in UD format, so an analyzer can be used as the analyze_batch function of the sentiment pipeline
+        """
+        return self.analyze_batch(sentences)
+
+class DictaAnalyzer(MorphologicalAnalyzer):
+    """
+    Analysis by the Dicta API, through a DictaClient.
+
+    Attributes:
+        client (DictaClient): The client that sends the requests. If None, use the default client of dicta_api_utils.
+    """
+    def __init__(self, client=None):
+        self.client = client
+
+    def analyze(self, sentence, ud_format=True):
+        return dicta.dicta_request(sentence, ud_format, self.client)
+
+    def analyze_batch(self, sentences, ud_format=True):
+        return dicta.dicta_request_batch(sentences, ud_format, self.client)
+
+def shift_ids(fields, offset):
+    """
+    Copy the fields of a token line, with offset added to its id (or ids range, like 3-4)
+    """
+    return ['-'.join(str(int(token_id) + offset) for token_id in fields[0].split('-'))] + fields[1:]
+
+def split_words(rows):
+    """
+    Group the token lines of a Dicta sentence by the surface word they analyse: a range line (like 3-4) with the token lines it covers, or a single token line.
+    Dicta sometimes puts a few words with the punctuation and the spaces between them in a single range (like ", יֵשׁ"), so the token lines of such a range are words of their own.
+    Spaces are not words.
+
+    Yields:
+        form (String): the surface form of the word, with nikud
+        rows (List): the fields of the token lines of the word
+    """
+    index = 0
+    while index < len(rows):
+        token_id = rows[index][0]
+        form = rows[index][1] if len(rows[index]) > 1 else ''
+        end = index + 1
+        if '-' in token_id:
+            last_id = int(token_id.split('-')[1])
+            while end < len(rows) and '-' not in rows[end][0] and '.' not in rows[end][0] and int(rows[end][0]) <= last_id:
+                end += 1
+            if len(WORD_PATTERN.findall(form)) != 1:
+                yield from split_words(rows[index + 1:end])
+                index = end
+                continue
+        if form.strip() != '':
+            yield form, rows[index:end]
+        index = end
+
+class LocalAnalyzer(MorphologicalAnalyzer):
+    """
+    An offline analyzer, built from sentences that Dicta already analysed.
+    Every surface word is analysed as the analysis Dicta gave it most often, so scoring can run without requests at in-process speed.
+    Unlike Dicta, a word is analysed without its context. A word that was never analysed is split into prefix letters and a known word if it can be,
+    and otherwise gets an analysis with an undefined tag.
+
+    Attributes:
+        analyses (Dictionary): a word without nikud to a Counter of its analyses. An analysis is a tuple of token lines, with ids from 1.
+        prefixes (Dictionary): a prefix letter to a Counter of its analyses as a token of a longer word, without the id.
+        best (Dictionary): a word without nikud to its most frequent analysis, as lists of fields.
+        best_prefixes (Dictionary): a prefix letter to its most frequent analysis, as a list of fields without the id.
+        hits (Int): number of analysed words that were found.
+        misses (Int): number of analysed words that were never analysed by Dicta.
+    """
+    def __init__(self):
+        self.analyses = {}
+        self.prefixes = {}
+        self.best = {}
+        self.best_prefixes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.analyses)
+
+    def add_sentence(self, rows):
+        """
+        Add the analysis of every word of a Dicta sentence.
+
+        Args:
+            rows (List): the fields of each token line of the sentence, as Dicta returned them (before dicta_api_utils.parse_ud_format())
+        """
+        for form, word_rows in split_words(rows):
+            if form == '' or not word_rows[0][0].split('-')[0].isdigit():
+                continue
+            offset = 1 - int(word_rows[0][0].split('-')[0])
+            analysis = tuple('\t'.join(shift_ids(fields, offset)) for fields in word_rows)
+            self.analyses.setdefault(strip_niqqud(form), Counter())[analysis] += 1
+            # the prefix letters of the word are all of its tokens but the last
+            for fields in word_rows[1:-1]:
+                if len(fields) > 1 and is_prefix_letter(fields[1]):
+                    self.prefixes.setdefault(strip_niqqud(fields[1]), Counter())['\t'.join(fields[1:])] += 1
+        self.best = {}
+
+    def add_response(self, response):
+        """
+        Add the sentences of a Dicta response (a list of jsons, with the analysis in UD format in 'UD')
+        """
+        for _, rows in split_sentences(response[0]['UD'].split('\n')):
+            self.add_sentence(rows)
+
+    @classmethod
+    def from_corpus(cls, paths=None):
+        """
+        Build an analyzer from Dicta analyses saved in CoNLL-U files.
+
+        Args:
+            paths (List): paths of MorphologyResults.ud tsv files. If None, all files of dicta_hebrew_corpus_raw.
+        Returns:
+            analyzer (LocalAnalyzer)
+        """
+        if paths is None:
+            paths = sorted(glob.glob(os.path.join(RAW_CORPUS_PATH, '*.tsv')))
+        analyzer = cls()
+        for path in paths:
+            for _, rows in read_sentences(path):
+                analyzer.add_sentence(rows)
+        return analyzer
+
+    @classmethod
+    def from_cache(cls, cache, paths=()):
+        """
+        Build an analyzer from the responses of a DictaCache, and from Dicta analyses saved in CoNLL-U files.
+
+        Args:
+            cache (DictaCache): cache of Dicta responses
+            paths (List): paths of MorphologyResults.ud tsv files
+        Returns:
+            analyzer (LocalAnalyzer)
+        """
+        analyzer = cls.from_corpus(paths)
+        for _, response in cache.items():
+            analyzer.add_response(response)
+        return analyzer
+
+    def build_best(self):
+        """
+        Choose the most frequent analysis of every word and of every prefix letter, if they were not chosen since the last added sentence
+        """
+        if len(self.best) == 0:
+            self.best = {key: [line.split('\t') for line in counter.most_common(1)[0][0]] for key, counter in self.analyses.items()}
+            self.best_prefixes = {letter: counter.most_common(1)[0][0].split('\t') for letter, counter in self.prefixes.items()}
+
+    def get_best(self, word):
+        """
+        Gets the most frequent analysis of a word, with the first seen analysis winning a tie.
+        If the word was never analysed, return -1
+        """
+        self.build_best()
+        return self.best.get(strip_niqqud(word), -1)
+
+    def split_prefix(self, word):
+        """
+        Split prefix letters from a word that was never analysed, shortest prefix first, until the rest of the word is a known word.
+        The prefix letters and the tokens of the known word are covered by a single range line, like Dicta analyses "וּבַבַּיִת".
+
+        Returns:
+            rows (List): the fields of the token lines of the word, with ids from 1. If no prefix leaves a known word, return -1
+        """
+        self.build_best()
+        letters = strip_niqqud(word)
+        for prefix_length in range(1, MAX_PREFIX_LETTERS + 1):
+            if len(letters) - prefix_length < MIN_STEM_LETTERS or letters[prefix_length - 1] not in self.best_prefixes:
+                return -1
+            stem_rows = self.get_best(letters[prefix_length:])
+            if stem_rows == -1:
+                continue
+            # a known word with a range of its own is joined into the range of the whole word
+            if '-' in stem_rows[0][0]:
+                stem_rows = stem_rows[1:]
+            token_rows = [[str(number)] + self.best_prefixes[letter] for number, letter in enumerate(letters[:prefix_length], start=1)]
+            token_rows.extend(shift_ids(fields, prefix_length) for fields in stem_rows)
+            return [[f"1-{len(token_rows)}", word, '_', '_', '_', '_']] + token_rows
+        return -1
+
+    def analyze_word(self, word):
+        """
+        Gets the token lines of a word, with ids from 1
+        """
+        word_rows = self.get_best(word)
+        if word_rows == -1:
+            word_rows = self.split_prefix(word)
+        if word_rows != -1:
+            self.hits += 1
+            return word_rows
+        self.misses += 1
+        if re.fullmatch(r'[^\w\s]|_', word):
+            return [['1', word, '', 'PUNCT', 'PUNCT', '', word, '_']]
+        return [['1', word, word, 'X', 'X', '_', word, '_']]
+
+    def analyze(self, sentence, ud_format=True):
+        lines = [f"# text = {sentence}"]
+        offset = 0
+        for word in WORD_PATTERN.findall(sentence):
+            word_rows = self.analyze_word(word)
+            for fields in word_rows:
+                fields = shift_ids(fields, offset)
+                lines.append('\t'.join(clean_dicta_fields(fields) if ud_format else fields))
+            offset += max(int(token_id) for token_id in word_rows[-1][0].split('-'))
+        ud_format_sentence = '\n'.join(lines) + '\n\n'
+        if ud_format == True:
+            return ud_format_sentence
+        return [{'UD': ud_format_sentence}]
+
+    def stats(self):
+        """
+        Gets the lookup counters.
+
+        Returns:
+            stats (Dictionary): hits, misses, hit rate and number of known words.
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups > 0 else 0.0, 'size': len(self)}
@@ -0,0 +1,82 @@
+import unicodedata
+from difflib import SequenceMatcher
+
+# Alignment of the tokens of two analyses of the same sentence (the treebank and Dicta), when they split the sentence into a different number of tokens.
+# Tokens with the same surface form are anchors, and the tokens between two anchors are paired by position only if both sides have the same number of them.
+
+def normalize_form(form):
+    """
+    Normalize a surface form for comparison: remove nikud and cantillation marks, and the "_" marking a prefix or a suffix (like "ב_" or "_של_").
+    """
+    if not isinstance(form, str):
+        return ''
+    return ''.join(char for char in unicodedata.normalize('NFD', form) if char != '_' and not unicodedata.combining(char))
+
+def align_tokens(gold_forms, predicted_forms):
+    """
+    Align two token sequences of a sentence by their surface forms.
+    Sequences of the same length are aligned by position, like comparing them token by token.
+
+    Args:
+        gold_forms (List): surface form of each gold token
+        predicted_forms (List): surface form of each predicted token
+    Returns:
+        pairs (List): (gold index, predicted index) of every aligned pair of tokens, in order.
+    """
+    if len(gold_forms) == len(predicted_forms):
+        return list(zip(range(len(gold_forms)), range(len(predicted_forms))))
+    matcher = SequenceMatcher(None, [normalize_form(form) for form in gold_forms], [normalize_form(form) for form in predicted_forms], autojunk=False)
+    pairs = []
+    for operation, gold_start, gold_end, predicted_start, predicted_end in matcher.get_opcodes():
+        # equal forms, or a gap with the same number of tokens on both sides
+        if operation == 'equal' or (operation == 'replace' and gold_end - gold_start == predicted_end - predicted_start):
+            pairs.extend(zip(range(gold_start, gold_end), range(predicted_start, predicted_end)))
+    return pairs
+
+class AlignmentCoverage:
+    """
+    Counts how much of the compared sentences was aligned.
+
+    Attributes:
+        sentences (Int): number of compared sentences.
+        equal_length_sentences (Int): number of sentences with the same number of tokens on both sides.
+        aligned_sentences (Int): number of sentences with at least one aligned token.
+        gold_tokens (Int): number of gold tokens.
+        aligned_tokens (Int): number of aligned gold tokens.
+        equal_length_tokens (Int): number of gold tokens in equal length sentences, the tokens compared without alignment.
+    """
+    def __init__(self):
+        self.sentences = 0
+        self.equal_length_sentences = 0
+        self.aligned_sentences = 0
+        self.gold_tokens = 0
+        self.aligned_tokens = 0
+        self.equal_length_tokens = 0
+
+    def add(self, gold_length, predicted_length, pairs):
+        """
+        Add the alignment of a sentence
+        """
+        self.sentences += 1
+        if gold_length == predicted_length:
+            self.equal_length_sentences += 1
+            self.equal_length_tokens += gold_length
+        self.aligned_sentences += len(pairs) > 0
+        self.gold_tokens += gold_length
+        self.aligned_tokens += len(pairs)
+
+    def report(self):
+        """
+        Gets the coverage counters.
+
+        Returns:
+            report (Dictionary): the counters, the token coverage (aligned tokens out of all gold tokens), and the token coverage of comparing equal length sentences only.
+        """
+        return {'sentences': self.sentences,
+                'equal_length_sentences': self.equal_length_sentences,
+                'aligned_sentences': self.aligned_sentences,
+                'gold_tokens': self.gold_tokens,
+                'aligned_tokens': self.aligned_tokens,
+                'equal_length_tokens': self.equal_length_tokens,
+                'coverage': self.aligned_tokens / self.gold_tokens if self.gold_tokens > 0 else 0.0,
+                'equal_length_coverage': self.equal_length_tokens / self.gold_tokens if self.gold_tokens > 0 else 0.0}
@@ -0,0 +1,105 @@
+from conllu.models import Token, TokenList
+
+# Normalization of token lists before comparing a Dicta analysis to a UD treebank sentence.
+# A token rule looks at a single token. A context rule also looks at its neighbours: the tokens kept by the token rules, and the normalized tokens before it.
+
+# Dicta forms of "ב" and "ל" that can come before a redundant "ה"
+PREPOSITION_FORMS = {'ב', 'ל', 'לְ', 'בְּ', 'לַ', 'בַּ', 'בָּ'}
+# forms of a redundant "ה"
+THE_FORMS = {'_ה_', '_ה', 'ה_'}
+
+def is_composed(token):
+    """
+    A "continues" token (with id type: int-int)
+    """
+    return type(token['id']) == tuple
+
+def is_punctuation(token):
+    """
+    A token with a PUNCT tag
+    """
+    return token['upos'] == 'PUNCT'
+
+def is_undefined(token):
+    """
+    A token with an undefined upos tag
+    """
+    return token['upos'] == 'X' or token['upos'] == '_'
+
+def is_possessive_the(tokens, index, normalized):
+    """
+    Redundent "the" when deconstracting Possesives. for example: באפשרותו -> ב ה אפשרות שלו <- ב אפשרות שלו
+    Remove "ה" before "של". need to remove in all cases
+    """
+    return tokens[index]['form'] == '_ה_' and index + 2 < len(tokens) and tokens[index + 2]['form'] == '_של_'
+
+def is_infinitive_the(tokens, index, normalized):
+    """
+    Redundent "ה" after "ל" or "ב".
+    """
+    return tokens[index]['form'] in THE_FORMS and len(normalized) > 0 and normalized[-1]['form'] in PREPOSITION_FORMS
+
+# rules of each side of the comparison. "ה" before "של" is not needed in dicta format
+TOKEN_RULES = (is_composed, is_punctuation, is_undefined)
+CORPUS_CONTEXT_RULES = (is_possessive_the, is_infinitive_the)
+DICTA_CONTEXT_RULES = (is_infinitive_the,)
+
+def matches_any(rules, *args):
+    """
+    Check if any of the rules matches
+    """
+    for rule in rules:
+        if rule(*args):
+            return True
+    return False
+
+def renumber(tokens):
+    """
+    Copy tokens, with ids numbered from 1
+    """
+    copies = []
+    for number, token in enumerate(tokens, start=1):
+        copy = Token(token)
+        copy['id'] = number
+        copies.append(copy)
+    return copies
+
+def normalize_token_list(token_list, token_rules=TOKEN_RULES, context_rules=CORPUS_CONTEXT_RULES):
+    """
+    Remove every token matched by a rule, and number the remaining tokens from 1.
+    Gives the same tokens as removing the tokens of each rule in turn, but builds a new list in a single pass instead of deleting from the given one.
+
+    Args:
+        token_list (conllu.models.TokenList): a parsed sentence. It is not changed.
+        token_rules (Tuple): functions that get a token, and return true if it should be removed.
+        context_rules (Tuple): functions that get the tokens kept by token_rules, the index of a token and the normalized tokens before it,
+            and return true if the token should be removed. They are applied in order, a token removed by a rule is not seen by the next rules.
+    Returns:
+        normalized (conllu.models.TokenList): copies of the remaining tokens, with the metadata of token_list.
+    """
+    tokens = [token for token in token_list if not matches_any(token_rules, token)]
+    normalized = []
+    for index, token in enumerate(tokens):
+        if not matches_any(context_rules, tokens, index, normalized):
+            normalized.append(token)
+    return TokenList(renumber(normalized), metadata=token_list.metadata)
+
+def normalize_token_lists(token_lists, token_rules=TOKEN_RULES, context_rules=DICTA_CONTEXT_RULES):
+    """
+    Normalize every token list of a sentence that Dicta split into many token lists, and combine them into a single token list.
+
+    Args:
+        token_lists (List): parsed token lists of a single sentence.
+        token_rules (Tuple): see normalize_token_list()
+        context_rules (Tuple): see normalize_token_list(). Context rules do not look across token lists.
+    Returns:
+        normalized (conllu.models.TokenList): the remaining tokens of all token lists, numbered from 1, with the metadata of the first token list.
+    """
+    tokens = []
+    for token_list in token_lists:
+        tokens.extend(normalize_token_list(token_list, token_rules, context_rules))
+    # number the tokens of all token lists in a single sequence
+    for number, token in enumerate(tokens, start=1):
+        token['id'] = number
+    metadata = token_lists[0].metadata if len(token_lists) > 0 else None
+    return TokenList(tokens, metadata=metadata)
@@ -0,0 +1,71 @@
+import os
+import sys
+import conllu
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+from conllu_corpus import ConlluCorpus
+
+# a sentiment UD file written by the sentiment lexicon model: Dicta token lines, some of them with less than ten columns
+SENTIMENT_UD_PATH = os.path.join(project_dir, '..', '..', 'sentiment_in_UD_format_dev.txt')
+# number of sentences compared with the conllu parsing
+SENTENCES_COUNT = 200
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+def test_round_trip():
+    """
+    A corpus is written back exactly as it was read
+    """
+    text = read_text(SENTIMENT_UD_PATH)
+    corpus = ConlluCorpus.from_file(SENTIMENT_UD_PATH)
+    assert len(corpus) == text.count('\n\n')
+    assert corpus.to_conllu() == text
+    assert ConlluCorpus.from_text(corpus.to_conllu()).to_conllu() == text
+
+def test_same_as_conllu():
+    """
+    The columns and the metadata of every sentence are the same as conllu parses them
+    """
+    text = read_text(SENTIMENT_UD_PATH)
+    corpus = ConlluCorpus.from_text(text)
+    sentences = [conllu.parse(sentence + '\n\n')[0] for sentence in text.split('\n\n')[:SENTENCES_COUNT]]
+    lengths = corpus.sentence_lengths()
+    for index, token_list in enumerate(sentences):
+        tokens = corpus.sentence_slice(index)
+        assert lengths[index] == len(token_list)
+        assert corpus.get_metadata(index) == dict(token_list.metadata)
+        assert corpus.column('form', tokens).tolist() == [token['form'] for token in token_list]
+        assert corpus.column('upos', tokens).tolist() == [token['upos'] for token in token_list]
+    assert corpus.get_metadata_column('sentiment')[:SENTENCES_COUNT] == [token_list.metadata['sentiment'] for token_list in sentences]
+
+def test_missing_columns():
+    """
+    Columns missing from a token line are -1, and are not written back
+    """
+    text = "# text = שלום\n1\tשלום\tשלום\tINTJ\tINTJ\n2\t.\n\n"
+    corpus = ConlluCorpus.from_text(text)
+    assert corpus.column('upos').tolist() == ['INTJ', -1]
+    assert corpus.column('misc').tolist() == [-1, -1]
+    assert corpus.get_metadata_column('sentiment') == [-1]
+    assert corpus.to_conllu() == text
+
+def test_comments_without_value():
+    """
+    Like conllu, comments without a key or a value are not metadata, but they are written back
+    """
+    text = "# new_sentence = yes, end_paragraph=no\n# text =\n# note\n1\tשלום\n\n"
+    corpus = ConlluCorpus.from_text(text)
+    assert corpus.get_metadata(0) == dict(conllu.parse(text)[0].metadata) == {'new_sentence': 'yes, end_paragraph=no'}
+    assert corpus.to_conllu() == text
+
+if __name__ == '__main__':
+    test_round_trip()
+    test_same_as_conllu()
+    test_missing_columns()
+    test_comments_without_value()
+    print("conllu corpus tests passed")
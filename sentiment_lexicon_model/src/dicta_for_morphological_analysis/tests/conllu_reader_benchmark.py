@@ -0,0 +1,66 @@
+import os
+import sys
+import glob
+import time
+import conllu
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+import dicta_api_utils as dicta
+from conllu_reader import read_sentences, read_corpus
+
+# the raw Dicta corpus, and the sentiment UD files written by the sentiment lexicon model
+RAW_CORPUS_PATHS = sorted(glob.glob(os.path.join(project_dir, 'data', 'dicta_hebrew_corpus_raw', '*.tsv')))
+SENTIMENT_UD_PATHS = sorted(glob.glob(os.path.join(project_dir, '..', '..', 'sentiment_in_UD_format_*.txt')))
+
+def count_lines(paths):
+    count = 0
+    for path in paths:
+        with open(path, 'rb') as file:
+            count += sum(1 for _ in file)
+    return count
+
+def current_path(paths, dicta_cleanup):
+    """
+    The current way to read the files: the whole text, the parse_ud_format regexes, and conllu.parse for every sentence (like ConlluParser)
+    """
+    sentences = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8-sig') as file:
+            text = file.read()
+        if dicta_cleanup:
+            text = dicta.parse_ud_format(text)
+        for sentence in text.split('\n\n'):
+            if sentence.strip() != '':
+                sentences.append(conllu.parse(sentence + '\n\n')[0])
+    return sentences
+
+def same_as_regex(paths):
+    """
+    Check that the one-pass cleanup gives the same token lines as parse_ud_format
+    """
+    for path in paths:
+        with open(path, 'r', encoding='utf-8-sig') as file:
+            expected = [line for line in dicta.parse_ud_format(file.read()).split('\n') if line.strip() != '' and not line.startswith('#')]
+        lines = ['\t'.join(fields) for _, rows in read_sentences(path, dicta_cleanup=True) for fields in rows]
+        if lines != expected:
+            return False
+    return True
+
+def best_time(function, repeats=3):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+if __name__ == '__main__':
+    print(f"one pass cleanup matches parse_ud_format: {same_as_regex(RAW_CORPUS_PATHS)}")
+    for name, paths, dicta_cleanup in [('dicta raw corpus', RAW_CORPUS_PATHS, True), ('sentiment UD files', SENTIMENT_UD_PATHS, False)]:
+        lines = count_lines(paths)
+        current_time = best_time(lambda: current_path(paths, dicta_cleanup))
+        reader_time = best_time(lambda: read_corpus(paths, dicta_cleanup))
+        print(f"{name} ({len(paths)} files, {lines} lines): current {lines / current_time:,.0f} lines/s, mmap reader {lines / reader_time:,.0f} lines/s ({current_time / reader_time:.1f}x)")
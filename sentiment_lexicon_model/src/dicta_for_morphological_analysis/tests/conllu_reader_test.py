@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path, and this folder for the current way to read the files of the benchmark
+sys.path.append(os.path.join(project_dir, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from conllu_reader import read_sentences, read_corpus
+from conllu_reader_benchmark import RAW_CORPUS_PATHS, SENTIMENT_UD_PATHS, current_path, same_as_regex
+
+def same_as_current(paths, dicta_cleanup):
+    """
+    Check that the mmap reader gives the same sentences as the current way to read the files: the same metadata, ids, forms and lemmas
+    """
+    sentences = current_path(paths, dicta_cleanup)
+    corpus = read_corpus(paths, dicta_cleanup)
+    assert len(corpus) == len(sentences)
+    forms = corpus.column('form').tolist()
+    lemmas = corpus.column('lemma').tolist()
+    for index, token_list in enumerate(sentences):
+        tokens = corpus.sentence_slice(index)
+        assert corpus.get_metadata(index) == dict(token_list.metadata)
+        assert forms[tokens] == [token['form'] for token in token_list]
+        assert lemmas[tokens] == [token['lemma'] if token['lemma'] is not None else -1 for token in token_list]
+
+def test_dicta_cleanup():
+    assert len(RAW_CORPUS_PATHS) > 0
+    assert same_as_regex(RAW_CORPUS_PATHS)
+
+def test_raw_corpus():
+    same_as_current(RAW_CORPUS_PATHS[:3], True)
+
+def test_sentiment_ud_files():
+    assert len(SENTIMENT_UD_PATHS) > 0
+    same_as_current(SENTIMENT_UD_PATHS, False)
+
+def test_bom_and_crlf():
+    """
+    A byte order mark and windows line breaks do not change the sentences
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sentences.conllu')
+        with open(path, 'wb') as file:
+            file.write(b'\xef\xbb\xbf# text = a\r\n1\ta\r\n\r\n# text = b\r\n1\tb\tb\r\n\r\n')
+        assert list(read_sentences(path)) == [([' text = a'], [['1', 'a']]), ([' text = b'], [['1', 'b', 'b']])]
+        open(path, 'wb').close()
+        assert list(read_sentences(path)) == []
+
+if __name__ == '__main__':
+    test_dicta_cleanup()
+    test_raw_corpus()
+    test_sentiment_ud_files()
+    test_bom_and_crlf()
+    print("conllu reader tests passed")
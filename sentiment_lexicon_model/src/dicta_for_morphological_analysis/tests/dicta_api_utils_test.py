@@ -0,0 +1,89 @@
+import os
+import sys
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path, and this folder for the Dicta-like responses of the stand-in server
+sys.path.append(os.path.join(project_dir, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import dicta_api_utils as dicta
+from dicta_api_utils import BATCH_SENTINEL, pack_sentences, join_batch, has_contiguous_ids, split_batch_ud, dicta_request_batch
+from dicta_stub_server import fake_ud_format
+
+# the response of a batch of two sentences, numbered like Dicta numbers a batch: the ids go on across the sentences, and a range line covers the tokens of a word with a prefix
+BATCH_UD = '\n'.join(['# text = batch', '1\tהבית\tבית\tNOUN', '2-3\tשבו\t_\t_', '2\tש\tש\tSCONJ', '3\tבו\tב\tADP', f"4\t{BATCH_SENTINEL}\t{BATCH_SENTINEL}\tPROPN",
+                      '5-6\tוספר\t_\t_', '5\tו\tו\tCCONJ', '6\tספר\tספר\tNOUN']) + '\n\n'
+
+class SplittingClient:
+    """
+    A client that answers like the stand-in server, but splits a text into sentences after every ". " like Dicta does, so the token ids restart inside a sentence.
+    The texts it was sent are kept in sent.
+    """
+    def __init__(self):
+        self.cache = None
+        self.params = {}
+        self.sent = []
+
+    def send_many(self, texts):
+        self.sent.append(list(texts))
+        return [[{'UD': fake_ud_format(text.replace('. ', '.\n'))}] for text in texts]
+
+def test_pack_sentences():
+    """
+    A batch is at most max_chars long with the BATCH_SENTINEL lines between its sentences, and a longer sentence is a batch of its own
+    """
+    sentences = ['א' * 10, 'ב' * 10, 'ג' * 50, 'ד']
+    batch_length = len(join_batch(sentences[:2]))
+    assert batch_length == 10 + len(BATCH_SENTINEL) + 2 + 10
+    assert pack_sentences(sentences, max_chars=batch_length) == [[0, 1], [2], [3]]
+    assert pack_sentences(sentences, max_chars=batch_length - 1) == [[0], [1], [2], [3]]
+    assert pack_sentences([], max_chars=batch_length) == []
+
+def test_split_batch():
+    """
+    The response of a batch is split at the BATCH_SENTINEL tokens, and the ids of every sentence, ranges included, start from 1
+    """
+    assert split_batch_ud(BATCH_UD, ['הבית שבו', 'וספר']) == [
+        '# text = הבית שבו\n1\tהבית\tבית\tNOUN\n2-3\tשבו\t_\t_\n2\tש\tש\tSCONJ\n3\tבו\tב\tADP\n\n',
+        '# text = וספר\n1-2\tוספר\t_\t_\n1\tו\tו\tCCONJ\n2\tספר\tספר\tNOUN\n\n',
+    ]
+    # a sentinel more or less than the sentences
+    assert split_batch_ud(BATCH_UD, ['הבית שבו', 'וספר', 'שלום']) == -1
+    assert split_batch_ud(BATCH_UD, ['הבית שבו וספר']) == -1
+
+def test_restarted_ids():
+    """
+    A sentence whose ids restart, or whose range ends after its last token, does not split
+    """
+    restarted = '1\tספר\tספר\tNOUN\n1\tטוב\tטוב\tADJ\n' + f"2\t{BATCH_SENTINEL}\n3\tשלום\tשלום\tINTJ\n"
+    assert split_batch_ud(restarted, ['ספר. טוב', 'שלום']) == -1
+    assert has_contiguous_ids([['1'], ['2-3'], ['2'], ['3']])
+    assert not has_contiguous_ids([['1'], ['1']])
+    assert not has_contiguous_ids([['1'], ['3']])
+    assert not has_contiguous_ids([['1-3'], ['1'], ['2']])
+    assert not has_contiguous_ids([['1'], ['2.1']])
+
+def test_unaligned_fallback():
+    """
+    The sentences of a batch that does not split are sent again one by one, and every sentence gets its own analysis, in the given order
+    """
+    sentences = ['הבית שמח', 'ספר טוב. כלב רע', 'שלום']
+    expected = [dicta.parse_ud_format(fake_ud_format(sentence.replace('. ', '.\n'))) for sentence in sentences]
+    client = SplittingClient()
+    assert dicta_request_batch(sentences, client=client) == expected
+    assert client.sent == [[join_batch(sentences)], sentences]
+    # only the batch that does not split is sent again
+    client = SplittingClient()
+    assert dicta_request_batch(sentences, client=client, max_chars=len(sentences[1])) == expected
+    assert client.sent == [sentences, [sentences[1]]]
+    # an aligned batch is sent once
+    client = SplittingClient()
+    assert dicta_request_batch([sentences[0], sentences[2]], client=client) == [expected[0], expected[2]]
+    assert client.sent == [[join_batch([sentences[0], sentences[2]])], []]
+
+if __name__ == '__main__':
+    test_pack_sentences()
+    test_split_batch()
+    test_restarted_ids()
+    test_unaligned_fallback()
+    print("dicta api utils tests passed")
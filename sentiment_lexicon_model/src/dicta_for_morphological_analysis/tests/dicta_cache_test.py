@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import tempfile
+import unicodedata
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+from dicta_cache import DictaCache, DictaCacheMiss, cache_key
+from dicta_client import DEFAULT_PARAMS
+
+def response(sentence):
+    """
+    Gets a Dicta-like response for a sentence
+    """
+    return [{'UD': f"1\t{sentence}\t{sentence}\tNOUN\n"}]
+
+def put_all(cache, sentences):
+    """
+    Add the responses of sentences one after the other, so each is used later than the one before it
+    """
+    for sentence in sentences:
+        cache.put(sentence, DEFAULT_PARAMS, response(sentence))
+        time.sleep(0.01)
+
+def test_eviction():
+    """
+    When max_entries is exceeded, the least recently used responses are removed: a lookup makes a response recently used
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dicta_cache.sqlite')
+        with DictaCache(path, max_entries=2) as cache:
+            put_all(cache, ['הבית', 'שמח'])
+            assert cache.get('הבית', DEFAULT_PARAMS) == response('הבית')
+            time.sleep(0.01)
+            put_all(cache, ['ספר'])
+            assert cache.get('שמח', DEFAULT_PARAMS) == -1
+            assert cache.get('ספר', DEFAULT_PARAMS) == response('ספר')
+            assert [sentence for sentence, _ in cache.items()] == ['הבית', 'ספר']
+            assert cache.stats() == {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'evictions': 1, 'size': 2}
+            # adding a response again does not count it twice
+            put_all(cache, ['ספר'])
+            assert len(cache) == 2 and cache.evictions == 1
+        # the responses stay in the file
+        with DictaCache(path) as cache:
+            assert len(cache) == 2
+            assert cache.get('הבית', DEFAULT_PARAMS) == response('הבית')
+
+def test_offline():
+    """
+    An offline cache raises DictaCacheMiss for a sentence that was never analysed, and still finds the cached ones
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dicta_cache.sqlite')
+        with DictaCache(path) as cache:
+            put_all(cache, ['הבית'])
+        with DictaCache(path, offline=True) as cache:
+            assert cache.get('הבית', DEFAULT_PARAMS) == response('הבית')
+            try:
+                cache.get('שמח', DEFAULT_PARAMS)
+            except DictaCacheMiss as error:
+                assert str(error) == 'שמח'
+            else:
+                assert False, "an offline cache did not raise DictaCacheMiss"
+            assert cache.stats()['misses'] == 1
+
+def test_cache_key():
+    """
+    The key ignores white spaces, unicode composition, the API key and the sent text, but not the other request parameters
+    """
+    key = cache_key('הַבַּיִת שמח', DEFAULT_PARAMS)
+    assert cache_key('  הַבַּיִת\t שמח\n', DEFAULT_PARAMS) == key
+    assert cache_key(unicodedata.normalize('NFD', 'הַבַּיִת שמח'), DEFAULT_PARAMS) == key
+    assert cache_key('הַבַּיִת שמח', dict(DEFAULT_PARAMS, apiKey='another key', data='another text')) == key
+    assert cache_key('הַבַּיִת שמח', dict(DEFAULT_PARAMS, genre='rabbinic')) != key
+    assert cache_key('הבית שמח', DEFAULT_PARAMS) != key
+
+if __name__ == '__main__':
+    test_eviction()
+    test_offline()
+    test_cache_key()
+    print("dicta cache tests passed")
@@ -0,0 +1,40 @@
+import os
+import sys
+import csv
+import time
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+import dicta_api_utils as dicta
+from dicta_client import DictaClient
+from dicta_stub_server import start_stub_server
+
+# number of sentences to tag, and the simulated round trip to the API
+SENTENCES_COUNT = 200
+LATENCY = 0.05
+
+DATA_PATH = os.path.join(project_dir, 'data', 'hebrew_corpus_sentences_only.csv')
+with open(DATA_PATH, 'r', encoding='utf-8-sig', newline='') as file:
+    sentences = [row['sentence'] for row in csv.DictReader(file)][:SENTENCES_COUNT]
+
+server, url = start_stub_server(latency=LATENCY, failure_rate=0.05)
+
+# one request at a time, like the previous dicta_request
+with DictaClient(url, max_workers=1, backoff=0.01) as client:
+    start = time.perf_counter()
+    sequential = [dicta.dicta_request(sentence, client=client) for sentence in sentences]
+    sequential_time = time.perf_counter() - start
+
+# pooled requests over kept-alive connections
+with DictaClient(url, max_workers=16, backoff=0.01) as client:
+    start = time.perf_counter()
+    pooled = dicta.dicta_request_many(sentences, client=client)
+    pooled_time = time.perf_counter() - start
+
+server.shutdown()
+print(f"{len(sentences)} sentences, {LATENCY * 1000:.0f}ms latency, 5% failed requests")
+print(f"sequential: {sequential_time:.2f}s ({len(sentences) / sequential_time:.1f} sentences/s)")
+print(f"pooled: {pooled_time:.2f}s ({len(sentences) / pooled_time:.1f} sentences/s)")
+print(f"same results: {sequential == pooled}")
@@ -0,0 +1,69 @@
+import os
+import sys
+import random
+import requests
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path, and this folder for the stand-in server
+sys.path.append(os.path.join(project_dir, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from dicta_client import DictaClient
+from dicta_stub_server import start_stub_server, fake_ud_format
+
+# seconds to wait before the first retry, short so the tests do not wait
+BACKOFF = 0.001
+
+def expected_response(text):
+    """
+    Gets the response of the stand-in server for a text
+    """
+    return [{'UD': fake_ud_format(text)}]
+
+def test_retry():
+    """
+    A 503 response is retried, and the 200 response that follows is returned
+    """
+    server, url = start_stub_server(failures=1)
+    try:
+        with DictaClient(url, max_retries=3, backoff=BACKOFF) as client:
+            assert client.send('הבית שמח') == expected_response('הבית שמח')
+    finally:
+        server.shutdown()
+    assert server.request_count == 2
+
+def test_retry_limit():
+    """
+    After max_retries retries the error of the last response is raised, and nothing more is sent
+    """
+    server, url = start_stub_server(failures=10)
+    try:
+        with DictaClient(url, max_retries=2, backoff=BACKOFF) as client:
+            client.send('הבית שמח')
+    except requests.HTTPError as error:
+        assert error.response.status_code == 503
+    else:
+        assert False, "a request that always fails was not raised"
+    finally:
+        server.shutdown()
+    assert server.request_count == 3
+
+def test_post_many_order():
+    """
+    post_many returns the responses in the order of the texts, even when retries finish them out of order
+    """
+    random.seed(0)
+    texts = [f"משפט מספר {index}" for index in range(40)]
+    server, url = start_stub_server(failure_rate=0.3)
+    try:
+        with DictaClient(url, max_workers=8, max_retries=20, backoff=BACKOFF) as client:
+            assert client.post_many(texts) == [expected_response(text) for text in texts]
+    finally:
+        server.shutdown()
+    assert server.request_count > len(texts)
+
+if __name__ == '__main__':
+    test_retry()
+    test_retry_limit()
+    test_post_many_order()
+    print("dicta client tests passed")
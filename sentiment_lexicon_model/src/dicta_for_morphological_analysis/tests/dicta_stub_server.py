@@ -0,0 +1,87 @@
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A local stand-in for the Dicta nakdan endpoint, for testing the client without calling the real API.
+# Every line of the requested text is analysed as a sentence, and every word as a NOUN whose lemma is the word itself.
+
+def fake_ud_format(text):
+    """
+    Creates a Dicta-like UD response for a text: one sentence for each line, with the Dicta columns (lemma without nikud and lemmaVoc).
+    """
+    sentences = []
+    for line in text.split('\n'):
+        words = line.split()
+        if len(words) == 0:
+            continue
+        rows = [f"# text = {line.strip()}"]
+        for index, word in enumerate(words, start=1):
+            rows.append(f"{index}\t{word}\t{word}\tNOUN\tNOUN\tGender=Masc|Number=Sing\t{word}\t_")
+        sentences.append('\n'.join(rows) + '\n')
+    return '\n'.join(sentences) + '\n'
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Handles POST requests like the Dicta endpoint: a json body with the text under "data", and a json list with the UD analysis as a response.
+    """
+    protocol_version = 'HTTP/1.1'
+    # answer right away on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.request_count += 1
+        time.sleep(self.server.latency)
+        if self.server.request_count <= self.server.failures or random.random() < self.server.failure_rate:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        params = json.loads(body.decode('utf-8'))
+        response = json.dumps([{'UD': fake_ud_format(params['data'])}], ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(port=0, latency=0.0, failure_rate=0.0, failures=0):
+    """
+    Starts the stand-in server in a background thread.
+
+    Args:
+        port (Int): port to listen on. 0 picks a free port.
+        latency (Float): seconds to wait before answering each request, like the round trip to the real API.
+        failure_rate (Float): probability of answering a request with 503, to test retries.
+        failures (Int): number of first requests answered with 503, whatever the failure rate.
+    Returns:
+        server (ThreadingHTTPServer): the running server, call server.shutdown() to stop it.
+        url (String): the url to pass to DictaClient.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.failure_rate = failure_rate
+    server.failures = failures
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/addnikud"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='local stand-in for the Dicta nakdan endpoint')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start_stub_server(args.port, args.latency, args.failure_rate)
+    print(f"serving on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
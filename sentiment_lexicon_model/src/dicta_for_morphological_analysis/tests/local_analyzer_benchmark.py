@@ -0,0 +1,50 @@
+import os
+import sys
+import csv
+import time
+import conllu
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+import dicta_api_utils as dicta
+from dicta_client import DictaClient
+from dicta_stub_server import start_stub_server
+from morphological_analyzer import DictaAnalyzer, LocalAnalyzer
+
+# number of sentences to tag, and the simulated round trip to the API
+SENTENCES_COUNT = 200
+LATENCY = 0.05
+
+DATA_PATH = os.path.join(project_dir, 'data', 'hebrew_corpus_sentences_only.csv')
+with open(DATA_PATH, 'r', encoding='utf-8-sig', newline='') as file:
+    sentences = [row['sentence'] for row in csv.DictReader(file)][:SENTENCES_COUNT]
+
+server, url = start_stub_server(latency=LATENCY)
+
+# batched requests to the (simulated) API
+with DictaClient(url, max_workers=16, backoff=0.01) as client:
+    start = time.perf_counter()
+    remote = DictaAnalyzer(client)(sentences)
+    remote_time = time.perf_counter() - start
+server.shutdown()
+
+# the offline analyzer, built from the raw Dicta corpus
+start = time.perf_counter()
+analyzer = LocalAnalyzer.from_corpus()
+build_time = time.perf_counter() - start
+start = time.perf_counter()
+local = analyzer(sentences)
+local_time = time.perf_counter() - start
+
+# the offline analysis is in the format of dicta_request
+raw = [analyzer.analyze(sentence, ud_format=False) for sentence in sentences]
+same_format = all(dicta.parse_ud_format(response[0]['UD']) == ud_format_sentence for response, ud_format_sentence in zip(raw, local))
+parsed = all(len(conllu.parse(ud_format_sentence)) == 1 for ud_format_sentence in local)
+
+print(f"{len(sentences)} sentences, {LATENCY * 1000:.0f}ms latency")
+print(f"remote: {remote_time:.2f}s ({len(sentences) / remote_time:.1f} sentences/s)")
+print(f"local: {local_time:.2f}s ({len(sentences) / local_time:.1f} sentences/s), built in {build_time:.2f}s from {len(analyzer)} words")
+print(f"local word coverage: {analyzer.stats()['hit_rate']:.3f}")
+print(f"same format as parse_ud_format: {same_format}, parsed by conllu: {parsed}")
@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+from morphological_analyzer import LocalAnalyzer
+
+# a tiny corpus of Dicta analyses: שמח is a verb twice and an adjective once, ספר is a noun once and a verb once,
+# and ה, ו and ב are seen as prefix letters of הבית and ובבית
+CORPUS_TEXT = '\n'.join([
+    '# text = הבית שמח',
+    '1-2\tהַבַּיִת\t_\t_\t_\t_',
+    '1\tהַ\tה\tDET\tDET\tPronType=Art\tהַ\t_',
+    '2\tבַּיִת\tבית\tNOUN\tNOUN\tGender=Masc|Number=Sing\tבַּיִת\t_',
+    '3\tשָׂמַח\tשמח\tVERB\tVERB\tHebBinyan=PAAL\tשָׂמַח\t_',
+    '',
+    '# text = שמח ספר בית',
+    '1\tשָׂמֵחַ\tשמח\tADJ\tADJ\tGender=Masc|Number=Sing\tשָׂמֵחַ\t_',
+    '2\tסֵפֶר\tספר\tNOUN\tNOUN\tGender=Masc|Number=Sing\tסֵפֶר\t_',
+    '3\tבַּיִת\tבית\tNOUN\tNOUN\tGender=Masc|Number=Sing\tבַּיִת\t_',
+    '',
+    '# text = שמח ספר ובבית',
+    '1\tשָׂמַח\tשמח\tVERB\tVERB\tHebBinyan=PAAL\tשָׂמַח\t_',
+    '2\tסָפַר\tספר\tVERB\tVERB\tHebBinyan=PAAL\tסָפַר\t_',
+    '3-5\tוּבַבַּיִת\t_\t_\t_\t_',
+    '3\tוּ\tו\tCCONJ\tCCONJ\t_\tוּ\t_',
+    '4\tבַ\tב\tADP\tADP\t_\tבַ\t_',
+    '5\tבַּיִת\tבית\tNOUN\tNOUN\tGender=Masc|Number=Sing\tבַּיִת\t_',
+    '', ''])
+
+def build_analyzer():
+    """
+    Build an analyzer from the tiny corpus, saved like the files of dicta_hebrew_corpus_raw
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'MorphologyResults.ud (0).tsv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(CORPUS_TEXT)
+        return LocalAnalyzer.from_corpus([path])
+
+def test_most_frequent_analysis():
+    """
+    A word is analysed as its most frequent analysis, the first seen one winning a tie, whatever its nikud
+    """
+    analyzer = build_analyzer()
+    assert len(analyzer) == 5
+    assert analyzer.get_best('שמח') == [['1', 'שָׂמַח', 'שמח', 'VERB', 'VERB', 'HebBinyan=PAAL', 'שָׂמַח', '_']]
+    assert analyzer.get_best('שָׂמֵחַ') == analyzer.get_best('שמח')
+    assert analyzer.get_best('ספר')[0][3] == 'NOUN'
+    assert [fields[0] for fields in analyzer.get_best('הבית')] == ['1-2', '1', '2']
+    assert analyzer.get_best('כלב') == -1
+
+def test_prefix_split():
+    """
+    A word that was never analysed is split into the prefix letters seen in the corpus and a known word, under a single range line
+    """
+    analyzer = build_analyzer()
+    assert analyzer.split_prefix('ובית') == [['1-2', 'ובית', '_', '_', '_', '_'], ['1', 'וּ', 'ו', 'CCONJ', 'CCONJ', '_', 'וּ', '_'],
+                                              ['2', 'בַּיִת', 'בית', 'NOUN', 'NOUN', 'Gender=Masc|Number=Sing', 'בַּיִת', '_']]
+    # the range of a known word is joined into the range of the whole word
+    assert [fields[:2] for fields in analyzer.split_prefix('בהבית')] == [['1-3', 'בהבית'], ['1', 'בַ'], ['2', 'הַ'], ['3', 'בַּיִת']]
+    # ת is not a prefix letter, and מ was never seen as one
+    assert analyzer.split_prefix('תבית') == -1
+    assert analyzer.split_prefix('מבית') == -1
+    # a word that can not be split gets an undefined tag
+    assert analyzer.analyze_word('ובית')[0][0] == '1-2'
+    assert analyzer.analyze_word('כלב') == [['1', 'כלב', 'כלב', 'X', 'X', '_', 'כלב', '_']]
+    assert analyzer.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'size': 5}
+
+if __name__ == '__main__':
+    test_most_frequent_analysis()
+    test_prefix_split()
+    print("local analyzer tests passed")
@@ -9,19 +9,10 @@ DATA_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'morphologicaltagging_v_2_12
 UD_POS_TAGGING = pd.read_csv(DATA_PATH)
 
 # example of using the class SentimentTranslator: 
-df = pd.DataFrame(columns=['word','translation','sentiment'])
 sentiment_translator = SentimentTranslator()
-iterations = 0 
-for index, row in UD_POS_TAGGING.iterrows():
-    word = row['LEMMA']
-    upos = row['U-POS']
-    feats =  row['FEATS']
-    translation = sentiment_translator.pos_translator.translate(word, upos, feats)
-    sentiment = sentiment_translator.translate(word, upos, feats)
-    new_row = {'word': word, 'translation': translation ,'sentiment': sentiment}
-    df.loc[len(df)] = new_row
-    iterations += 1
-    print(iterations)
+# translate all words at once
+columns = ('LEMMA', 'U-POS', 'FEATS')
+df = pd.DataFrame({'word': UD_POS_TAGGING[columns[0]], 'translation': sentiment_translator.pos_translator.translate_batch(UD_POS_TAGGING, columns=columns), 'sentiment': sentiment_translator.translate_batch(UD_POS_TAGGING, columns=columns)})
 
 print(df.head(50))
 # df.to_csv('pos_translation_test2.csv', index = False, encoding = 'utf-8-sig')
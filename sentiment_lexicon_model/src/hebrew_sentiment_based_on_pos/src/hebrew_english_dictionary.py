@@ -1,14 +1,25 @@
 import os
 import json
-import pandas as pd
 
 # Get the path of the relevant data
 SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))  
 DATA_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'dict-he-en.json')
 
-# open data as a Json file
-with open(DATA_PATH, 'r') as DICTIONARY_DATA:
-    DICTIONARY_DATA =  json.load(DICTIONARY_DATA)
+# dictionary data, opened on first use
+DICTIONARY_DATA = None
+
+def get_dictionary_data():
+    """
+    Opens the dictionary data as a Json file, once per process.
+
+    Returns:
+        DICTIONARY_DATA (List): all translation records of the dictionary
+    """
+    global DICTIONARY_DATA
+    if DICTIONARY_DATA is None:
+        with open(DATA_PATH, 'r') as dictionary_file:
+            DICTIONARY_DATA = json.load(dictionary_file)
+    return DICTIONARY_DATA
 
 def parse_data():
     """
@@ -18,7 +29,7 @@ def parse_data():
         hebrew_english_dictionary (Dictionary): dictionary with hebrew words as keys, and list of all possible translations as values
     """
     hebrew_english_dictionary = {}
-    for translation in DICTIONARY_DATA:
+    for translation in get_dictionary_data():
         translated_word = translation['translated']
         if translated_word not in hebrew_english_dictionary:
             hebrew_english_dictionary[translated_word] = []
@@ -33,11 +44,16 @@ class HebrewEnglishDictionary:
     Attributes:
         dictionary (Dictionary): Dictionary with hebrew words as keys, and list of all translation records as values.
     """
-    def __init__(self): 
+    def __init__(self, dictionary=None): 
         """
         initialaze dictionary
+
+        Args:
+            dictionary (Dictionary): an already parsed dictionary (for example, from a compiled lexicon). If None, parse the dictionary data.
         """
-        self.dictionary = parse_data()
+        if dictionary is None:
+            dictionary = parse_data()
+        self.dictionary = dictionary
     
     def get_translation_records(self, word):
         """
@@ -0,0 +1,258 @@
+import os
+import gc
+import json
+import mmap
+import pickle
+import struct
+import hashlib
+import logging
+import sentiment_lexicon
+import hebrew_english_dictionary
+import pos_translator
+from lexicon_index import LexiconIndex
+# lexicon_index puts the morphological analysis package, with the nikud normalization, on the path
+import hebrew_letters
+
+logger = logging.getLogger(__name__)
+
+# Get the path of the compiled lexicon
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'compiled_lexicon.bin')
+
+# The compiled lexicon file is: MAGIC, version, header length, a pickled header, and then a pickled section for each part of the lexicon.
+# The header holds the fingerprint of the code, the hash of the sources and the (offset, length) of every section, so a reader loads only the sections it needs.
+MAGIC = b'HSLEX'
+# bump when the layout of the compiled lexicon changes, so old files are rebuilt
+ARTIFACT_VERSION = 4
+PREFIX = struct.Struct('<5sIQ')
+
+# source files the compiled lexicon is built from
+SOURCE_PATHS = [sentiment_lexicon.DATA_PATH, hebrew_english_dictionary.DATA_PATH]
+# code that parses the source files into the compiled lexicon, so editing it (or the POS mapper in it) rebuilds the lexicon
+CODE_PATHS = [os.path.abspath(module.__file__) for module in (sentiment_lexicon, hebrew_english_dictionary, pos_translator, hebrew_letters)] + [
+    os.path.join(SCRIPT_PATH, 'lexicon_index.py'), os.path.abspath(__file__)]
+
+# fingerprint of the code, calculated once per process
+CODE_FINGERPRINT = None
+
+def lexicon_section(naive):
+    """
+    Gets the name of the section holding the sentiment lexicon of a parsing mode.
+    """
+    return 'lexicon_naive' if naive else 'lexicon_rule_based'
+
+def source_stats():
+    """
+    Gets the size and modification time of all source files, used as a quick check before hashing them.
+
+    Returns:
+        stats (List): a [size, mtime] pair for each source file
+    """
+    stats = []
+    for path in SOURCE_PATHS:
+        stat = os.stat(path)
+        stats.append([stat.st_size, stat.st_mtime_ns])
+    return stats
+
+def source_hash():
+    """
+    Calculates a content hash of all source files.
+
+    Returns:
+        hash (String): sha256 hex digest of the sources
+    """
+    digest = hashlib.sha256()
+    for path in SOURCE_PATHS:
+        with open(path, 'rb') as source_file:
+            for block in iter(lambda: source_file.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def code_fingerprint():
+    """
+    Calculates a content hash of the code that builds the compiled lexicon and of the POS mapper, once per process.
+    The code files are small, so unlike the sources they are hashed on every start.
+
+    Returns:
+        CODE_FINGERPRINT (String): sha256 hex digest of the code
+    """
+    global CODE_FINGERPRINT
+    if CODE_FINGERPRINT is None:
+        digest = hashlib.sha256()
+        for path in CODE_PATHS:
+            with open(path, 'rb') as code_file:
+                digest.update(code_file.read())
+        digest.update(json.dumps(pos_translator.DATA, sort_keys=True).encode('utf-8'))
+        CODE_FINGERPRINT = digest.hexdigest()
+    return CODE_FINGERPRINT
+
+def build_header():
+    """
+    Gets the header fields that tell which code and sources a compiled lexicon was built from.
+    """
+    return {'code_fingerprint': code_fingerprint(), 'source_stats': source_stats(), 'source_hash': source_hash()}
+
+def build_sections():
+    """
+    Builds all sections of the compiled lexicon from the source files.
+
+    Returns:
+        sections (Dictionary): the sentiment lexicons of both parsing modes (with the index of their hebrew words), the hebrew-english dictionary, the POS mapper, the translation index of the dictionary and the index of the dictionary words.
+    """
+    sections = {}
+    for naive in [True, False]:
+        lexicon = sentiment_lexicon.SentimentLexicon(naive)
+        sections[lexicon_section(naive)] = {'english_hebrew': lexicon.english_hebrew, 'hebrew_english': lexicon.hebrew_english, 'hebrew_english_index': lexicon.hebrew_english_index}
+    sections['dictionary'] = hebrew_english_dictionary.parse_data()
+    sections['mapper'] = pos_translator.DATA
+    sections['translation_index'] = pos_translator.build_translation_index(sections['dictionary'], sections['mapper'])
+    sections['dictionary_index'] = LexiconIndex(sections['translation_index'])
+    return sections
+
+def replace_file(path, payloads):
+    """
+    Write a file aside and then rename it, so a reader never sees a partial file. If the write fails, the file written aside is removed.
+
+    Args:
+        path (String): path of the file
+        payloads (Iterable): the bytes of the file, in order
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as output_file:
+            for payload in payloads:
+                output_file.write(payload)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def save_artifact(sections, header, path=ARTIFACT_PATH):
+    """
+    Saves the compiled lexicon (see replace_file()).
+
+    Args:
+        sections (Dictionary): section names as keys, and the section objects as values
+        header (Dictionary): the code fingerprint, and the source stats and hash of the sections (see build_header())
+    """
+    payloads = {name: pickle.dumps(section, protocol=pickle.HIGHEST_PROTOCOL) for name, section in sections.items()}
+    header = dict(header, sections={})
+    offset = 0
+    for name, payload in payloads.items():
+        header['sections'][name] = (offset, len(payload))
+        offset += len(payload)
+    header_payload = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+    replace_file(path, [PREFIX.pack(MAGIC, ARTIFACT_VERSION, len(header_payload)), header_payload] + list(payloads.values()))
+
+def refresh_stats(header, data, path=ARTIFACT_PATH):
+    """
+    Rewrite the header of a compiled lexicon whose sources were touched but not changed, so the next start does not hash them again.
+
+    Args:
+        header (Dictionary): the header of the compiled lexicon, with the position of the first section under 'start'
+        data (mmap): the compiled lexicon file
+    """
+    sections = data[header['start']:]
+    header = {key: value for key, value in header.items() if key != 'start'}
+    header['source_stats'] = source_stats()
+    header_payload = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        replace_file(path, [PREFIX.pack(MAGIC, ARTIFACT_VERSION, len(header_payload)), header_payload, sections])
+    except OSError as error:
+        logger.warning("the source stats of the compiled lexicon were not refreshed: %s", error)
+
+def read_header(artifact_file):
+    """
+    Reads the header of a compiled lexicon file.
+
+    Returns:
+        header (Dictionary): the header, with the position of the first section under 'start'.
+        If the file is not a compiled lexicon of the current version, return -1.
+    """
+    prefix = artifact_file.read(PREFIX.size)
+    if len(prefix) != PREFIX.size:
+        return -1
+    magic, version, header_length = PREFIX.unpack(prefix)
+    if magic != MAGIC or version != ARTIFACT_VERSION:
+        return -1
+    header = pickle.loads(artifact_file.read(header_length))
+    header['start'] = PREFIX.size + header_length
+    return header
+
+def is_up_to_date(header):
+    """
+    Checks if the compiled lexicon was built by the current code, from the current source files.
+    The code fingerprint is always compared. If the stats of the sources did not change the sources are not read, otherwise, their content hash decides.
+    """
+    if header.get('code_fingerprint') != code_fingerprint():
+        return False
+    if header['source_stats'] == source_stats():
+        return True
+    return header['source_hash'] == source_hash()
+
+def has_current_stats(header):
+    """
+    Checks if the source stats in a header are the stats of the current source files
+    """
+    return header['source_stats'] == source_stats()
+
+def load_artifact(path=ARTIFACT_PATH, sections=None):
+    """
+    Loads sections of the compiled lexicon if it is up to date with the source files.
+
+    Args:
+        sections (List): names of the sections to load. If None, load all sections.
+    Returns:
+        artifact (Dictionary): section names as keys, and the section objects as values.
+        If the file is missing, has another version, or was built from other sources, return -1.
+    """
+    try:
+        with open(path, 'rb') as artifact_file:
+            header = read_header(artifact_file)
+            if header == -1 or not is_up_to_date(header):
+                return -1
+            if sections is None:
+                sections = list(header['sections'])
+            # the sections only hold new containers, so the garbage collector has nothing to find while they are loaded
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                with mmap.mmap(artifact_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    artifact = {}
+                    for name in sections:
+                        offset, length = header['sections'][name]
+                        start = header['start'] + offset
+                        artifact[name] = pickle.loads(data[start:start + length])
+                    # the sources were only touched (their hash matched), so record their new stats
+                    if not has_current_stats(header):
+                        refresh_stats(header, data, path)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+    except (OSError, KeyError, ValueError, pickle.UnpicklingError, EOFError):
+        return -1
+    return artifact
+
+def load_or_build(path=ARTIFACT_PATH, sections=None):
+    """
+    Loads sections of the compiled lexicon, and rebuilds it only if the source files changed.
+
+    Args:
+        sections (List): names of the sections to load. If None, load all sections.
+    Returns:
+        artifact (Dictionary): section names as keys, and the section objects as values.
+    """
+    artifact = load_artifact(path, sections)
+    if artifact != -1:
+        return artifact
+    logger.info("building the compiled lexicon %s", path)
+    artifact = build_sections()
+    try:
+        save_artifact(artifact, build_header(), path)
+    except OSError as error:
+        # a read only data folder only means the next process will build the lexicon again
+        logger.warning("the compiled lexicon was not saved: %s", error)
+    if sections is None:
+        return artifact
+    return {name: artifact[name] for name in sections}
@@ -0,0 +1,148 @@
+import os
+import sys
+import bisect
+import unicodedata
+from array import array
+from difflib import SequenceMatcher
+# the nikud normalization and the prefix letters are the ones of the morphological analysis
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'dicta_for_morphological_analysis', 'src')))
+from hebrew_letters import strip_niqqud
+
+def niqqud_similarity(word, other_word):
+    """
+    Gets how similar the vocalization of two words is, from 0 to 1. Used to choose between vocalized forms with the same letters.
+    """
+    return SequenceMatcher(None, unicodedata.normalize('NFD', word), unicodedata.normalize('NFD', other_word), autojunk=False).ratio()
+
+class LexiconIndex:
+    """
+    A compact index of the hebrew words of a lexicon, keyed on their form without nikud.
+    The normalized forms are kept sorted in a single list, so a normalized lookup or a prefix lookup is a binary search, and every normalized form points to the range of its vocalized forms.
+
+    Attributes:
+        keys (List): the distinct normalized forms, sorted.
+        starts (array): the first vocalized form of each key, followed by the number of vocalized forms. Key i has the forms starts[i]:starts[i + 1].
+        forms (List): the vocalized forms of the lexicon, grouped by key, in lexicon order within a key.
+        form_set (Set): the vocalized forms, for exact lookup.
+    """
+    def __init__(self, words):
+        """
+        Build the index.
+
+        Args:
+            words (Iterable): the words of the lexicon (for example, its keys). Words that are not strings are ignored.
+        """
+        normalized_words = []
+        for order, word in enumerate(words):
+            normalized_word = strip_niqqud(word)
+            if normalized_word != -1:
+                normalized_words.append((normalized_word, order, word))
+        # sort by normalized form, keeping the lexicon order of the forms of each key
+        normalized_words.sort()
+        self.keys = []
+        self.starts = array('I')
+        self.forms = []
+        for normalized_word, _, word in normalized_words:
+            if len(self.keys) == 0 or self.keys[-1] != normalized_word:
+                self.keys.append(normalized_word)
+                self.starts.append(len(self.forms))
+            self.forms.append(word)
+        self.starts.append(len(self.forms))
+        self.form_set = set(self.forms)
+
+    @classmethod
+    def from_parts(cls, keys, starts, forms, form_set):
+        """
+        Create an index from its already built attributes, like the read only sequences of a shared lexicon (see shared_lexicon.SharedLexicon.index()).
+        keys and forms can be any sequences, starts any sequence of ints, and form_set anything that supports "in".
+        """
+        index = cls.__new__(cls)
+        index.keys = keys
+        index.starts = starts
+        index.forms = forms
+        index.form_set = form_set
+        return index
+
+    def __len__(self):
+        return len(self.forms)
+
+    def __contains__(self, word):
+        return word in self.form_set
+
+    def find_key(self, normalized_word):
+        """
+        Gets the position of a normalized form in keys. If it is not in the index, return -1
+        """
+        position = bisect.bisect_left(self.keys, normalized_word)
+        if position < len(self.keys) and self.keys[position] == normalized_word:
+            return position
+        return -1
+
+    def candidates(self, word):
+        """
+        Gets all vocalized forms of the lexicon that have the same letters as word.
+
+        Returns:
+            forms (List): the vocalized forms, in lexicon order. If there are none, an empty list.
+        """
+        normalized_word = strip_niqqud(word)
+        if normalized_word == -1:
+            return []
+        position = self.find_key(normalized_word)
+        if position == -1:
+            return []
+        return self.forms[self.starts[position]:self.starts[position + 1]]
+
+    def lookup(self, word):
+        """
+        Gets the lexicon form of a word: the word itself if it is in the lexicon, otherwise the form with the same letters whose nikud is the most similar to the word's.
+        Between equally similar forms, the first in lexicon order is chosen.
+
+        Returns:
+            form (String): a word of the lexicon. If no word of the lexicon has the same letters, return -1.
+        """
+        if word in self.form_set:
+            return word
+        forms = self.candidates(word)
+        if len(forms) == 0:
+            return -1
+        if len(forms) == 1:
+            return forms[0]
+        best_form = forms[0]
+        best_similarity = -1
+        for form in forms:
+            similarity = niqqud_similarity(word, form)
+            if similarity > best_similarity:
+                best_form = form
+                best_similarity = similarity
+        return best_form
+
+    def has_prefix(self, prefix):
+        """
+        Checks if any word of the lexicon starts with the letters of prefix
+        """
+        normalized_prefix = strip_niqqud(prefix)
+        if normalized_prefix == -1:
+            return False
+        position = bisect.bisect_left(self.keys, normalized_prefix)
+        return position < len(self.keys) and self.keys[position].startswith(normalized_prefix)
+
+    def prefix_keys(self, prefix, limit=None):
+        """
+        Gets the normalized forms that start with the letters of prefix.
+
+        Args:
+            prefix (String): the beginning of a word, with or without nikud
+            limit (Int): maximal number of forms returned. None means no limit.
+        Returns:
+            keys (List): the normalized forms, sorted.
+        """
+        normalized_prefix = strip_niqqud(prefix)
+        keys = []
+        if normalized_prefix == -1:
+            return keys
+        position = bisect.bisect_left(self.keys, normalized_prefix)
+        while position < len(self.keys) and self.keys[position].startswith(normalized_prefix) and (limit is None or len(keys) < limit):
+            keys.append(self.keys[position])
+            position += 1
+        return keys
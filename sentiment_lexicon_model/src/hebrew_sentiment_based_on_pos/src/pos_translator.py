@@ -1,6 +1,8 @@
 import hebrew_english_dictionary
+from lexicon_index import LexiconIndex
+from prefix_segmentation import PrefixSegmenter
 import re
-import copy
+import math
 
 DATA = {
         "כינוי נפרד": {"U-POS": "PRON", "FEATS": "PronType=Prs"},
@@ -47,6 +49,157 @@ DATA = {
         "": {"U-POS": "", "FEATS": ''}
     }
 
+# default names of the word, U-POS and FEATS columns of a DataFrame of tokens
+TOKEN_COLUMNS = ('word', 'upos', 'feats')
+# U-POS of a word the morphological analysis could not analyse (normalized, see normalize_token()), or -1 if it is missing: its lemma is the surface form, with its prefix letters
+UNANALYSED_UPOS = ('', '_', 'X', -1)
+
+def normalize_token(word, upos, feats):
+    """
+    Normalize a (word, upos, feats) triple, so empty values from pandas (NaN) and from conllu (None) are the same.
+
+    Returns:
+        token (Tuple): (word, upos, feats), where a missing upos is '' and missing feats are '_'.
+    """
+    if upos is None or (isinstance(upos, float) and math.isnan(upos)):
+        upos = ''
+    if feats is None or feats == '' or (isinstance(feats, float) and math.isnan(feats)):
+        feats = '_'
+    return (word, upos, feats)
+
+def factorize_tokens(words, upos=None, feats=None, columns=TOKEN_COLUMNS):
+    """
+    Find the distinct normalized (word, upos, feats) triples of many tokens.
+
+    Args:
+        words (List): hebrew words, or a DataFrame with a words column, a upos column and a feats column.
+        upos (List): Universal Dependencies tag of each word. None if words is a DataFrame.
+        feats (List): Universal Dependencies features of each word. None if words is a DataFrame.
+        columns (Tuple): names of the words, upos and feats columns, when words is a DataFrame.
+
+    Returns:
+        tokens (List): the distinct normalized triples, in order of first appearance.
+        inverse (np.ndarray): index in tokens of each of the given tokens.
+    """
+    import numpy as np
+    if upos is None and feats is None:
+        words, upos, feats = words[columns[0]], words[columns[1]], words[columns[2]]
+    # iterating python lists is much faster than iterating pandas Series or NumPy arrays
+    words, upos, feats = [values.tolist() if hasattr(values, 'tolist') else values for values in (words, upos, feats)]
+    unique_tokens = {}
+    inverse = [unique_tokens.setdefault(normalize_token(*token), len(unique_tokens)) for token in zip(words, upos, feats)]
+    return list(unique_tokens), np.array(inverse, dtype=np.intp)
+
+def parse_translation_record(translation_record):
+    """
+    parse a single translation record into a list of list of single english words.
+
+    Args:
+        translation_record (Dictionary): All attributes of a single potential translation of a word.
+    
+    Returns:
+        translations (List): A list of lists, where each list is a parsed translation phrase, splitted into single words. 
+    """
+    translations = []
+    for translation in translation_record['translation']:
+        # remove all brasket in phrase 
+        translation = re.sub(r'\([^)]*\)', '', translation).strip()
+        # if its a verb, check if it starts with "to" or "to be" and parse it accordingly
+        if "פ'" in translation_record['part_of_speech']:
+            if 'to be' in translation:
+                translation = re.sub('to be', '', translation).strip()
+            elif 'to ' in translation:
+                translation = re.sub('to ', '', translation).strip()
+        # split translation into single words
+        translations.append(translation.split(' '))
+    
+    return translations
+
+def find_best_translation_word(translation_record):
+    """
+    finds an english word that best describes the given hebrew word
+
+    Args:
+        translation_record (Dictionary): All attributes of a single potential translation of a word.
+    
+    Returns:
+        best_translation_word (String): a single english word that best describes the given hebrew word.
+    """
+    translations = parse_translation_record(translation_record)
+    best_translation_word = ''
+    for index, translations_words in enumerate(translations):
+        # If it is the first iteration, assign a value to best_translation_word.
+        # If a translation is composed of only one word, we will choose this word to be the translation word. 
+        # if there is not translation that is composed of only one word , the first word of the first translation is chosen.    
+        if index == 0:
+            best_translation_word =  translations_words[0]
+        if len(translations_words) == 1:
+            best_translation_word = translations_words[0]
+            break
+    
+    return best_translation_word
+
+def build_feature_vocabulary(mapper):
+    """
+    Gives a bit to every feature that a dictionary POS requires, like "Gender=Masc" or "HebBinyan=PAAL".
+    Only these features can change the score of a translation record, so the features of a word are encoded over them only.
+
+    Args:
+        mapper (Dictionary): the dictionary POSs as keys and the corresponding Universal Dependencies tags and features as values.
+    Returns:
+        vocabulary (Dictionary): the required features as keys, and their bit as values, in order of first appearance in mapper.
+    """
+    vocabulary = {}
+    for pos in mapper.values():
+        if pos['FEATS'] != '' and pos['FEATS'] not in vocabulary:
+            vocabulary[pos['FEATS']] = 1 << len(vocabulary)
+    return vocabulary
+
+def encode_feats(feats, vocabulary):
+    """
+    Encode Universal Dependencies features (like "Gender=Masc|Number=Sing") as a bitset over vocabulary. Features that are not in vocabulary are left out.
+
+    Returns:
+        bits (Int): the bits of the features. 0 if none of them is in vocabulary.
+    """
+    bits = 0
+    for feat in feats.split("|"):
+        bits |= vocabulary.get(feat, 0)
+    return bits
+
+def build_translation_index(dictionary, mapper):
+    """
+    Precompute, for every translation record in the dictionary, its Universal Dependencies tag, the bit of its required features (see build_feature_vocabulary()) and its single english translation word.
+
+    Args:
+        dictionary (Dictionary): hebrew words as keys, and list of all translation records as values.
+        mapper (Dictionary): the dictionary POSs as keys and the corresponding Universal Dependencies tags and features as values.
+
+    Returns:
+        translation_index (Dictionary): hebrew words as keys, and a tuple of (U-POS, FEATS bits, translation word) for each of their translation records, in the dictionary order.
+        A record without required features has 0 FEATS bits.
+    """
+    vocabulary = build_feature_vocabulary(mapper)
+    translation_index = {}
+    for word, translation_records in dictionary.items():
+        translation_index[word] = tuple((mapper[record['part_of_speech']]['U-POS'], vocabulary.get(mapper[record['part_of_speech']]['FEATS'], 0), find_best_translation_word(record)) for record in translation_records)
+    return translation_index
+
+def first_best_records(scores, starts):
+    """
+    Find the first record with the highest score in every group of records.
+
+    Args:
+        scores (np.ndarray): score of each record
+        starts (np.ndarray): position of the first record of each group, in increasing order. Groups are not empty.
+    Returns:
+        best (np.ndarray): position of the chosen record of each group
+    """
+    import numpy as np
+    # a higher score wins, and between equal scores an earlier record wins
+    keys = scores.astype(np.int64) * len(scores) + (len(scores) - 1 - np.arange(len(scores), dtype=np.int64))
+    return len(scores) - 1 - np.maximum.reduceat(keys, starts) % len(scores)
+
 class POSTranslator:
     """
     A class for translating a single hebrew word to a single english word using a mapping between the given dictionary POS to Universal Dependencies POS in hebrew: https://universaldependencies.org/he/index.html.
@@ -54,13 +207,42 @@ class POSTranslator:
     Attributes:
      mapper (Dictionary): A dictionary with the given dictionary POSs as keys and the corresponding Universal Dependencies tags and features as values
      dictionary (HebrewEnglishDictionary): an HebrewEnglishDictionary instance. 
+     dictionary_index (LexiconIndex): index of the dictionary words without nikud, used for words that are not found as they are written.
+     feature_vocabulary (Dictionary): the bit of every feature required by a dictionary POS (see build_feature_vocabulary()).
+     segmenter (PrefixSegmenter): finds dictionary words with prefix letters attached to them, for unanalysed words and translate_form(). None if prefixes are not removed.
+     flat_records (Bool): if true, batches are scored with the translation index laid out as flat arrays (see build_records()), otherwise one token at a time.
     """ 
-    def __init__(self):
+    def __init__(self, dictionary=None, mapper=None, translation_index=None, dictionary_index=None, segment_prefixes=False, flat_records=True):
         """
-        initialize mapper and dictionary
+        initialize mapper, dictionary, feature_vocabulary, translation_index, dictionary_index, segmenter and flat_records
+
+        Args:
+            dictionary (Dictionary): an already parsed hebrew-english dictionary (for example, from a compiled lexicon). If None, parse the dictionary data.
+            mapper (Dictionary): a mapping from the dictionary POSs to Universal Dependencies tags and features. If None, use DATA.
+            translation_index (Dictionary): an already built translation index of the dictionary (see build_translation_index()). If None, build it from the dictionary and mapper.
+            dictionary_index (LexiconIndex): an already built index of the dictionary words. If None, build it from the translation index.
+            segment_prefixes (Bool): if true, a surface form that is not in the dictionary is looked up again without its prefix letters (ו, ה, ב, ל, מ, ש, כ), see translate_form().
+                A word is segmented only if the morphological analysis left it unanalysed (see UNANALYSED_UPOS): the prefix letters of a lemma are already split off.
+            flat_records (Bool): if true, lay out the translation index as flat arrays on the first batch translation. False for a translation index read in place,
+                like a table of a shared lexicon, so every process does not copy all its records into its own memory.
         """
-        self.mapper = DATA
-        self.dictionary = hebrew_english_dictionary.HebrewEnglishDictionary()
+        self.mapper = DATA if mapper is None else mapper
+        self.dictionary = hebrew_english_dictionary.HebrewEnglishDictionary(dictionary)
+        self.feature_vocabulary = build_feature_vocabulary(self.mapper)
+        if len(self.feature_vocabulary) > 63:
+            raise ValueError(f"{len(self.feature_vocabulary)} required features do not fit in a 64 bit bitset")
+        # the bits of every features string that was encoded
+        self.encoded_feats = {}
+        if translation_index is None:
+            translation_index = build_translation_index(self.dictionary.dictionary, self.mapper)
+        self.translation_index = translation_index
+        if dictionary_index is None:
+            dictionary_index = LexiconIndex(self.translation_index)
+        self.dictionary_index = dictionary_index
+        self.segmenter = PrefixSegmenter(dictionary_index) if segment_prefixes else None
+        self.flat_records = flat_records
+        # the translation index as flat arrays, built on the first batch translation
+        self.records = None
     
     def calculate_score(self, translation_record, upos, feats):
         """
@@ -79,19 +261,28 @@ class POSTranslator:
             2: it has the same upos but not the same feats 
             3: it has the same upos and feats.
         """    
-        score = 0
         pos = translation_record["part_of_speech"]
-        if self.mapper[pos]['U-POS'] != '' and self.mapper[pos]['U-POS'] == upos: 
-            if self.mapper[pos]['FEATS'] != '' and self.mapper[pos]['FEATS'] in feats.split("|"):
-                score = 3
-            else: 
-                score = 2
-        elif self.mapper[pos]['FEATS'] != '' and self.mapper[pos]['FEATS'] in feats.split("|"):
-            score = 1
-        else:
-            score = 0
-        
-        return score
+        return self.score_record(self.mapper[pos]['U-POS'], self.feature_vocabulary.get(self.mapper[pos]['FEATS'], 0), upos, self.encode_feats(feats))
+
+    def encode_feats(self, feats):
+        """
+        Encode the features of a word over feature_vocabulary (see encode_feats()). The same features repeat in a corpus, so every features string is encoded once.
+        """
+        feats_bits = self.encoded_feats.get(feats)
+        if feats_bits is None:
+            feats_bits = encode_feats(feats, self.feature_vocabulary)
+            self.encoded_feats[feats] = feats_bits
+        return feats_bits
+
+    def score_record(self, record_upos, record_bits, upos, feats_bits):
+        """
+        Calculates the score of a translation record, like calculate_score(), from its U-POS and FEATS bits and the encoded features of a word.
+        """
+        # a record matches the features if it requires a feature, and the word has it
+        feats_match = feats_bits & record_bits != 0
+        if record_upos != '' and record_upos == upos:
+            return 3 if feats_match else 2
+        return 1 if feats_match else 0
 
     def find_best_translation_record(self, word, upos, feats):
         """
@@ -132,21 +323,7 @@ class POSTranslator:
         Returns:
             translations (List): A list of lists, where each list is a parsed translation phrase, splitted into single words. 
         """
-        translations = translation_record['translation']
-        for index, translation in enumerate(translations):
-            # remove all brasket in phrase 
-            translation = re.sub(r'\([^)]*\)', '', translation).strip()
-            # if its a verb, check if it starts with "to" or "to be" and parse it accordingly
-            if "פ'" in translation_record['part_of_speech']:
-                if 'to be' in translation:
-                    translation = re.sub('to be', '', translation).strip()
-                elif 'to ' in translation:
-                    translation = re.sub('to ', '', translation).strip()
-            # split translation into single words
-            translation = translation.split(' ')
-            translations[index] = translation
-        
-        return translations
+        return parse_translation_record(translation_record)
 
     def find_best_translation_word(self, translation_record):
         """
@@ -157,31 +334,131 @@ class POSTranslator:
         
         Returns:
             best_translation_word (String): a single english word that best describes the given hebrew word.
-            Side effect: it changes the translation_record, and this is way a deep copy is made.
-        """
-        # copy translation_record so it wont change in dictionary
-        translation_record = copy.deepcopy(translation_record)
-        translations = self.parse_translation_record(translation_record)
-        best_translation_word = ''
-        for index, translations_words in enumerate(translations):
-            # If it is the first iteration, assign a value to best_translation_word.
-            # If a translation is composed of only one word, we will choose this word to be the translation word. 
-            # if there is not translation that is composed of only one word , the first word of the first translation is chosen.    
-            if index == 0:
-                best_translation_word =  translations_words[0]
-            if len(translations_words) == 1:
-                best_translation_word = translations_words[0]
-                break
-        
-        return best_translation_word
+        """
+        return find_best_translation_word(translation_record)
     
+    def translate_batch(self, words, upos=None, feats=None, columns=TOKEN_COLUMNS):
+        """
+        Translate many hebrew words. Every distinct (word, upos, feats) triple is translated once (see translate_tokens()), and its translation is scattered back to all its positions.
+
+        Args:
+            words (List): hebrew words, or a DataFrame with a words column, a upos column and a feats column.
+            upos (List): Universal Dependencies tag of each word. None if words is a DataFrame.
+            feats (List): Universal Dependencies features of each word. None if words is a DataFrame.
+            columns (Tuple): names of the words, upos and feats columns, when words is a DataFrame.
+
+        Returns:
+            translation_words (np.ndarray): an object array with the english word of each hebrew word, or -1 if it is not found in dictionary.
+        """
+        tokens, inverse = factorize_tokens(words, upos, feats, columns)
+        return self.translate_tokens(tokens)[inverse]
+
+    def find_token_word(self, word, upos):
+        """
+        Gets the dictionary word of a token (see find_dictionary_word()). The word is segmented only if its U-POS marks it as unanalysed (see UNANALYSED_UPOS).
+        """
+        return self.find_dictionary_word(word, segment=upos in UNANALYSED_UPOS)
+
+    def find_dictionary_word(self, word, segment=False):
+        """
+        Gets the dictionary word of a hebrew word: the word itself, the same letters with another nikud (see LexiconIndex.lookup()),
+        or, if segment is true and prefixes are removed, the stem left without its prefix letters (see PrefixSegmenter.segment()).
+        If word is not in the dictionary, return -1
+        """
+        if word in self.translation_index:
+            return word
+        # look for the same letters with another nikud
+        dictionary_word = self.dictionary_index.lookup(word)
+        # look for a known stem with prefix letters
+        if dictionary_word == -1 and segment and self.segmenter is not None:
+            decomposition = self.segmenter.segment(word)
+            if decomposition != -1:
+                dictionary_word = decomposition[1]
+        return dictionary_word
+
+    def build_records(self):
+        """
+        Lay out the translation index as flat arrays, for scoring many translation records at once.
+
+        Returns:
+            records (Dictionary): 'ranges' maps a dictionary word to the (start, end) of its records. 'upos' (np.ndarray) has the U-POS id of each record, 0 for no U-POS,
+            'bits' (np.ndarray) its FEATS bits, 'words' (np.ndarray) its translation word, and 'upos_ids' maps a U-POS to its id.
+        """
+        import numpy as np
+        upos_ids = {'': 0}
+        ranges = {}
+        record_upos = []
+        record_bits = []
+        record_words = []
+        for word, translation_entries in self.translation_index.items():
+            ranges[word] = (len(record_words), len(record_words) + len(translation_entries))
+            for record_upos_tag, bits, translation_word in translation_entries:
+                record_upos.append(upos_ids.setdefault(record_upos_tag, len(upos_ids)))
+                record_bits.append(bits)
+                record_words.append(translation_word)
+        words = np.empty(len(record_words), dtype=object)
+        words[:] = record_words
+        return {'ranges': ranges, 'upos': np.array(record_upos, dtype=np.int32), 'bits': np.array(record_bits, dtype=np.int64), 'words': words, 'upos_ids': upos_ids}
+
+    def translate_tokens(self, tokens):
+        """
+        Translate distinct (word, upos, feats) triples, scoring the translation records of all of them at once with NumPy.
+        Without flat records, every triple is translated with translate(), looking its records up in place.
+        Gives the same translations as translate().
+
+        Args:
+            tokens (List): normalized (word, upos, feats) triples (see normalize_token())
+        Returns:
+            translation_words (np.ndarray): an object array with the english word of each triple, or -1 if it is not found in dictionary.
+        """
+        import numpy as np
+        translation_words = np.full(len(tokens), -1, dtype=object)
+        if not self.flat_records:
+            for position, token in enumerate(tokens):
+                translation_words[position] = self.translate(*token)
+            return translation_words
+        if self.records is None:
+            self.records = self.build_records()
+        records = self.records
+        found = []
+        starts = []
+        ends = []
+        token_upos = []
+        token_bits = []
+        for position, (word, upos, feats) in enumerate(tokens):
+            dictionary_word = self.find_token_word(word, upos)
+            if dictionary_word == -1:
+                continue
+            start, end = records['ranges'][dictionary_word]
+            found.append(position)
+            starts.append(start)
+            ends.append(end)
+            # a U-POS that no record has can not match, like the empty U-POS
+            token_upos.append(records['upos_ids'].get(upos, -1) or -1)
+            token_bits.append(self.encode_feats(feats))
+        if len(found) == 0:
+            return translation_words
+        starts = np.array(starts, dtype=np.int64)
+        counts = np.array(ends, dtype=np.int64) - starts
+        # the records of every found token, one after the other
+        group_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        positions = np.repeat(starts - group_starts, counts) + np.arange(counts.sum(), dtype=np.int64)
+        upos_match = records['upos'][positions] == np.repeat(np.array(token_upos, dtype=np.int32), counts)
+        feats_match = records['bits'][positions] & np.repeat(np.array(token_bits, dtype=np.int64), counts) != 0
+        # same scores as calculate_score()
+        scores = np.where(upos_match, np.where(feats_match, 3, 2), np.where(feats_match, 1, 0))
+        translation_words[found] = records['words'][positions[first_best_records(scores, group_starts)]]
+        return translation_words
+
     def translate(self, word, upos, feats):
         """
-        Translate a single hebrew word to a single english word based on it's Universal Dependencies POS tags, and features
+        Translate a single hebrew word to a single english word based on it's Universal Dependencies POS tags, and features.
+        The translation is the translation word of the first record with the best score (see calculate_score()), taken from translation_index.
+        A word that is not in the dictionary as it is written is looked up by its letters, ignoring nikud (see LexiconIndex.lookup()),
+        and an unanalysed word without its prefix letters, if the translator was created with segment_prefixes=True (see find_token_word()).
 
         Args: 
             word (String): An hebrew word.
-            translation_record (Dictionary): All attributes of a single potential translation of a word.
             upos (String): Universal Dependencies tag of a given word.
             feats (String): Universal Dependencies features of a given word.
          
@@ -189,11 +466,50 @@ class POSTranslator:
             translation_word (String): A single english word
             If hebrew word is not found in dictionary, return -1.
         """
-        translation_record = self.find_best_translation_record(word, upos, feats)
+        return self.translate_dictionary_word(self.find_token_word(word, upos), upos, feats)
+
+    def translate_form(self, form, upos, feats):
+        """
+        Translate a surface form, like translate(). A form that is not in the dictionary is looked up again without its prefix letters (see PrefixSegmenter.segment()),
+        if the translator was created with segment_prefixes=True.
+
+        Args:
+            form (String): An hebrew word as it is written in a sentence, with its prefix letters.
+            upos (String): Universal Dependencies tag of a given word.
+            feats (String): Universal Dependencies features of a given word.
+
+        Returns:
+            translation_word (String): A single english word
+            If hebrew word is not found in dictionary, return -1.
+        """
+        return self.translate_dictionary_word(self.find_dictionary_word(form, segment=True), upos, feats)
+
+    def translate_dictionary_word(self, dictionary_word, upos, feats):
+        """
+        Gets the translation word of the first record of a dictionary word with the best score (see score_record()).
+        If dictionary_word is -1, return -1.
+        """
         # if word is not in the dictionary, return -1
-        if translation_record == -1:
+        if dictionary_word == -1:
             return -1
-        translation_word = self.find_best_translation_word(translation_record)
+        translation_entries = self.translation_index[dictionary_word]
+        if len(translation_entries) == 1:
+            return translation_entries[0][2]
+        feats_bits = self.encode_feats(feats)
+        best_score = 0
+        translation_word = translation_entries[0][2]
+        for record_upos, record_bits, record_translation_word in translation_entries:
+            # same scores as score_record()
+            if record_upos != '' and record_upos == upos:
+                score = 3 if feats_bits & record_bits else 2
+            else:
+                score = 1 if feats_bits & record_bits else 0
+            if score > best_score:
+                best_score = score
+                translation_word = record_translation_word
+                if score == 3:
+                    break
+        
         return translation_word
         
          
@@ -0,0 +1,89 @@
+import unicodedata
+from collections import OrderedDict
+# lexicon_index puts the morphological analysis package, with the prefix letters, on the path
+from lexicon_index import strip_niqqud
+from hebrew_letters import MAX_PREFIX_LETTERS, MIN_STEM_LETTERS, is_prefix_letter
+
+# default number of words whose decomposition is kept
+DEFAULT_CACHE_SIZE = 100000
+
+def split_letters(word):
+    """
+    Split a word into letters, each with the nikud marks that follow it.
+
+    Returns:
+        letters (List): a string for each letter of the word
+    """
+    letters = []
+    for char in unicodedata.normalize('NFD', word):
+        if unicodedata.combining(char) and len(letters) > 0:
+            letters[-1] += char
+        else:
+            letters.append(char)
+    return letters
+
+class PrefixSegmenter:
+    """
+    Finds words that are a known stem with prefix letters attached to it, like "וּבַבַּיִת" -> "ו" + "ב" + "בַּיִת".
+    Decompositions are memoized, and the least recently used ones are dropped when the cache is full.
+
+    Attributes:
+        index (LexiconIndex): index of the known stems.
+        max_size (Int): maximal number of decompositions in the cache. 0 disables the cache.
+        hits (Int): number of words whose decomposition was found in the cache.
+        misses (Int): number of words that were decomposed.
+    """
+    def __init__(self, index, max_size=DEFAULT_CACHE_SIZE):
+        self.index = index
+        self.max_size = max_size
+        self.decompositions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def decompose(self, word):
+        """
+        Remove up to MAX_PREFIX_LETTERS prefix letters from a word, shortest prefix first, until the rest of the word is a known stem.
+
+        Args:
+            word (String): an hebrew word, with or without nikud
+        Returns:
+            decomposition (Tuple): the prefix letters (without nikud) and the stem as it is written in the index.
+            If no prefix leaves a known stem, return -1.
+        """
+        if strip_niqqud(word) == -1:
+            return -1
+        letters = split_letters(word)
+        for prefix_length in range(1, MAX_PREFIX_LETTERS + 1):
+            if len(letters) - prefix_length < MIN_STEM_LETTERS or not is_prefix_letter(letters[prefix_length - 1]):
+                break
+            stem = self.index.lookup(unicodedata.normalize('NFC', ''.join(letters[prefix_length:])))
+            if stem != -1:
+                return (strip_niqqud(''.join(letters[:prefix_length])), stem)
+        return -1
+
+    def segment(self, word):
+        """
+        Gets the decomposition of a word (see decompose()), from the cache if the word was already decomposed.
+        """
+        if self.max_size == 0:
+            return self.decompose(word)
+        decomposition = self.decompositions.get(word)
+        if decomposition is not None:
+            self.hits += 1
+            self.decompositions.move_to_end(word)
+            return decomposition
+        self.misses += 1
+        decomposition = self.decompose(word)
+        self.decompositions[word] = decomposition
+        if len(self.decompositions) > self.max_size:
+            self.decompositions.popitem(last=False)
+        return decomposition
+
+    def cache_info(self):
+        """
+        Gets the cache counters.
+
+        Returns:
+            info (Dictionary): hits, misses, current size and max size of the cache.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.decompositions), 'max_size': self.max_size}
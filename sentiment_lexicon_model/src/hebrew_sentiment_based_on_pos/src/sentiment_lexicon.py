@@ -1,14 +1,31 @@
 import os
-import pandas as pd
 from enum import Enum
-import copy
+from lexicon_index import LexiconIndex
 
 # Get the path of the relevant data
 SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))  
 DATA_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'Hebrew-NRC-EmoLex.txt')
 
-# open data as a DataFrame
-LEXICON_DATA = pd.read_csv(DATA_PATH, delimiter = '\t')
+# lexicon data, opened on first use
+LEXICON_DATA = None
+
+# emotion columns that add a single point to the rule based score
+POSITIVE_EMOTIONS = ['anticipation', 'joy', 'surprise', 'trust']
+NEGATIVE_EMOTIONS = ['anger', 'disgust', 'fear', 'sadness']
+
+def get_lexicon_data():
+    """
+    Opens the lexicon data as a DataFrame, once per process.
+
+    Returns:
+        LEXICON_DATA (pd.DataFrame): english to hebrew emotion lexicon
+    """
+    global LEXICON_DATA
+    if LEXICON_DATA is None:
+        # pandas is only needed to build the lexicon, so it is not imported with the module
+        import pandas as pd
+        LEXICON_DATA = pd.read_csv(DATA_PATH, delimiter = '\t')
+    return LEXICON_DATA
 
 class Sentiment(Enum):
     """
@@ -25,13 +42,11 @@ def naive_parse(lexicon_data):
     Returns:
         lexicon_data (pd.DataFrame): parsed data of english to hebrew sentiment lexicon
     """
-    for index, _ in lexicon_data.iterrows():
-        if lexicon_data.loc[index, 'positive'] == 1:
-            lexicon_data.loc[index, 'sentiment'] = Sentiment.POSITIVE.value
-        elif lexicon_data.loc[index,'negative'] == 1:
-            lexicon_data.loc[index, 'sentiment'] = Sentiment.NEGATIVE.value
-        else:
-            lexicon_data.loc[index, 'sentiment'] = Sentiment.NEUTRAL.value
+    import numpy as np
+    # "positive" is checked before "negative", so a word with both columns on is positive
+    conditions = [lexicon_data['positive'].to_numpy() == 1, lexicon_data['negative'].to_numpy() == 1]
+    choices = [Sentiment.POSITIVE.value, Sentiment.NEGATIVE.value]
+    lexicon_data['sentiment'] = np.select(conditions, choices, default=Sentiment.NEUTRAL.value)
     
     return lexicon_data
 
@@ -47,17 +62,12 @@ def rule_basted_parse(lexicon_data):
     Returns:
         lexicon_data (pd.DataFrame): parsed data of english to hebrew sentiment lexicon
     """
-    # positive_points = 0
-    # negative_points = 0 
-    for index, _ in lexicon_data.iterrows():
-        positive_points = lexicon_data.loc[index,'anticipation'] + lexicon_data.loc[index,'joy'] + lexicon_data.loc[index,'surprise'] + lexicon_data.loc[index,'trust'] + (5 * lexicon_data.loc[index,'positive'])
-        negative_points = lexicon_data.loc[index,'sadness'] + lexicon_data.loc[index,'fear'] + lexicon_data.loc[index,'disgust'] + lexicon_data.loc[index,'anger'] + (5 * lexicon_data.loc[index,'negative'])
-        if positive_points > negative_points:
-         lexicon_data.loc[index,'sentiment'] = Sentiment.POSITIVE.value
-        elif negative_points > positive_points:
-         lexicon_data.loc[index,'sentiment'] = Sentiment.NEGATIVE.value
-        else:
-         lexicon_data.loc[index,'sentiment'] = Sentiment.NEUTRAL.value
+    import numpy as np
+    positive_points = lexicon_data[POSITIVE_EMOTIONS].to_numpy().sum(axis=1) + (5 * lexicon_data['positive'].to_numpy())
+    negative_points = lexicon_data[NEGATIVE_EMOTIONS].to_numpy().sum(axis=1) + (5 * lexicon_data['negative'].to_numpy())
+    conditions = [positive_points > negative_points, negative_points > positive_points]
+    choices = [Sentiment.POSITIVE.value, Sentiment.NEGATIVE.value]
+    lexicon_data['sentiment'] = np.select(conditions, choices, default=Sentiment.NEUTRAL.value)
     
     return lexicon_data
     
@@ -67,94 +77,103 @@ def parse_data(naive):
     Returns:
         lexicon_data (pd.DataFrame): parsed data of english to hebrew sentiment lexicon
     """
-    # add a sentiment column based on if the word was tagged "positive" or "negative"
-    lexicon_data = LEXICON_DATA
-    lexicon_data['sentiment'] = None
-    # for index, _ in lexicon_data.iterrows():
-    #     if lexicon_data.loc[index, 'positive'] == 1:
-    #         lexicon_data.loc[index, 'sentiment'] = Sentiment.POSITIVE.value
-    #     elif lexicon_data.loc[index,'negative'] == 1:
-    #         lexicon_data.loc[index, 'sentiment'] = Sentiment.NEGATIVE.value
-    #     else:
-    #         lexicon_data.loc[index, 'sentiment'] = Sentiment.NEUTRAL.value
+    # work on a copy, so LEXICON_DATA can be parsed again by another SentimentLexicon
+    lexicon_data = get_lexicon_data().copy()
+    # add a sentiment column based on the emotions and sentiment columns
     if naive:
         lexicon_data = naive_parse(lexicon_data)
     else:
         lexicon_data = rule_basted_parse(lexicon_data)
     # Drop unrelevant columns 
-    lexicon_data.drop(columns=['anger', 'anticipation', 'disgust', 'fear', 'joy', 'negative', 'positive', 'sadness', 'surprise', 'trust'], axis=1, inplace=True)
+    lexicon_data.drop(columns=POSITIVE_EMOTIONS + NEGATIVE_EMOTIONS + ['negative', 'positive'], inplace=True)
     # rename all columns with lower case letters
     lexicon_data = lexicon_data.rename(columns={"English Word": "english_word", "Hebrew Word": "hebrew_word"})
     
     return lexicon_data
 
+def build_hebrew_english(english_words, hebrew_words, sentiments):
+    """
+    Build the he-en lexicon from the parsed lexicon columns.
+    A Hebrew word that appears once gets the translation and sentiment of its own row.
+    A Hebrew word with multiple rows gets the sentiment with the greater count, and the first English word in the lexicon with that sentiment.
+    The counters of this vote are shared by the whole lexicon (they are not reset between Hebrew words), so the vote of a repeated word is taken over all the rows up to its last row.
+    If positive == negative count, the repeated word is assigned neutral value.
+
+    Args:
+        english_words (List): english word of each row
+        hebrew_words (List): hebrew word of each row
+        sentiments (np.ndarray): sentiment value of each row
+    Returns:
+        hebrew_english (Dictionary): hebrew words as keys, and their translation and sentiment as values
+    """
+    import numpy as np
+    import pandas as pd
+    hebrew_english = {}
+    for hebrew_word, english_word, sentiment in zip(hebrew_words, english_words, sentiments.tolist()):
+        if hebrew_word not in hebrew_english:
+            hebrew_english[hebrew_word] = {'translation': english_word, 'sentiment': sentiment}
+    
+    # count of every sentiment over all rows up to each row, in the order POSITIVE, NEGATIVE, NEUTRAL
+    sentiment_values = np.array([sentiment.value for sentiment in Sentiment])
+    sentiment_count = np.cumsum(sentiments[:, None] == sentiment_values[None, :], axis=0)
+    # first row of every sentiment, or len(sentiments) if no row has it
+    first_rows = [np.flatnonzero(sentiments == value) for value in sentiment_values]
+    first_rows = [rows[0] if len(rows) > 0 else len(sentiments) for rows in first_rows]
+    
+    # the last row of each repeated hebrew word sets its final value
+    hebrew_series = pd.Series(hebrew_words)
+    repeated_last_rows = np.flatnonzero(hebrew_series.duplicated(keep=False).to_numpy() & ~hebrew_series.duplicated(keep='last').to_numpy())
+    counts = sentiment_count[repeated_last_rows]
+    # argmax keeps the first max, like max() over POSITIVE, NEGATIVE, NEUTRAL
+    max_count_sentiments = np.where(counts[:, 0] == counts[:, 1], Sentiment.NEUTRAL.value, sentiment_values[counts.argmax(axis=1)])
+    for row, max_count_sentiment in zip(repeated_last_rows.tolist(), max_count_sentiments.tolist()):
+        first_row = first_rows[max_count_sentiment]
+        translation = english_words[first_row] if first_row <= row else ''
+        hebrew_english[hebrew_words[row]] = {'translation': translation, 'sentiment': max_count_sentiment}
+    
+    return hebrew_english
+
 class SentimentLexicon:
     """
     A class for creating simple use of the sentiment lexicon data.
     Attributes:
         en_he_sentiment_lexicon (Dictionary): sentiment lexicon from english to hebrew
         he_en_sentiment_lexicon (Dictionary): sentiment lexicon from hebrew to english
+        hebrew_english_index (LexiconIndex): index of the hebrew words of the lexicon without nikud
     """
-    def __init__(self, naive=True): 
+    def __init__(self, naive=True, english_hebrew=None, hebrew_english=None, hebrew_english_index=None): 
         """
         initialaze en_he_sentiment_lexicon and he_en_sentiment_lexicon. 
 
         Args: 
             naive (Bool) if true, parse the data in the naive way, otherwise, use rule based parsing. 
+            english_hebrew (Dictionary): an already built en-he lexicon (for example, from a compiled lexicon). 
+            hebrew_english (Dictionary): an already built he-en lexicon. If any of the lexicons is None, both are built from the lexicon data.
+            hebrew_english_index (LexiconIndex): an already built index of the he-en lexicon. If None, it is built from the he-en lexicon.
+        """
+        if english_hebrew is not None and hebrew_english is not None:
+            self.english_hebrew = english_hebrew
+            self.hebrew_english = hebrew_english
+        else:
+            self.build(naive)
+        if hebrew_english_index is None:
+            hebrew_english_index = LexiconIndex(self.hebrew_english)
+        self.hebrew_english_index = hebrew_english_index
+
+    def build(self, naive):
+        """
+        Build the he-en and en-he lexicons from the lexicon data
         """
         # Parse data 
         lexicon_data = parse_data(naive)
+        english_words = lexicon_data['english_word'].tolist()
+        hebrew_words = lexicon_data['hebrew_word'].tolist()
+        sentiments = lexicon_data['sentiment'].to_numpy()
         # Create dictionary structure from an hebrew to it's translation and sentiment, and the same form an english word.
-        self.english_hebrew = {}
-        self.hebrew_english = {}
-        # keep track of current sentiment and translation of an hebrew word
-        hebrew_word_sentiment_count = {Sentiment.POSITIVE: 0, Sentiment.NEGATIVE: 0, Sentiment.NEUTRAL: 0}
-        hebrew_word_translation = {Sentiment.POSITIVE: '', Sentiment.NEGATIVE: '', Sentiment.NEUTRAL: ''}
-        for index , _ in lexicon_data.iterrows():
-            hebrew_word = lexicon_data.loc[index,'hebrew_word']
-            english_word = lexicon_data.loc[index,'english_word']
-            sentiment = lexicon_data.loc[index,'sentiment']
-            # Update he-en lexicon.
-            # If a Hebrew word has multiple translations in the lexicon along with conflicting sentiments, then set the sentiment to the one with the greater count in the dictionary for that specific Hebrew word. Additionally, set the translation of the word to be the first English word that matches the Hebrew word, that has the chosen sentiment value.
-            # Otherwise, set the hebrew word's translation as the first english word that matches this word in the lexicon. 
-            if sentiment == Sentiment.POSITIVE.value:
-                    if hebrew_word_translation[Sentiment.POSITIVE] == '':
-                        hebrew_word_translation[Sentiment.POSITIVE] = english_word
-                    hebrew_word_sentiment_count[Sentiment.POSITIVE] += 1
-            elif sentiment == Sentiment.NEGATIVE.value:
-                    if hebrew_word_translation[Sentiment.NEGATIVE] == '':
-                        hebrew_word_translation[Sentiment.NEGATIVE] = english_word
-                    hebrew_word_sentiment_count[Sentiment.NEGATIVE] += 1
-            else:
-                    if hebrew_word_translation[Sentiment.NEUTRAL] == '':
-                        hebrew_word_translation[Sentiment.NEUTRAL] = english_word
-                    hebrew_word_sentiment_count[Sentiment.NEUTRAL] += 1
-            # If hebrew word is not in the lexicon yet, add new values
-            if hebrew_word not in self.hebrew_english:
-                 self.hebrew_english[hebrew_word] = {'translation': english_word,  'sentiment': sentiment}
-            else:
-                 # Find the sentiment with max value
-                 # If positive == negative sentiment, assign hebrew word with neutral value
-                 max_count_sentiment = ''
-                 if hebrew_word_sentiment_count[Sentiment.POSITIVE] == hebrew_word_sentiment_count[Sentiment.NEGATIVE]:
-                    max_count_sentiment = Sentiment.NEUTRAL
-                 else:
-                    max_count_sentiment =  max(hebrew_word_sentiment_count, key=lambda k: hebrew_word_sentiment_count[k])
-                # set hebrew word lexicon record with max sentiment value, and the first english translation with the same sentiment value
-                 self.hebrew_english[hebrew_word] = {'translation': hebrew_word_translation[max_count_sentiment],  'sentiment': max_count_sentiment.value}
-                     
-            # # If hebrew word is not in the dictionay, add new values 
-            # if hebrew_word not in self.hebrew_english:
-            #     self.hebrew_english[hebrew_word] = {'translation': english_word,  'sentiment': sentiment}
-            # # Otherwise, set the hebrew word's translation as the first english word that matches this word in the lexicon. 
-            # # If the hebrew word has multiple translations in the lexicon, with conflicting sentiments, set sentiment as neutral.
-            # else:
-            #     if self.hebrew_english[hebrew_word]['sentiment'] != sentiment:
-            #         self.hebrew_english[hebrew_word]['sentiment'] = Sentiment.NEUTRAL.value
-            
-            # Update en-he lexicon.
-            # There is an onto function between all english words to hebrew words, so each english word appears once in the lexicon data  
-            self.english_hebrew[english_word] = {'translation': hebrew_word,  'sentiment': sentiment}
+        self.hebrew_english = build_hebrew_english(english_words, hebrew_words, sentiments)
+        # Update en-he lexicon.
+        # There is an onto function between all english words to hebrew words, so each english word appears once in the lexicon data  
+        self.english_hebrew = {english_word: {'translation': hebrew_word, 'sentiment': sentiment} for english_word, hebrew_word, sentiment in zip(english_words, hebrew_words, sentiments.tolist())}
     
     def hebrew_to_sentiment(self, hebrew_word):
         """
@@ -168,6 +187,19 @@ class SentimentLexicon:
             return -1
         return self.hebrew_english[hebrew_word]['sentiment']
 
+    def find_hebrew_word(self, hebrew_word):
+        """
+        Finds an hebrew word in the lexicon, also when its nikud is different (or missing) from the nikud in the lexicon.
+
+        Args:
+            hebrew_word (String): an hebrew word
+        Returns:
+            lexicon_word (String): the word as it is written in the lexicon. if no word with the same letters is found in lexicon, return -1.
+        """
+        if hebrew_word in self.hebrew_english:
+            return hebrew_word
+        return self.hebrew_english_index.lookup(hebrew_word)
+
     def english_to_sentiment(self, english_word):
         """
         Converts english word to it's sentiment value. 
@@ -1,7 +1,82 @@
 import pos_translator
 import sentiment_lexicon
+import lexicon_artifact
 import os
-import pandas as pd
+import csv
+from collections import OrderedDict
+
+# Get the path of the words lexicon, used to pre-warm the translation cache
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+WARM_CACHE_PATH = os.path.join(SCRIPT_PATH, '..', '..', '..', 'lexicon.csv')
+
+# default number of (word, upos, feats) triples kept by the translation cache
+DEFAULT_CACHE_SIZE = 100000
+
+class TranslationCache:
+    """
+    A bounded cache of sentiment values, that drops the least recently used value when it is full.
+
+    Attributes:
+        max_size (Int): maximal number of values in the cache. 0 disables the cache.
+        hits (Int): number of lookups that found a value.
+        misses (Int): number of lookups that did not find a value.
+        evictions (Int): number of values dropped to keep the cache under max_size.
+    """
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        """
+        Initialize an empty cache
+        """
+        self.max_size = max_size
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Gets the value of a key, and marks it as the most recently used.
+
+        Returns:
+            value: the cached value. If the key is not in the cache, return -1.
+        """
+        value = self.values.get(key, -1)
+        if value == -1:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.values.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Adds a value to the cache, and drops the least recently used values if the cache is full.
+        """
+        if self.max_size <= 0:
+            return
+        if key in self.values:
+            self.values.move_to_end(key)
+        self.values[key] = value
+        while len(self.values) > self.max_size:
+            self.values.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all values and resets the counters.
+        """
+        self.values.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self):
+        """
+        Gets the cache counters.
+
+        Returns:
+            info (Dictionary): hits, misses, evictions, current size and max size of the cache.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self.values), 'max_size': self.max_size}
 
 class SentimentTranslator:
     """
@@ -12,16 +87,118 @@ class SentimentTranslator:
         pos_translator (POSTranslator): Translator from hebrew to english using Universal Dependencies tags and features. 
 
     """
-    def __init__(self, naive=True):
+    def __init__(self, naive=True, compiled=True, cache_size=DEFAULT_CACHE_SIZE, prewarm=False, shared=None, segment_prefixes=False):
         """
-        Initialize sentiment_lexicon and pos_translator
+        Initialize sentiment_lexicon, pos_translator and the translation cache
+
+        Args:
+            naive (Bool): if true, use the naive parsing of the sentiment lexicon, otherwise, use rule based parsing.
+            compiled (Bool): if true, load the lexicons from the compiled lexicon file (built again only if the source files changed), otherwise, parse the source files.
+            cache_size (Int): maximal number of (word, upos, feats) triples kept in the translation cache. 0 disables the cache.
+            prewarm (Bool): if true, fill the translation cache with the words of lexicon.csv.
+            shared (SharedLexicon): if given, read the lexicons in place from a shared lexicon (see shared_lexicon.open_shared() and shared_lexicon.attach()), instead of loading them.
+            segment_prefixes (Bool): if true, a word the morphological analysis left unanalysed is translated without its prefix letters when it is not in the dictionary (see POSTranslator.find_token_word()).
         """
-        self.sentiment_lexicon = sentiment_lexicon.SentimentLexicon(naive)
-        self.pos_translator = pos_translator.POSTranslator()
+        self.cache = TranslationCache(cache_size)
+        if shared is not None:
+            self.sentiment_lexicon = sentiment_lexicon.SentimentLexicon(naive, *shared.lexicon(naive))
+            self.pos_translator = pos_translator.POSTranslator(shared.table('dictionary'), shared.mapper, shared.table('translation_index'), shared.index('dictionary_index', shared.table('translation_index')), segment_prefixes, flat_records=False)
+        elif compiled:
+            section = lexicon_artifact.lexicon_section(naive)
+            artifact = lexicon_artifact.load_or_build(sections=[section, 'dictionary', 'mapper', 'translation_index', 'dictionary_index'])
+            lexicon = artifact[section]
+            self.sentiment_lexicon = sentiment_lexicon.SentimentLexicon(naive, lexicon['english_hebrew'], lexicon['hebrew_english'], lexicon['hebrew_english_index'])
+            self.pos_translator = pos_translator.POSTranslator(artifact['dictionary'], artifact['mapper'], artifact['translation_index'], artifact['dictionary_index'], segment_prefixes)
+        else:
+            self.sentiment_lexicon = sentiment_lexicon.SentimentLexicon(naive)
+            self.pos_translator = pos_translator.POSTranslator(segment_prefixes=segment_prefixes)
+        if prewarm:
+            self.warm_cache()
+    
+    def cache_info(self):
+        """
+        Gets the translation cache counters.
+
+        Returns:
+            info (Dictionary): hits, misses, evictions, current size and max size of the cache.
+        """
+        return self.cache.info()
+    
+    def warm_cache(self, path=WARM_CACHE_PATH):
+        """
+        Fill the translation cache with the words of a lexicon file, until it is full, without changing the hit and miss counters.
+        If the cache is disabled, nothing is translated.
+
+        Args:
+            path (String): path to a csv file with the columns: word, upos, feats.
+        Returns:
+            count (Int): number of words added to the cache.
+        """
+        count = 0
+        if self.cache.max_size <= 0:
+            return count
+        with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+            for row in csv.DictReader(file):
+                # words added to a full cache would only drop the words added before them
+                if len(self.cache.values) >= self.cache.max_size:
+                    break
+                token = pos_translator.normalize_token(row['word'], row['upos'], row['feats'])
+                if token not in self.cache.values:
+                    self.cache.put(token, self.translate_uncached(*token))
+                    count += 1
+        return count
     
     def translate(self, word, upos, feats):
         """
         Assign sentiment value to a single hebrew word. 
+        Sentiment values are kept in the translation cache, as the same (word, upos, feats) triples repeat in a corpus.
+        
+        Args: 
+            word (String): An hebrew word.
+            upos (String): Universal Dependencies tag of a given word.
+            feats (String): Universal Dependencies features of a given word.
+        
+        Returns: 
+            sentiment (Int): sentiment value for the word.
+            If word could to be translated, a neutral sentiment value is assigned. 
+        """
+        token = pos_translator.normalize_token(word, upos, feats)
+        sentiment = self.cache.get(token)
+        if sentiment == -1:
+            sentiment = self.translate_uncached(*token)
+            self.cache.put(token, sentiment)
+        return sentiment
+    
+    def translate_batch(self, words, upos=None, feats=None, columns=pos_translator.TOKEN_COLUMNS):
+        """
+        Assign sentiment values to many hebrew words. Every distinct (word, upos, feats) triple is looked up once in the translation cache,
+        the triples that are not cached are translated together by POSTranslator.translate_tokens(), and the sentiments are scattered back to all their positions.
+
+        Args:
+            words (List): hebrew words, or a DataFrame with a words column, a upos column and a feats column.
+            upos (List): Universal Dependencies tag of each word. None if words is a DataFrame.
+            feats (List): Universal Dependencies features of each word. None if words is a DataFrame.
+            columns (Tuple): names of the words, upos and feats columns, when words is a DataFrame.
+        
+        Returns:
+            sentiments (np.ndarray): sentiment value of each word, in the given order.
+        """
+        import numpy as np
+        tokens, inverse = pos_translator.factorize_tokens(words, upos, feats, columns)
+        sentiments = np.fromiter((self.cache.get(token) for token in tokens), dtype=np.int64, count=len(tokens))
+        misses = np.flatnonzero(sentiments == -1)
+        if len(misses) > 0:
+            missed_tokens = [tokens[position] for position in misses]
+            translation_words = self.pos_translator.translate_tokens(missed_tokens)
+            for position, token, translation_word in zip(misses, missed_tokens, translation_words):
+                sentiment = self.translation_sentiment(token[0], translation_word)
+                sentiments[position] = sentiment
+                self.cache.put(token, sentiment)
+        return sentiments[inverse]
+    
+    def translate_uncached(self, word, upos, feats):
+        """
+        Assign sentiment value to a single hebrew word, without using the translation cache. 
         
         Args: 
             word (String): An hebrew word.
@@ -35,12 +212,28 @@ class SentimentTranslator:
         """
         # translate hebrew word to english word
         translation_word = self.pos_translator.translate(word, upos, feats)
+        return self.translation_sentiment(word, translation_word)
+
+    def translation_sentiment(self, word, translation_word):
+        """
+        Assign sentiment value to a single hebrew word, given its english translation.
+
+        Args:
+            word (String): An hebrew word.
+            translation_word (String): the english translation of the word, or -1 if it is not found in dictionary.
+
+        Returns:
+            sentiment (Int): sentiment value for the word.
+            If word could to be translated, a neutral sentiment value is assigned.
+        """
         sentiment = sentiment_lexicon.Sentiment.NEUTRAL.value
+        # the hebrew word as it is written in the sentiment lexicon, also if its nikud is different
+        lexicon_word = self.sentiment_lexicon.find_hebrew_word(word)
         # If word is not in dictionary, check if it's in sentiment lexicon
         if translation_word == -1: 
             # If word is not in sentiment lexicon, assign neutral sentiment
-            if word in self.sentiment_lexicon.hebrew_english:
-                sentiment =  self.sentiment_lexicon.hebrew_english[word]['sentiment']
+            if lexicon_word != -1:
+                sentiment =  self.sentiment_lexicon.hebrew_english[lexicon_word]['sentiment']
             else:
                 sentiment = sentiment_lexicon.Sentiment.NEUTRAL.value
         else: 
@@ -49,8 +242,8 @@ class SentimentTranslator:
                 sentiment = self.sentiment_lexicon.english_hebrew[translation_word]['sentiment']
             else: 
                 # If word is not in sentiment lexicon, assign neutral sentiment
-                if word in self.sentiment_lexicon.hebrew_english:
-                    sentiment =  self.sentiment_lexicon.hebrew_english[word]['sentiment']
+                if lexicon_word != -1:
+                    sentiment =  self.sentiment_lexicon.hebrew_english[lexicon_word]['sentiment']
                 else:
                     sentiment = sentiment_lexicon.Sentiment.NEUTRAL.value
         
@@ -0,0 +1,434 @@
+import os
+import json
+import math
+import atexit
+import mmap
+import zlib
+import struct
+from array import array
+from multiprocessing import shared_memory
+import lexicon_artifact
+from lexicon_index import LexiconIndex
+
+# Get the path of the shared lexicon
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+SHARED_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'shared_lexicon.bin')
+
+# The shared lexicon file is: MAGIC, version, header length, a json header, and then the blocks of all tables.
+# Every table is kept as flat sorted strings with a hash table of their positions, so a worker looks words up in place in the mapped file, without loading the lexicon into its own memory.
+# The pages of the file are shared by all workers that map it (or by all workers that attach the same shared memory block).
+MAGIC = b'HSSHM'
+# bump when the layout of the shared lexicon changes, so old files are rebuilt
+SHARED_VERSION = 2
+PREFIX = struct.Struct('<5sIQ')
+COUNT = struct.Struct('<I')
+# separators of the fields and of the records in a table value
+FIELD_SEPARATOR = '\x1f'
+RECORD_SEPARATOR = '\x1e'
+# a missing translation (NaN) in a lexicon entry, that is read back as NaN
+MISSING_TRANSLATION = ''
+
+def pad(payload):
+    """
+    Pad a block to a multiple of 4 bytes, so the offsets of the next block are aligned
+    """
+    return payload + b'\0' * (-len(payload) % 4)
+
+def pack_strings(strings):
+    """
+    Pack strings into a block: their count, the offset of every string in the text, and the utf-8 text of all strings.
+    """
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = array('I', [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return pad(COUNT.pack(len(encoded)) + offsets.tobytes() + b''.join(encoded))
+
+def pack_slots(strings):
+    """
+    Pack a hash table of strings into a block: open addressing slots, keyed by the crc32 of the utf-8 string (the same in every process, unlike hash()),
+    each holding the position of a string plus 1, or 0 if it is empty. There are at least twice as many slots as strings.
+    """
+    size = 1
+    while size < 2 * len(strings):
+        size *= 2
+    slots = array('I', bytes(4 * size))
+    for position, string in enumerate(strings):
+        slot = zlib.crc32(string.encode('utf-8')) & (size - 1)
+        while slots[slot] != 0:
+            slot = (slot + 1) & (size - 1)
+        slots[slot] = position + 1
+    return pack_array(slots)
+
+def pack_array(values):
+    """
+    Pack unsigned ints into a block: their count and their values.
+    """
+    values = array('I', values)
+    return pad(COUNT.pack(len(values)) + values.tobytes())
+
+def read_array(view, offset):
+    """
+    Gets the unsigned ints of a block packed by pack_array(), in place
+    """
+    count = COUNT.unpack_from(view, offset)[0]
+    return view[offset + COUNT.size:offset + COUNT.size + 4 * count].cast('I')
+
+class MappedStrings:
+    """
+    A read only sequence of strings, packed by pack_strings() in a buffer. A string is decoded only when it is read.
+
+    Attributes:
+        view (memoryview): the whole buffer.
+        offsets (memoryview): the offset of every string in the text, and the end of the text.
+        start (Int): position of the text in the buffer.
+        slots (memoryview): the hash table of the strings (see pack_slots()), or None if strings are not looked up.
+    """
+    def __init__(self, view, offset, slots_offset=None):
+        self.count = COUNT.unpack_from(view, offset)[0]
+        self.view = view
+        self.offsets = view[offset + COUNT.size:offset + COUNT.size + 4 * (self.count + 1)].cast('I')
+        self.start = offset + COUNT.size + 4 * (self.count + 1)
+        self.slots = read_array(view, slots_offset) if slots_offset is not None else None
+
+    def __len__(self):
+        return self.count
+
+    def raw(self, index):
+        """
+        Gets the utf-8 bytes of a string
+        """
+        return self.view[self.start + self.offsets[index]:self.start + self.offsets[index + 1]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError(index)
+        return str(self.view[self.start + self.offsets[index]:self.start + self.offsets[index + 1]], 'utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def find(self, value):
+        """
+        Gets the position of a string, through the hash table of the strings. Without a hash table, the strings must be sorted, and they are binary searched.
+        If it is not found, return -1
+        """
+        if not isinstance(value, str):
+            return -1
+        key = value.encode('utf-8')
+        if self.slots is not None:
+            mask = len(self.slots) - 1
+            slot = zlib.crc32(key) & mask
+            while self.slots[slot] != 0:
+                position = self.slots[slot] - 1
+                if self.view[self.start + self.offsets[position]:self.start + self.offsets[position + 1]] == key:
+                    return position
+                slot = (slot + 1) & mask
+            return -1
+        # utf-8 bytes have the same order as the strings
+        low = 0
+        high = len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(self.raw(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and bytes(self.raw(low)) == key:
+            return low
+        return -1
+
+    def __contains__(self, value):
+        return self.find(value) != -1
+
+class MappedTable:
+    """
+    A read only dictionary of strings to values, kept as sorted keys and packed values in a buffer.
+    Looking up a key is a binary search, and only the value of the found key is decoded.
+
+    Attributes:
+        keys_strings (MappedStrings): the keys, sorted.
+        values_strings (MappedStrings): the packed value of every key.
+        decode (Function): gets a packed value, and returns the value.
+    """
+    def __init__(self, keys_strings, values_strings, decode):
+        self.keys_strings = keys_strings
+        self.values_strings = values_strings
+        self.decode = decode
+
+    def __len__(self):
+        return len(self.keys_strings)
+
+    def __contains__(self, key):
+        return self.keys_strings.find(key) != -1
+
+    def __iter__(self):
+        return iter(self.keys_strings)
+
+    def __getitem__(self, key):
+        position = self.keys_strings.find(key)
+        if position == -1:
+            raise KeyError(key)
+        return self.decode(self.values_strings[position])
+
+    def get(self, key, default=None):
+        position = self.keys_strings.find(key)
+        if position == -1:
+            return default
+        return self.decode(self.values_strings[position])
+
+    def keys(self):
+        return iter(self.keys_strings)
+
+    def items(self):
+        for key, value in zip(self.keys_strings, self.values_strings):
+            yield key, self.decode(value)
+
+def encode_lexicon_entry(entry):
+    translation = entry['translation']
+    if isinstance(translation, float) and math.isnan(translation):
+        translation = MISSING_TRANSLATION
+    return f"{entry['sentiment']}{FIELD_SEPARATOR}{translation}"
+
+def decode_lexicon_entry(value):
+    sentiment, translation = value.split(FIELD_SEPARATOR, 1)
+    return {'translation': translation if translation != MISSING_TRANSLATION else float('nan'), 'sentiment': int(sentiment)}
+
+def encode_translation_entries(entries):
+    return RECORD_SEPARATOR.join(FIELD_SEPARATOR.join((upos, str(bits), translation_word)) for upos, bits, translation_word in entries)
+
+def decode_translation_entries(value):
+    entries = []
+    for record in value.split(RECORD_SEPARATOR):
+        upos, bits, translation_word = record.split(FIELD_SEPARATOR, 2)
+        entries.append((upos, int(bits), translation_word))
+    return tuple(entries)
+
+def encode_records(records):
+    return json.dumps(records, ensure_ascii=False)
+
+# the encoder and decoder of the values of every kind of table
+CODECS = {
+    'lexicon': (encode_lexicon_entry, decode_lexicon_entry),
+    'translation_index': (encode_translation_entries, decode_translation_entries),
+    'dictionary': (encode_records, json.loads),
+}
+
+def table_blocks(table, kind):
+    """
+    Pack a dictionary into a keys block and a values block
+    """
+    encode = CODECS[kind][0]
+    # a key that is not a string (like a missing word, NaN) can not be looked up by another object anyway
+    keys = sorted(key for key in table if isinstance(key, str))
+    return [pack_strings(keys), pack_slots(keys), pack_strings([encode(table[key]) for key in keys])]
+
+def index_blocks(index):
+    """
+    Pack a LexiconIndex into a keys block (with its hash table), a starts block and a forms block. Its form set is the keys block of its lexicon's table.
+    """
+    return [pack_strings(index.keys), pack_slots(index.keys), pack_array(index.starts), pack_strings(index.forms)]
+
+class MappedLexiconIndex(LexiconIndex):
+    """
+    A LexiconIndex read in place from a shared lexicon, that finds its keys through their hash table instead of a binary search.
+    """
+    def find_key(self, normalized_word):
+        return self.keys.find(normalized_word)
+
+def build_shared(path=SHARED_PATH, artifact=None):
+    """
+    Write the shared lexicon file from the sections of the compiled lexicon. The file is written aside and then renamed, so a reader never sees a partial file.
+
+    Args:
+        path (String): path of the shared lexicon file
+        artifact (Dictionary): the sections of the compiled lexicon. If None, load (or build) them.
+    """
+    if artifact is None:
+        artifact = lexicon_artifact.load_or_build()
+    lexicon_artifact.replace_file(path, pack_shared(artifact, lexicon_artifact.build_header()))
+
+def pack_shared(artifact, header):
+    """
+    Pack the sections of the compiled lexicon into a shared lexicon.
+
+    Args:
+        artifact (Dictionary): the sections of the compiled lexicon
+        header (Dictionary): the fields that tell which code and sources the sections were built from (see lexicon_artifact.build_header())
+    Returns:
+        payloads (List): the bytes of the shared lexicon file, in order
+    """
+    # name of every table, its kind, and its dictionary or LexiconIndex
+    tables = [('dictionary', 'dictionary', artifact['dictionary']), ('translation_index', 'translation_index', artifact['translation_index']), ('dictionary_index', 'index', artifact['dictionary_index'])]
+    for naive in [True, False]:
+        section = lexicon_artifact.lexicon_section(naive)
+        tables.append((f"{section}.english_hebrew", 'lexicon', artifact[section]['english_hebrew']))
+        tables.append((f"{section}.hebrew_english", 'lexicon', artifact[section]['hebrew_english']))
+        tables.append((f"{section}.hebrew_english_index", 'index', artifact[section]['hebrew_english_index']))
+    header = dict(header, mapper=artifact['mapper'], tables={})
+    blocks = []
+    offset = 0
+    for name, kind, table in tables:
+        table_block = index_blocks(table) if kind == 'index' else table_blocks(table, kind)
+        header['tables'][name] = {'kind': kind, 'offsets': []}
+        for block in table_block:
+            header['tables'][name]['offsets'].append(offset)
+            offset += len(block)
+        blocks.extend(table_block)
+    header_payload = pad(json.dumps(header, ensure_ascii=False).encode('utf-8'))
+    return [PREFIX.pack(MAGIC, SHARED_VERSION, len(header_payload)), header_payload] + blocks
+
+class SharedLexicon:
+    """
+    The lexicons of SentimentTranslator, read in place from a buffer holding a shared lexicon file: a memory map of the file, or a shared memory block.
+    All lookups read the buffer, so workers that use the same file (or block) share its memory.
+
+    Attributes:
+        view (memoryview): the shared lexicon.
+        header (Dictionary): the header of the shared lexicon, with the mapper and the position of every table.
+        blocks (memoryview): the blocks of all tables, after the header.
+        mapper (Dictionary): the POS mapper of the translation index.
+        views (List): the views of the blocks held by tables and indexes, released by close().
+    """
+    def __init__(self, buffer, owner=None):
+        """
+        Read the header of the shared lexicon. Raises ValueError if the buffer is not a shared lexicon of the current version.
+
+        Args:
+            buffer: a buffer holding a shared lexicon file
+            owner: the mmap or SharedMemory holding the buffer, closed by close()
+        """
+        self.view = memoryview(buffer)
+        self.owner = owner
+        magic, version, header_length = PREFIX.unpack_from(self.view, 0)
+        if magic != MAGIC or version != SHARED_VERSION:
+            raise ValueError("not a shared lexicon of the current version")
+        self.header = json.loads(str(self.view[PREFIX.size:PREFIX.size + header_length], 'utf-8').rstrip('\0'))
+        self.blocks = self.view[PREFIX.size + header_length:]
+        self.mapper = self.header['mapper']
+        self.views = []
+
+    def strings(self, offset, slots_offset=None):
+        strings = MappedStrings(self.blocks, offset, slots_offset)
+        self.views.append(strings.offsets)
+        if strings.slots is not None:
+            self.views.append(strings.slots)
+        return strings
+
+    def table(self, name):
+        """
+        Gets a table of the shared lexicon as a read only dictionary (MappedTable)
+        """
+        table = self.header['tables'][name]
+        keys_offset, slots_offset, values_offset = table['offsets']
+        return MappedTable(self.strings(keys_offset, slots_offset), self.strings(values_offset), CODECS[table['kind']][1])
+
+    def index(self, name, words):
+        """
+        Gets an index of the shared lexicon as a LexiconIndex, whose arrays are read in place.
+
+        Args:
+            name (String): name of the index table
+            words (MappedTable): the table of the indexed words
+        """
+        keys_offset, slots_offset, starts_offset, forms_offset = self.header['tables'][name]['offsets']
+        starts = read_array(self.blocks, starts_offset)
+        self.views.append(starts)
+        return MappedLexiconIndex.from_parts(self.strings(keys_offset, slots_offset), starts, self.strings(forms_offset), words)
+
+    def lexicon(self, naive):
+        """
+        Gets the en-he lexicon, the he-en lexicon and the index of the he-en lexicon of a parsing mode
+        """
+        section = lexicon_artifact.lexicon_section(naive)
+        hebrew_english = self.table(f"{section}.hebrew_english")
+        return self.table(f"{section}.english_hebrew"), hebrew_english, self.index(f"{section}.hebrew_english_index", hebrew_english)
+
+    def is_up_to_date(self):
+        """
+        Checks if the shared lexicon was built from the current source files (see lexicon_artifact.is_up_to_date())
+        """
+        return lexicon_artifact.is_up_to_date(self.header)
+
+    def close(self):
+        """
+        Release the buffer. Tables and indexes of the shared lexicon can not be used after it is closed.
+        """
+        for view in self.views + [self.blocks, self.view]:
+            view.release()
+        self.views = []
+        if self.owner is not None:
+            self.owner.close()
+            self.owner = None
+
+def open_shared(path=SHARED_PATH):
+    """
+    Map a shared lexicon file, read only, building it first if it is missing, of another version or built from other code or sources.
+    A file whose sources were only touched is built again as well, from the compiled lexicon, so the next start does not hash the sources again.
+
+    Returns:
+        shared (SharedLexicon)
+    """
+    shared = -1
+    if os.path.exists(path):
+        shared = map_file(path)
+    if shared != -1 and shared.is_up_to_date() and lexicon_artifact.has_current_stats(shared.header):
+        return shared
+    if shared != -1:
+        shared.close()
+    build_shared(path)
+    return map_file(path)
+
+def map_file(path):
+    """
+    Map a shared lexicon file, read only. If it is not a shared lexicon of the current version, return -1
+    """
+    try:
+        with open(path, 'rb') as shared_file:
+            data = mmap.mmap(shared_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return -1
+    try:
+        return SharedLexicon(data, data)
+    except (ValueError, struct.error):
+        data.close()
+        return -1
+
+def publish(path=SHARED_PATH, name=None):
+    """
+    Copy the shared lexicon file into a shared memory block, for workers that attach() it by name instead of mapping the file.
+    The block lives until it is unlinked, so the caller unlinks it when all workers are done.
+
+    Args:
+        path (String): path of the shared lexicon file. It is built first if needed.
+        name (String): name of the block. If None, a unique name is chosen.
+    Returns:
+        block (shared_memory.SharedMemory): the block, with its name in block.name
+    """
+    open_shared(path).close()
+    with open(path, 'rb') as shared_file:
+        payload = shared_file.read()
+    block = shared_memory.SharedMemory(name=name, create=True, size=len(payload))
+    block.buf[:len(payload)] = payload
+    return block
+
+def attach(name):
+    """
+    Attach a shared memory block created by publish(), in a worker process started by the publishing process.
+    Before python 3.13 an attached block is tracked like a created one, so a process that was not started by the publisher should map the file with open_shared() instead.
+
+    Returns:
+        shared (SharedLexicon): it is closed when the worker exits, before the block itself is.
+    """
+    try:
+        block = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        block = shared_memory.SharedMemory(name=name)
+    shared = SharedLexicon(block.buf, block)
+    atexit.register(shared.close)
+    return shared
@@ -0,0 +1,36 @@
+import os
+import sys
+import subprocess
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+import lexicon_artifact
+
+# every cold start is timed in a new process, like a restarted worker
+COLD_START = """
+import sys
+import time
+start = time.perf_counter()
+sys.path.append({src_path!r})
+from sentiment_translator import SentimentTranslator
+translator = SentimentTranslator({naive}, compiled={compiled})
+print(time.perf_counter() - start)
+"""
+
+def cold_start_time(naive, compiled, repeats=3):
+    """
+    Gets the best time, in seconds, of importing and creating a SentimentTranslator in a new process.
+    """
+    code = COLD_START.format(src_path=os.path.join(project_dir, "src"), naive=naive, compiled=compiled)
+    times = [float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout) for _ in range(repeats)]
+    return min(times)
+
+# make sure the compiled lexicon is up to date before timing the cold start
+lexicon_artifact.load_or_build()
+
+for naive in [True, False]:
+    sources_time = cold_start_time(naive, False)
+    artifact_time = cold_start_time(naive, True)
+    print(f"naive={naive}: from sources {sources_time * 1000:.1f}ms, from compiled lexicon {artifact_time * 1000:.1f}ms")
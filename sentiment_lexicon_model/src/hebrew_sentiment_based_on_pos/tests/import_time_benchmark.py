@@ -0,0 +1,43 @@
+import os
+import sys
+import json
+import subprocess
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+dicta_dir = os.path.abspath(os.path.join(project_dir, "..", "dicta_for_morphological_analysis"))
+
+# modules timed, with the folder they are imported from
+MODULES = [
+    (os.path.join(project_dir, "src"), 'sentiment_translator'),
+    (os.path.join(project_dir, "src"), 'lexicon_artifact'),
+    (os.path.abspath(os.path.join(project_dir, "..", "..")), 'sentiment_pipeline'),
+    (os.path.join(dicta_dir, "src"), 'dicta_api_utils'),
+    (os.path.join(dicta_dir, "src"), 'conllu_parser'),
+    (os.path.join(dicta_dir, "src"), 'morphological_analyzer'),
+]
+# heavy dependencies that should only be imported when they are used
+HEAVY_MODULES = ['pandas', 'numpy', 'requests']
+
+# every import is timed in a new process, like a restarted worker
+IMPORT = """
+import sys
+import json
+import time
+sys.path.append({src_path!r})
+start = time.perf_counter()
+import {module}
+print(json.dumps({{'time': time.perf_counter() - start, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def import_time(src_path, module, repeats=5):
+    """
+    Gets the best time, in seconds, of importing a module in a new process, and the heavy dependencies it imported.
+    """
+    code = IMPORT.format(src_path=src_path, module=module, heavy=HEAVY_MODULES)
+    results = [json.loads(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout) for _ in range(repeats)]
+    return min(result['time'] for result in results), results[0]['loaded']
+
+for src_path, module in MODULES:
+    seconds, loaded = import_time(src_path, module)
+    print(f"import {module}: {seconds * 1000:.1f}ms, heavy dependencies: {', '.join(loaded) if len(loaded) > 0 else 'none'}")
@@ -13,16 +13,9 @@ DATA_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'random_sentences_for_testin
 
 DATA = pd.read_csv(DATA_PATH)
 
-df = pd.DataFrame(columns=['word','translation','sentiment'])
 sentiment_translator = sentiment_translator.SentimentTranslator()
-iterations = 0 
-for index, row in DATA.iterrows():
-    word = row['Word']
-    translation = sentiment_translator.pos_translator.translate(row['Word'],row['UPOS'], row['Features'])
-    sentiment = sentiment_translator.translate(row['Word'],row['UPOS'], row['Features'])
-    new_row = {'word': word, 'translation': translation ,'sentiment': sentiment}
-    df = df.append(new_row, ignore_index=True)
-    iterations += 1
-    print(iterations)
+# translate all words at once
+columns = ('Word', 'UPOS', 'Features')
+df = pd.DataFrame({'word': DATA[columns[0]], 'translation': sentiment_translator.pos_translator.translate_batch(DATA, columns=columns), 'sentiment': sentiment_translator.translate_batch(DATA, columns=columns)})
 
-df.to_csv('pos_translation_test3.csv', index = False, encoding = 'utf-8-sig')
\ No newline at end of file
+df.to_csv('pos_translation_test3.csv', index = False, encoding = 'utf-8-sig')
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# the metrics layer is in the folder of the sentiment pipeline, that adds the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(project_dir, "..", "..")))
+import metrics
+from sentiment_translator import SentimentTranslator
+
+# number of words translated, number of words in a sentence, and number of timed repeats
+WORDS_COUNT = 20000
+SENTENCE_LENGTH = 10
+REPEATS = 5
+
+def translate_time(translator, tokens):
+    """
+    Gets the best time, in seconds, of translating all tokens a sentence at a time, like the pipeline does, with the translation cache warm
+    """
+    sentences = [list(zip(*tokens[start:start + SENTENCE_LENGTH])) for start in range(0, len(tokens), SENTENCE_LENGTH)]
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for words, upos, feats in sentences:
+            translator.translate_batch(list(words), list(upos), list(feats))
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+translator = SentimentTranslator(False)
+tokens = [(word, 'NOUN', '_') for word in list(translator.sentiment_lexicon.hebrew_english)[:WORDS_COUNT]]
+translate_time(translator, tokens)
+
+plain_time = translate_time(translator, tokens)
+run_metrics = metrics.instrument()
+instrumented_time = translate_time(translator, tokens)
+metrics.uninstrument()
+restored_time = translate_time(translator, tokens)
+
+print(f"{len(tokens)} cached translations, {SENTENCE_LENGTH} words a sentence")
+print(f"without metrics: {plain_time * 1000:.1f}ms, with metrics: {instrumented_time * 1000:.1f}ms, after uninstrument: {restored_time * 1000:.1f}ms")
+print('\n'.join(run_metrics.summary()))
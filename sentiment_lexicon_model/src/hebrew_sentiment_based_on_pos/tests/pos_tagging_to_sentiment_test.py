@@ -14,16 +14,9 @@ DATA_PATH = os.path.join(SCRIPT_PATH, '..', 'data', 'morphologicaltagging_v_2_12
 
 POS_TAGGINGS = pd.read_csv(DATA_PATH)
 
-df = pd.DataFrame(columns=['word','translation','sentiment'])
 sentiment_translator = sentiment_translator.SentimentTranslator()
-iterations = 0 
-for index, row in POS_TAGGINGS.iterrows():
-    word = row['LEMMA']
-    translation = sentiment_translator.pos_translator.translate(row['LEMMA'],row['U-POS'], row['FEATS'])
-    sentiment = sentiment_translator.translate(row['LEMMA'],row['U-POS'], row['FEATS'])
-    new_row = {'word': word, 'translation': translation ,'sentiment': sentiment}
-    df = df.append(new_row, ignore_index=True)
-    iterations += 1
-    print(iterations)
+# translate all words at once
+columns = ('LEMMA', 'U-POS', 'FEATS')
+df = pd.DataFrame({'word': POS_TAGGINGS[columns[0]], 'translation': sentiment_translator.pos_translator.translate_batch(POS_TAGGINGS, columns=columns), 'sentiment': sentiment_translator.translate_batch(POS_TAGGINGS, columns=columns)})
 
-df.to_csv('pos_translation_test3.csv', index = False, encoding = 'utf-8-sig')
\ No newline at end of file
+df.to_csv('pos_translation_test3.csv', index = False, encoding = 'utf-8-sig')
\ No newline at end of file
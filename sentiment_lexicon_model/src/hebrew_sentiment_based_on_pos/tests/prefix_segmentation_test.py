@@ -0,0 +1,79 @@
+import os
+import sys
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path, and this folder for the tiny lexicon of the shared lexicon tests
+sys.path.append(os.path.join(project_dir, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import pos_translator
+from lexicon_index import LexiconIndex
+from prefix_segmentation import PrefixSegmenter
+from sentiment_lexicon import Sentiment
+from sentiment_translator import SentimentTranslator
+from shared_lexicon_test import DICTIONARY, build_artifact, open_tiny_shared
+
+def test_decompose():
+    """
+    Prefix letters are removed, shortest prefix first, with or without nikud, until a known stem is left
+    """
+    segmenter = PrefixSegmenter(LexiconIndex(DICTIONARY))
+    assert segmenter.segment('והבית') == ('וה', 'בַּיִת')
+    assert segmenter.segment('וְהַבַּיִת') == ('וה', 'בַּיִת')
+    assert segmenter.segment('בבית') == ('ב', 'בַּיִת')
+    assert segmenter.segment('ושמח') == ('ו', 'שָׂמַח')
+
+def test_not_prefix_letters():
+    """
+    Letters that are not prefix letters, more than MAX_PREFIX_LETTERS prefix letters, or unknown stems are not removed
+    """
+    segmenter = PrefixSegmenter(LexiconIndex(DICTIONARY))
+    for word in ['תבית', 'ותבית', 'ושמהבית', 'בית', 'והכלב', -1]:
+        assert segmenter.segment(word) == -1
+
+def test_cache_bound():
+    """
+    The cache keeps at most max_size decompositions, and drops the least recently used one
+    """
+    segmenter = PrefixSegmenter(LexiconIndex(DICTIONARY), max_size=2)
+    for word in ['והבית', 'בבית', 'והבית', 'וספר', 'בבית', 'וספר']:
+        segmenter.segment(word)
+    assert list(segmenter.decompositions) == ['בבית', 'וספר']
+    assert segmenter.cache_info() == {'hits': 2, 'misses': 4, 'size': 2, 'max_size': 2}
+    # without a cache, nothing is kept
+    segmenter = PrefixSegmenter(LexiconIndex(DICTIONARY), max_size=0)
+    assert segmenter.segment('והבית') == ('וה', 'בַּיִת')
+    assert segmenter.cache_info() == {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 0}
+
+def test_unanalysed_words():
+    """
+    Only words that the morphological analysis left unanalysed are segmented, and only if the translator segments prefixes
+    """
+    translator = pos_translator.POSTranslator(DICTIONARY, pos_translator.DATA, segment_prefixes=True)
+    house = translator.translate('בַּיִת', '_', '_')
+    tokens = [('והבית', '_', '_'), ('והבית', 'X', '_'), ('והבית', '', '_'), ('והבית', 'NOUN', 'Gender=Masc'), ('ותבית', '_', '_')]
+    expected = [house, house, house, -1, -1]
+    assert [translator.translate(*token) for token in tokens] == expected
+    assert translator.translate_tokens(tokens).tolist() == expected
+    assert translator.translate_form('והבית', 'NOUN', 'Gender=Masc') == house
+    translator = pos_translator.POSTranslator(DICTIONARY, pos_translator.DATA)
+    assert translator.translate('והבית', '_', '_') == -1
+    assert translator.translate_tokens(tokens).tolist() == [-1] * len(tokens)
+
+def test_sentiment_translator():
+    """
+    The sentiment of an unanalysed word with prefix letters is the sentiment of its stem
+    """
+    shared = open_tiny_shared(build_artifact())
+    words, upos, feats = ['והבית', 'והבית'], ['_', 'NOUN'], ['_', 'Gender=Masc']
+    assert SentimentTranslator(False, shared=shared, segment_prefixes=True).translate_batch(words, upos, feats).tolist() == [Sentiment.POSITIVE.value, Sentiment.NEUTRAL.value]
+    assert SentimentTranslator(False, shared=shared).translate_batch(words, upos, feats).tolist() == [Sentiment.NEUTRAL.value, Sentiment.NEUTRAL.value]
+    shared.close()
+
+if __name__ == '__main__':
+    test_decompose()
+    test_not_prefix_letters()
+    test_cache_bound()
+    test_unanalysed_words()
+    test_sentiment_translator()
+    print("prefix segmentation tests passed")
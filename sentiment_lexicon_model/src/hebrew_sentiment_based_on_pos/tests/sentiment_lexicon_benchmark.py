@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+import sentiment_lexicon
+from sentiment_lexicon import Sentiment
+
+def legacy_parse(lexicon_data, naive):
+    """
+    The row by row parsing of the lexicon data, as it was before the column-wise build.
+    """
+    lexicon_data = lexicon_data.copy()
+    lexicon_data['sentiment'] = None
+    for index, _ in lexicon_data.iterrows():
+        if naive:
+            if lexicon_data.loc[index, 'positive'] == 1:
+                lexicon_data.loc[index, 'sentiment'] = Sentiment.POSITIVE.value
+            elif lexicon_data.loc[index,'negative'] == 1:
+                lexicon_data.loc[index, 'sentiment'] = Sentiment.NEGATIVE.value
+            else:
+                lexicon_data.loc[index, 'sentiment'] = Sentiment.NEUTRAL.value
+        else:
+            positive_points = lexicon_data.loc[index,'anticipation'] + lexicon_data.loc[index,'joy'] + lexicon_data.loc[index,'surprise'] + lexicon_data.loc[index,'trust'] + (5 * lexicon_data.loc[index,'positive'])
+            negative_points = lexicon_data.loc[index,'sadness'] + lexicon_data.loc[index,'fear'] + lexicon_data.loc[index,'disgust'] + lexicon_data.loc[index,'anger'] + (5 * lexicon_data.loc[index,'negative'])
+            if positive_points > negative_points:
+                lexicon_data.loc[index,'sentiment'] = Sentiment.POSITIVE.value
+            elif negative_points > positive_points:
+                lexicon_data.loc[index,'sentiment'] = Sentiment.NEGATIVE.value
+            else:
+                lexicon_data.loc[index,'sentiment'] = Sentiment.NEUTRAL.value
+
+    return lexicon_data.rename(columns={"English Word": "english_word", "Hebrew Word": "hebrew_word"})
+
+def legacy_lexicon(naive):
+    """
+    The row by row build of english_hebrew and hebrew_english, as it was before the column-wise build.
+    """
+    lexicon_data = legacy_parse(sentiment_lexicon.get_lexicon_data(), naive)
+    english_hebrew = {}
+    hebrew_english = {}
+    hebrew_word_sentiment_count = {Sentiment.POSITIVE: 0, Sentiment.NEGATIVE: 0, Sentiment.NEUTRAL: 0}
+    hebrew_word_translation = {Sentiment.POSITIVE: '', Sentiment.NEGATIVE: '', Sentiment.NEUTRAL: ''}
+    for index , _ in lexicon_data.iterrows():
+        hebrew_word = lexicon_data.loc[index,'hebrew_word']
+        english_word = lexicon_data.loc[index,'english_word']
+        sentiment = lexicon_data.loc[index,'sentiment']
+        current_sentiment = Sentiment(sentiment)
+        if hebrew_word_translation[current_sentiment] == '':
+            hebrew_word_translation[current_sentiment] = english_word
+        hebrew_word_sentiment_count[current_sentiment] += 1
+        if hebrew_word not in hebrew_english:
+            hebrew_english[hebrew_word] = {'translation': english_word,  'sentiment': sentiment}
+        else:
+            if hebrew_word_sentiment_count[Sentiment.POSITIVE] == hebrew_word_sentiment_count[Sentiment.NEGATIVE]:
+                max_count_sentiment = Sentiment.NEUTRAL
+            else:
+                max_count_sentiment =  max(hebrew_word_sentiment_count, key=lambda k: hebrew_word_sentiment_count[k])
+            hebrew_english[hebrew_word] = {'translation': hebrew_word_translation[max_count_sentiment],  'sentiment': max_count_sentiment.value}
+        english_hebrew[english_word] = {'translation': hebrew_word,  'sentiment': sentiment}
+
+    return english_hebrew, hebrew_english
+
+def same_lexicon(first, second):
+    """
+    Compare two lexicons. NaN keys and values (empty cells in the lexicon data) are compared as strings.
+    """
+    return {str(key): {k: str(v) for k, v in value.items()} for key, value in first.items()} == {str(key): {k: str(v) for k, v in value.items()} for key, value in second.items()}
+
+if __name__ == '__main__':
+    for naive in [True, False]:
+        start = time.perf_counter()
+        english_hebrew, hebrew_english = legacy_lexicon(naive)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lexicon = sentiment_lexicon.SentimentLexicon(naive)
+        current_time = time.perf_counter() - start
+
+        print(f"naive={naive}: row by row build {legacy_time:.3f}s, column-wise build {current_time:.3f}s, speedup x{legacy_time / current_time:.1f}")
+        print(f"english_hebrew equal: {same_lexicon(english_hebrew, lexicon.english_hebrew)}")
+        print(f"hebrew_english equal: {same_lexicon(hebrew_english, lexicon.hebrew_english)}")
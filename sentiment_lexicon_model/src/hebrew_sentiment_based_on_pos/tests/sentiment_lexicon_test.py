@@ -0,0 +1,57 @@
+import os
+import sys
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path, and this folder for the row by row build of the benchmark
+sys.path.append(os.path.join(project_dir, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import sentiment_lexicon
+from sentiment_lexicon_benchmark import legacy_lexicon, same_lexicon
+
+# number of lexicon rows compared, the row by row build of the whole lexicon takes seconds
+ROWS_COUNT = 3000
+
+def lexicon_head():
+    """
+    Gets the first ROWS_COUNT rows of the lexicon data, with hebrew words that repeat in them
+    """
+    lexicon_data = sentiment_lexicon.get_lexicon_data().head(ROWS_COUNT)
+    assert lexicon_data['Hebrew Word'].duplicated().any()
+    return lexicon_data
+
+def check_same_build(naive):
+    """
+    Build the lexicon column-wise and row by row, from the same rows, and check both dictionaries are equal
+    """
+    lexicon_data = sentiment_lexicon.get_lexicon_data()
+    sentiment_lexicon.LEXICON_DATA = lexicon_head()
+    try:
+        english_hebrew, hebrew_english = legacy_lexicon(naive)
+        lexicon = sentiment_lexicon.SentimentLexicon(naive)
+    finally:
+        sentiment_lexicon.LEXICON_DATA = lexicon_data
+    assert len(lexicon.hebrew_english) > 0
+    assert same_lexicon(english_hebrew, lexicon.english_hebrew)
+    assert same_lexicon(hebrew_english, lexicon.hebrew_english)
+
+def test_naive_build():
+    check_same_build(True)
+
+def test_rule_based_build():
+    check_same_build(False)
+
+def test_lexicon_data_unchanged():
+    """
+    Building a lexicon does not change the lexicon data, so it can be built again with the other parsing
+    """
+    columns = list(sentiment_lexicon.get_lexicon_data().columns)
+    sentiment_lexicon.SentimentLexicon(True)
+    sentiment_lexicon.SentimentLexicon(False)
+    assert list(sentiment_lexicon.get_lexicon_data().columns) == columns
+
+if __name__ == '__main__':
+    test_naive_build()
+    test_rule_based_build()
+    test_lexicon_data_unchanged()
+    print("sentiment lexicon tests passed")
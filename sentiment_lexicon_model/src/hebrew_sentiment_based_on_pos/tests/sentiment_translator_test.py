@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path, and this folder for the tiny lexicon of the shared lexicon tests
+sys.path.append(os.path.join(project_dir, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sentiment_lexicon import Sentiment
+from sentiment_translator import SentimentTranslator
+from shared_lexicon_test import build_artifact, open_tiny_shared
+
+# a words lexicon like lexicon.csv, with its byte order mark and a word that repeats
+WORDS_TEXT = '\ufeffword,upos,feats\nשמח,VERB,_\nבַּיִת,NOUN,Gender=Masc\nשמח,VERB,_\nספר,NOUN,_\n'
+
+def warm(cache_size):
+    """
+    Warm the translation cache of a translator of the tiny lexicon, with the words lexicon
+
+    Returns:
+        translator (SentimentTranslator)
+        count (Int): the number of words warm_cache() added
+    """
+    shared = open_tiny_shared(build_artifact())
+    translator = SentimentTranslator(False, cache_size=cache_size, shared=shared)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'lexicon.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(WORDS_TEXT)
+        count = translator.warm_cache(path)
+    return translator, count
+
+def test_warm_cache():
+    """
+    Every distinct word is added once, and the hit and miss counters do not change
+    """
+    translator, count = warm(100)
+    assert count == 3
+    assert translator.cache_info() == {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 3, 'max_size': 100}
+    assert translator.translate('שמח', 'VERB', '_') == Sentiment.POSITIVE.value
+    assert translator.cache_info()['hits'] == 1
+
+def test_warm_full_cache():
+    """
+    Warming stops when the cache is full, so no warmed word is dropped
+    """
+    translator, count = warm(2)
+    assert count == 2
+    assert translator.cache_info() == {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 2, 'max_size': 2}
+
+def test_warm_disabled_cache():
+    """
+    Nothing is warmed into a disabled cache, and words are still translated
+    """
+    translator, count = warm(0)
+    assert count == 0
+    assert translator.cache_info()['size'] == 0
+    assert translator.translate('שמח', 'VERB', '_') == Sentiment.POSITIVE.value
+    assert translator.cache_info()['size'] == 0
+
+if __name__ == '__main__':
+    test_warm_cache()
+    test_warm_full_cache()
+    test_warm_disabled_cache()
+    print("sentiment translator tests passed")
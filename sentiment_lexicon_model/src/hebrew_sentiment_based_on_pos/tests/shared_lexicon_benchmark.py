@@ -0,0 +1,77 @@
+import os
+import sys
+import multiprocessing
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+import shared_lexicon
+
+# number of workers running at the same time, and number of words each of them translates
+WORKERS = 4
+WORDS_COUNT = 20000
+
+def memory_usage():
+    """
+    Gets the memory of the current process in MB, from /proc (linux only): resident, proportional (shared pages split between the processes that map them) and private.
+    """
+    usage = {}
+    with open('/proc/self/smaps_rollup', 'r') as smaps:
+        for line in smaps:
+            fields = line.split()
+            if fields[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                usage[fields[0][:-1]] = int(fields[1]) / 1024
+    return {'rss': usage['Rss'], 'pss': usage['Pss'], 'private': usage['Private_Clean'] + usage['Private_Dirty']}
+
+def worker(mode, source, barrier, results):
+    """
+    Create a SentimentTranslator, translate words with it, and measure the memory of the worker once all workers are ready.
+    """
+    sys.path.append(os.path.join(project_dir, "src"))
+    from sentiment_translator import SentimentTranslator
+    if mode == 'compiled':
+        translator = SentimentTranslator(False)
+    elif mode == 'mapped file':
+        translator = SentimentTranslator(False, shared=shared_lexicon.open_shared(source))
+    elif mode == 'shared memory':
+        translator = SentimentTranslator(False, shared=shared_lexicon.attach(source))
+    else:
+        translator = None
+    if translator is not None:
+        words = list(translator.sentiment_lexicon.hebrew_english)[:WORDS_COUNT]
+        for word in words:
+            translator.translate(word, 'NOUN', '_')
+    # measure when all workers hold the lexicon, so the shared pages are split between all of them
+    barrier.wait()
+    results.put(memory_usage())
+    barrier.wait()
+
+def measure(mode, source=None):
+    """
+    Gets the average memory of WORKERS workers of a mode, running at the same time.
+    """
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(WORKERS)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, source, barrier, results)) for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    usages = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: sum(usage[key] for usage in usages) / len(usages) for key in usages[0]}
+
+if __name__ == '__main__':
+    # make sure the shared lexicon file is up to date before the workers map it
+    shared_lexicon.open_shared().close()
+    block = shared_lexicon.publish()
+    try:
+        baseline = measure('imports only')
+        print(f"{WORKERS} workers, {WORDS_COUNT} words each, memory per worker in MB (and above a worker without a lexicon)")
+        for mode, source in [('compiled', None), ('mapped file', shared_lexicon.SHARED_PATH), ('shared memory', block.name)]:
+            usage = measure(mode, source)
+            print(f"{mode}: rss {usage['rss']:.1f}, pss {usage['pss']:.1f} (+{usage['pss'] - baseline['pss']:.1f}), private {usage['private']:.1f} (+{usage['private'] - baseline['private']:.1f})")
+    finally:
+        block.close()
+        block.unlink()
@@ -0,0 +1,122 @@
+import os
+import sys
+import math
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.join(project_dir, "src"))
+import shared_lexicon
+import pos_translator
+from lexicon_index import LexiconIndex
+from sentiment_lexicon import Sentiment
+from sentiment_translator import SentimentTranslator
+
+# a tiny hebrew-english dictionary: a noun, a verb with two records, and two words with the same letters and other nikud
+DICTIONARY = {
+    'בַּיִת': [{'part_of_speech': "שֵם ז'", 'translation': ['house (building)', 'home']}],
+    'שָׂמַח': [{'part_of_speech': "פ' קל", 'translation': ['to be happy']}, {'part_of_speech': 'תואר', 'translation': ['glad', 'cheerful person']}],
+    'סֵפֶר': [{'part_of_speech': "שֵם ז'", 'translation': ['book']}],
+    'סָפַר': [{'part_of_speech': "פ' קל", 'translation': ['to count']}],
+}
+# the sentiment lexicon of each parsing mode, as english-hebrew and hebrew-english entries. A missing word (NaN) is not a string, and is left out of the shared lexicon.
+LEXICONS = {
+    True: ({'happy': {'translation': 'שמח', 'sentiment': Sentiment.POSITIVE.value}, 'count': {'translation': 'ספר', 'sentiment': Sentiment.NEUTRAL.value}},
+           {'שמח': {'translation': 'happy', 'sentiment': Sentiment.POSITIVE.value}, 'בית': {'translation': 'house', 'sentiment': Sentiment.NEUTRAL.value},
+            float('nan'): {'translation': 'nothing', 'sentiment': Sentiment.NEGATIVE.value}}),
+    False: ({'happy': {'translation': 'שמח', 'sentiment': Sentiment.POSITIVE.value}, 'house': {'translation': 'בית', 'sentiment': Sentiment.POSITIVE.value}},
+            {'שמח': {'translation': 'happy', 'sentiment': Sentiment.POSITIVE.value}, 'בַּיִת': {'translation': 'house', 'sentiment': Sentiment.POSITIVE.value}}),
+}
+# tokens translated with the lexicons in memory and read in place from the shared lexicon: known words, other nikud, unknown words and missing values
+TOKENS = [('בַּיִת', 'NOUN', 'Gender=Masc'), ('בית', 'NOUN', '_'), ('שָׂמַח', 'VERB', 'HebBinyan=PAAL'), ('שָׂמַח', 'ADJ', '_'), ('שמח', 'VERB', '_'),
+          ('ספר', 'NOUN', 'Gender=Masc'), ('סָפַר', 'VERB', 'HebBinyan=PAAL'), ('כלב', 'NOUN', '_'), (-1, -1, '_')]
+
+# the sentiment of each token in each parsing mode. "glad" is not in the naive lexicon, so the sentiment of the hebrew word is used.
+POSITIVE, NEGATIVE, NEUTRAL = Sentiment.POSITIVE.value, Sentiment.NEGATIVE.value, Sentiment.NEUTRAL.value
+EXPECTED_SENTIMENTS = {
+    True: [NEUTRAL, NEUTRAL, POSITIVE, POSITIVE, POSITIVE, NEUTRAL, NEUTRAL, NEUTRAL, NEUTRAL],
+    False: [POSITIVE, POSITIVE, POSITIVE, POSITIVE, POSITIVE, NEUTRAL, NEUTRAL, NEUTRAL, NEUTRAL],
+}
+
+def build_artifact():
+    """
+    Build the sections of a compiled lexicon from the tiny lexicons
+    """
+    artifact = {'dictionary': DICTIONARY, 'mapper': pos_translator.DATA}
+    artifact['translation_index'] = pos_translator.build_translation_index(DICTIONARY, pos_translator.DATA)
+    artifact['dictionary_index'] = LexiconIndex(artifact['translation_index'])
+    for naive, (english_hebrew, hebrew_english) in LEXICONS.items():
+        artifact[shared_lexicon.lexicon_artifact.lexicon_section(naive)] = {'english_hebrew': english_hebrew, 'hebrew_english': hebrew_english, 'hebrew_english_index': LexiconIndex(hebrew_english)}
+    return artifact
+
+def open_tiny_shared(artifact):
+    """
+    Pack the sections into a shared lexicon in memory, without the header of the source files
+    """
+    return shared_lexicon.SharedLexicon(b''.join(shared_lexicon.pack_shared(artifact, {})))
+
+def test_tables():
+    artifact = build_artifact()
+    shared = open_tiny_shared(artifact)
+    assert dict(shared.table('dictionary').items()) == DICTIONARY
+    assert dict(shared.table('translation_index').items()) == artifact['translation_index']
+    assert shared.mapper == pos_translator.DATA
+    for naive, (english_hebrew, hebrew_english) in LEXICONS.items():
+        shared_english_hebrew, shared_hebrew_english, shared_index = shared.lexicon(naive)
+        assert dict(shared_english_hebrew.items()) == english_hebrew
+        assert dict(shared_hebrew_english.items()) == {key: value for key, value in hebrew_english.items() if isinstance(key, str)}
+        assert shared_hebrew_english.get('כלב', -1) == -1
+        assert 'שמח' in shared_hebrew_english and 'כלב' not in shared_hebrew_english
+        index = artifact[shared_lexicon.lexicon_artifact.lexicon_section(naive)]['hebrew_english_index']
+        for word in ['שמח', 'שָׂמֵחַ', 'בית', 'בַּיִת', 'כלב', -1]:
+            assert shared_index.lookup(word) == index.lookup(word)
+    shared.close()
+
+def test_dictionary_index():
+    artifact = build_artifact()
+    shared = open_tiny_shared(artifact)
+    index = shared.index('dictionary_index', shared.table('translation_index'))
+    for word in ['ספר', 'סֵפֶר', 'סָפַר', 'סִפֵּר', 'בית', 'כלב']:
+        assert index.candidates(word) == artifact['dictionary_index'].candidates(word)
+        assert index.lookup(word) == artifact['dictionary_index'].lookup(word)
+    shared.close()
+
+def test_translations():
+    """
+    A translator that reads the shared lexicon gives the same translations as one that holds the dictionary in memory, and the sentiments of the tiny lexicons
+    """
+    shared = open_tiny_shared(build_artifact())
+    in_memory = pos_translator.POSTranslator(DICTIONARY, pos_translator.DATA)
+    words, upos, feats = (list(values) for values in zip(*TOKENS))
+    for naive in [True, False]:
+        translator = SentimentTranslator(naive, shared=shared)
+        assert [translator.pos_translator.translate(*token) for token in TOKENS] == [in_memory.translate(*token) for token in TOKENS]
+        assert translator.pos_translator.translate_tokens(TOKENS).tolist() == [in_memory.translate(*token) for token in TOKENS]
+        assert [translator.translate(*token) for token in TOKENS] == EXPECTED_SENTIMENTS[naive]
+        # a new translator, so the batch translates the tokens instead of finding them in the translation cache
+        translator = SentimentTranslator(naive, shared=shared)
+        assert translator.translate_batch(words, upos, feats).tolist() == EXPECTED_SENTIMENTS[naive]
+        # the records are looked up in place, and not copied into flat arrays
+        assert translator.pos_translator.records is None
+    shared.close()
+
+def test_missing_translation():
+    """
+    A missing translation (NaN) of a lexicon entry is read back as NaN, and not as the string 'nan'
+    """
+    artifact = build_artifact()
+    section = shared_lexicon.lexicon_artifact.lexicon_section(True)
+    artifact[section]['english_hebrew'] = dict(artifact[section]['english_hebrew'], nul={'translation': float('nan'), 'sentiment': Sentiment.NEGATIVE.value})
+    shared = open_tiny_shared(artifact)
+    english_hebrew = shared.lexicon(True)[0]
+    assert math.isnan(english_hebrew['nul']['translation'])
+    assert english_hebrew['nul']['sentiment'] == Sentiment.NEGATIVE.value
+    assert english_hebrew['happy'] == {'translation': 'שמח', 'sentiment': Sentiment.POSITIVE.value}
+    shared.close()
+
+if __name__ == '__main__':
+    test_tables()
+    test_dictionary_index()
+    test_translations()
+    test_missing_translation()
+    print("shared lexicon tests passed")
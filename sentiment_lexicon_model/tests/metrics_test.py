@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# the sentiment pipeline adds the 'src' directories to the Python path. The tests folders have the Dicta stand-in server and the tiny shared lexicon.
+sys.path.append(project_dir)
+sys.path.append(os.path.join(project_dir, "src", "dicta_for_morphological_analysis", "tests"))
+sys.path.append(os.path.join(project_dir, "src", "hebrew_sentiment_based_on_pos", "tests"))
+import metrics
+import sentiment_pipeline
+from dicta_client import DictaClient
+from morphological_analyzer import DictaAnalyzer
+from sentiment_translator import SentimentTranslator
+from dicta_stub_server import start_stub_server
+from shared_lexicon_test import build_artifact, open_tiny_shared
+
+# the stages of the pipeline, as they are named in the metrics
+STAGES = ['read', 'strip_punctuation', 'analyze', 'parse', 'score']
+# a tiny split: the comments and gold labels of a few sentences
+SPLIT_TEXT = 'comment,label\n"הבית שמח, מאוד.",0\nספר על כלב,2\nשמח שמח,0\n'
+
+def test_pipeline_run():
+    """
+    A small pipeline run, against the Dicta stand-in server, records every stage and every instrumented function
+    """
+    server, url = start_stub_server()
+    client = DictaClient(url, max_workers=2, backoff=0.01)
+    shared = open_tiny_shared(build_artifact())
+    split_path = sentiment_pipeline.SPLIT_PATHS['dev']
+    run_metrics = metrics.instrument()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            sentiment_pipeline.SPLIT_PATHS['dev'] = os.path.join(directory, 'dev.csv')
+            with open(sentiment_pipeline.SPLIT_PATHS['dev'], 'w', encoding='utf-8') as file:
+                file.write(SPLIT_TEXT)
+            results_path = os.path.join(directory, 'results.csv')
+            count, tokens = sentiment_pipeline.run_pipeline(['dev'], SentimentTranslator(False, shared=shared), results_path,
+                                                            sentiment_pipeline.results_ud_format_path(results_path), analyze_batch=DictaAnalyzer(client), batch_size=2)
+    finally:
+        sentiment_pipeline.SPLIT_PATHS['dev'] = split_path
+        metrics.uninstrument()
+        client.close()
+        server.shutdown()
+        shared.close()
+    assert count == 3 and tokens > 0
+    operations = run_metrics.to_dict()
+    for name in [name for name, _, _ in metrics.INSTRUMENTED] + [f"stage_{stage}" for stage in STAGES] + [f"stage_{stage}_queue_wait" for stage in STAGES]:
+        assert operations[name]['calls'] > 0, name
+        assert operations[name]['errors'] == 0, name
+    assert operations['sentence_score']['calls'] == count
+    assert sentiment_pipeline.STAGE_OBSERVER is None
+
+def test_uninstrument():
+    """
+    uninstrument() restores the original functions
+    """
+    functions = [getattr(owner, attribute) for _, owner, attribute in metrics.INSTRUMENTED]
+    metrics.instrument()
+    assert all(getattr(owner, attribute) is not function for (_, owner, attribute), function in zip(metrics.INSTRUMENTED, functions))
+    metrics.uninstrument()
+    assert all(getattr(owner, attribute) is function for (_, owner, attribute), function in zip(metrics.INSTRUMENTED, functions))
+
+if __name__ == '__main__':
+    test_pipeline_run()
+    test_uninstrument()
+    print("metrics tests passed")
@@ -0,0 +1,81 @@
+import os
+import sys
+# to import module from another folder:
+# Get the absolute path to the parent directory (project directory)
+project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# the sentiment pipeline adds the 'src' directories to the Python path. The tests folder of the lexicons has the tiny shared lexicon.
+sys.path.append(project_dir)
+sys.path.append(os.path.join(project_dir, "src", "hebrew_sentiment_based_on_pos", "tests"))
+import conllu
+import sentiment_pipeline
+from sentiment_pipeline import SPLIT_PATHS, UD_FORMAT_PATH, OUTPUT_FORMATS, default_results_path, results_ud_format_path, overwritten_inputs
+from sentiment_scoring import score_corpus
+from conllu_corpus import ConlluCorpus
+from sentiment_lexicon import Sentiment
+from sentiment_translator import SentimentTranslator
+from shared_lexicon_test import build_artifact, open_tiny_shared
+
+# the results files checked in with the repository
+CHECKED_IN_RESULTS = [os.path.join(project_dir, f"sentiment_lexicon_model_results_{mode}.csv") for mode in ['naive', 'rule_based']]
+# sentences in CoNLL-U format: without tokens, with a positive word, and with a punctuation mark and an unknown word
+SENTENCES_TEXT = ('# text = \n\n'
+                  '# text = שמח\n1\tשמח\tשמח\tVERB\t_\t_\t_\t_\t_\t_\n\n'
+                  '# text = , כלב\n1\t,\t,\tPUNCT\t_\t_\t_\t_\t_\t_\n2\tכלב\tכלב\t_\t_\t_\t_\t_\t_\t_\n\n')
+
+def read_bytes(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+def test_default_outputs_are_not_inputs():
+    """
+    The default outputs of a run are neither the files it reads, nor the files rescore.py reads, nor the checked in results
+    """
+    for naive in [True, False]:
+        for output_format in OUTPUT_FORMATS:
+            results_path = default_results_path(naive, output_format)
+            ud_format_path = results_ud_format_path(results_path)
+            assert overwritten_inputs(list(SPLIT_PATHS), results_path, ud_format_path) == []
+            assert results_path not in CHECKED_IN_RESULTS
+            for split in SPLIT_PATHS:
+                assert ud_format_path.format(split=split) != UD_FORMAT_PATH.format(split=split)
+
+def test_inputs_are_found():
+    results_path = default_results_path(False)
+    # the same file through another path is found as well
+    ud_format_path = os.path.join(project_dir, 'data', '..', os.path.basename(UD_FORMAT_PATH))
+    assert overwritten_inputs(['dev'], results_path, ud_format_path) == [ud_format_path.format(split='dev')]
+    assert overwritten_inputs(['dev'], results_path, ud_format_path, overwrite_ud_inputs=True) == []
+    assert overwritten_inputs(['dev'], SPLIT_PATHS['train'], ud_format_path, overwrite_ud_inputs=True) == [SPLIT_PATHS['train']]
+
+def test_run_pipeline_keeps_inputs():
+    """
+    A run whose outputs are input files fails before anything is written
+    """
+    paths = [UD_FORMAT_PATH.format(split=split) for split in SPLIT_PATHS if os.path.exists(UD_FORMAT_PATH.format(split=split))]
+    assert len(paths) > 0
+    contents = [read_bytes(path) for path in paths]
+    try:
+        sentiment_pipeline.run_pipeline(list(SPLIT_PATHS), None, default_results_path(False), UD_FORMAT_PATH, analyze_batch=None)
+    except ValueError as error:
+        assert os.path.basename(paths[0]) in str(error)
+    else:
+        assert False, "run_pipeline wrote over the sentiment CoNLL-U files"
+    assert [read_bytes(path) for path in paths] == contents
+
+def test_sentences_without_scorable_tokens():
+    """
+    A sentence without tokens, or without tokens that have a sentiment, is neutral, as score_corpus() scores it
+    """
+    shared = open_tiny_shared(build_artifact())
+    translator = SentimentTranslator(False, shared=shared)
+    scores = [sentiment_pipeline.get_token_list_sentiment_score(token_list, translator) for token_list in conllu.parse(SENTENCES_TEXT)]
+    assert scores == [Sentiment.NEUTRAL.value, Sentiment.POSITIVE.value, Sentiment.NEUTRAL.value]
+    assert score_corpus(ConlluCorpus.from_text(SENTENCES_TEXT), translator).tolist() == scores
+    shared.close()
+
+if __name__ == '__main__':
+    test_default_outputs_are_not_inputs()
+    test_inputs_are_found()
+    test_run_pipeline_keeps_inputs()
+    test_sentences_without_scorable_tokens()
+    print("sentiment pipeline tests passed")